@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -11,6 +12,10 @@ from .routes import seats as seats_routes
 from .routes import reports as reports_routes
 from .routes import admin as admin_routes
 from .scheduler import FloorRefreshScheduler
+from .services.inference_executor import shutdown_executor
+from .services.jobs import shutdown_jobs
+from .services.env import env_flag
+from .services.yolo_service import preload_detectors, shutdown_detectors, stop_video_decoders
 from .routes import auth as auth_routes
 
 
@@ -45,12 +50,19 @@ def create_app() -> FastAPI:
 		Base.metadata.create_all(bind=engine)
 		# 创建调度器但不启动，等待用户登录后再启动
 		app.state.scheduler = FloorRefreshScheduler()
+		if env_flag("YOLO_PRELOAD", True):
+			# 后台加载并预热模型，首次刷新不再承担加载/追踪开销
+			threading.Thread(target=preload_detectors, name="yolo-preload", daemon=True).start()
 
 	@app.on_event("shutdown")
 	def on_shutdown():
 		sched = getattr(app.state, "scheduler", None)
 		if sched:
 			sched.shutdown()
+		shutdown_jobs()
+		stop_video_decoders()
+		shutdown_executor()
+		shutdown_detectors()
 
 	return app
 
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from typing import List
 from fastapi import APIRouter
-from ..schemas import HealthOut
+from ..schemas import CascadeHealthOut, HealthOut, StreamHealthOut
+from ..services.yolo_service import cascade_health, stream_health
 
 router = APIRouter(prefix="", tags=["health"])
 
@@ -11,3 +13,11 @@ def health() -> HealthOut:
 	return HealthOut(ok=True, version="0.1.0")
 
 
+@router.get("/health/streams", response_model=List[StreamHealthOut])
+def streams_health() -> List[StreamHealthOut]:
+	return [StreamHealthOut(**info) for info in stream_health()]
+
+
+@router.get("/health/cascade", response_model=List[CascadeHealthOut])
+def cascade_status() -> List[CascadeHealthOut]:
+	return [CascadeHealthOut(**info) for info in cascade_health()]
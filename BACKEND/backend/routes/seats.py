@@ -4,11 +4,13 @@ from typing import List, Dict
 from fastapi import APIRouter, Depends, Query, HTTPException, status
 from sqlalchemy.orm import Session
 
-from ..db import get_db
+from ..db import SessionLocal, get_db
 from ..models import Seat
-from ..schemas import SeatOut, FloorSummary, SeatStatsOut
+from ..schemas import SeatOut, FloorSummary, JobOut, SeatStatsOut
 from ..services.color import compute_seat_color, compute_admin_color, compute_floor_color
 from ..services.roi_loader import load_floor_config
+from ..services.jobs import Job, JobQueueFull, get_job_queue
+from ..services.refresh_coordinator import get_refresh_coordinator
 from ..services.yolo_service import refresh_floor
 import time
 
@@ -16,6 +18,22 @@ import time
 router = APIRouter(prefix="", tags=["seats"])
 
 
+def _seat_out(s: Seat) -> SeatOut:
+	base_color = compute_seat_color(s.is_empty, s.has_power, s.is_reported)
+	admin_color = compute_admin_color(base_color, s.is_malicious, s.is_empty, s.has_power)
+	return SeatOut(
+		seat_id=s.seat_id,
+		floor_id=s.floor_id,
+		has_power=s.has_power,
+		is_empty=s.is_empty,
+		is_reported=s.is_reported,
+		is_malicious=s.is_malicious,
+		lock_until_ts=s.lock_until_ts,
+		seat_color=base_color,
+		admin_color=admin_color,
+	)
+
+
 @router.get("/seats", response_model=List[SeatOut])
 def list_seats(
 	floor: str | None = Query(default=None, alias="floor"),
@@ -25,24 +43,7 @@ def list_seats(
 	if floor:
 		q = q.filter(Seat.floor_id == floor)
 	seats = q.all()
-	out: List[SeatOut] = []
-	for s in seats:
-		base_color = compute_seat_color(s.is_empty, s.has_power, s.is_reported)
-		admin_color = compute_admin_color(base_color, s.is_malicious, s.is_empty, s.has_power)
-		out.append(
-			SeatOut(
-				seat_id=s.seat_id,
-				floor_id=s.floor_id,
-				has_power=s.has_power,
-				is_empty=s.is_empty,
-				is_reported=s.is_reported,
-				is_malicious=s.is_malicious,
-				lock_until_ts=s.lock_until_ts,
-				seat_color=base_color,
-				admin_color=admin_color,
-			)
-		)
-	return out
+	return [_seat_out(s) for s in seats]
 
 
 @router.get("/seats/{seat_id}", response_model=SeatOut)
@@ -53,19 +54,7 @@ def get_seat(
 	s = db.query(Seat).filter(Seat.seat_id == seat_id).first()
 	if not s:
 		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="seat not found")
-	base_color = compute_seat_color(s.is_empty, s.has_power, s.is_reported)
-	admin_color = compute_admin_color(base_color, s.is_malicious, s.is_empty, s.has_power)
-	return SeatOut(
-		seat_id=s.seat_id,
-		floor_id=s.floor_id,
-		has_power=s.has_power,
-		is_empty=s.is_empty,
-		is_reported=s.is_reported,
-		is_malicious=s.is_malicious,
-		lock_until_ts=s.lock_until_ts,
-		seat_color=base_color,
-		admin_color=admin_color,
-	)
+	return _seat_out(s)
 
 
 @router.get("/floors", response_model=List[FloorSummary])
@@ -91,61 +80,83 @@ def list_floors(db: Session = Depends(get_db)) -> List[FloorSummary]:
 	return out
 
 
-@router.post("/floors/{floor}/refresh", response_model=List[SeatOut])
-def refresh_floor_endpoint(
-	floor: str,
-	db: Session = Depends(get_db),
-) -> List[SeatOut]:
+def _run_refresh(floor: str, cfg: dict, db: Session) -> List[SeatOut]:
+	"""
+	Refresh through the coordinator; errors propagate to the caller.
+	"""
+	# Concurrent taps share one in-flight refresh; a fresh enough result is reused as-is
+	ran, seats = get_refresh_coordinator().run(floor, lambda: refresh_floor(db, cfg))
+	if not ran:
+		seats = db.query(Seat).filter(Seat.floor_id == floor).all()
+	return [_seat_out(s) for s in seats if s.floor_id == floor]
+
+
+def _refresh_floor_seats(floor: str, db: Session) -> List[SeatOut]:
 	try:
 		cfg = load_floor_config(floor)
 	except Exception as e:
 		# 如果楼层配置不存在（如 F3/F4），返回当前数据库中的座位状态
 		seats = db.query(Seat).filter(Seat.floor_id == floor).all()
-		out: List[SeatOut] = []
-		for s in seats:
-			base_color = compute_seat_color(s.is_empty, s.has_power, s.is_reported)
-			admin_color = compute_admin_color(base_color, s.is_malicious, s.is_empty, s.has_power)
-			out.append(
-				SeatOut(
-					seat_id=s.seat_id,
-					floor_id=s.floor_id,
-					has_power=s.has_power,
-					is_empty=s.is_empty,
-					is_reported=s.is_reported,
-					is_malicious=s.is_malicious,
-					lock_until_ts=s.lock_until_ts,
-					seat_color=base_color,
-					admin_color=admin_color,
-				)
-			)
-		return out
+		return [_seat_out(s) for s in seats]
 	
 	try:
-		seats = refresh_floor(db, cfg)
+		return _run_refresh(floor, cfg, db)
 	except Exception as e:
 		# 如果刷新失败（如视频文件不存在），返回当前数据库中的座位状态
 		seats = db.query(Seat).filter(Seat.floor_id == floor).all()
-	
-	out: List[SeatOut] = []
-	for s in seats:
-		if s.floor_id != floor:
-			continue
-		base_color = compute_seat_color(s.is_empty, s.has_power, s.is_reported)
-		admin_color = compute_admin_color(base_color, s.is_malicious, s.is_empty, s.has_power)
-		out.append(
-			SeatOut(
-				seat_id=s.seat_id,
-				floor_id=s.floor_id,
-				has_power=s.has_power,
-				is_empty=s.is_empty,
-				is_reported=s.is_reported,
-				is_malicious=s.is_malicious,
-				lock_until_ts=s.lock_until_ts,
-				seat_color=base_color,
-				admin_color=admin_color,
-			)
-		)
-	return out
+		return [_seat_out(s) for s in seats]
+
+
+def _refresh_job(floor: str) -> List[SeatOut]:
+	"""
+	Async refresh job. Unlike the synchronous endpoint it does not fall back to the
+	stored rows: a failure marks the job failed with the error for the client to see.
+	"""
+	db = SessionLocal()
+	try:
+		return _run_refresh(floor, load_floor_config(floor), db)
+	finally:
+		db.close()
+
+
+def _job_out(job: Job) -> JobOut:
+	return JobOut(
+		job_id=job.job_id,
+		floor_id=job.floor_id,
+		status=job.status,
+		created_at=int(job.created_at),
+		finished_at=int(job.finished_at) if job.finished_at is not None else None,
+		error=job.error,
+		seats=job.result,
+	)
+
+
+@router.post("/floors/{floor}/refresh", response_model=List[SeatOut])
+def refresh_floor_endpoint(
+	floor: str,
+	db: Session = Depends(get_db),
+) -> List[SeatOut]:
+	return _refresh_floor_seats(floor, db)
+
+
+@router.post("/floors/{floor}/refresh/async", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+def refresh_floor_async_endpoint(floor: str) -> JobOut:
+	"""
+	Enqueue a refresh and return at once; poll GET /jobs/{job_id} for the seats.
+	"""
+	try:
+		job = get_job_queue().submit(floor, lambda: _refresh_job(floor))
+	except JobQueueFull:
+		raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="refresh queue is full")
+	return _job_out(job)
+
+
+@router.get("/jobs/{job_id}", response_model=JobOut)
+def get_job(job_id: str) -> JobOut:
+	job = get_job_queue().get(job_id)
+	if not job:
+		raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="job not found")
+	return _job_out(job)
 
 
 @router.get("/stats/seats/{seat_id}", response_model=SeatStatsOut)
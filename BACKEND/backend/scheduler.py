@@ -8,6 +8,7 @@ from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
 
 from .db import SessionLocal
+from .services.refresh_coordinator import get_refresh_coordinator
 from .services.roi_loader import list_floor_ids, load_floor_config
 from .services.yolo_service import refresh_floor
 from .services.rollover import perform_rollovers_if_needed, export_daily_and_reset, export_monthly_and_reset_total, _date_from_ts, is_first_day
@@ -26,7 +27,8 @@ class FloorRefreshScheduler:
 		db = SessionLocal()
 		try:
 			cfg = load_floor_config(floor_id)
-			refresh_floor(db, cfg)
+			# Shares a refresh already triggered by users instead of running a second one
+			get_refresh_coordinator().run(floor_id, lambda: refresh_floor(db, cfg))
 		except Exception as e:
 			logger.exception("Error refreshing floor %s: %s", floor_id, e)
 			# 如果刷新失败，不要阻塞后续任务
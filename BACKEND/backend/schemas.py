@@ -19,6 +19,16 @@ class SeatOut(BaseModel):
 		from_attributes = True
 
 
+class JobOut(BaseModel):
+	job_id: str
+	floor_id: str
+	status: str
+	created_at: int
+	finished_at: Optional[int] = None
+	error: Optional[str] = None
+	seats: Optional[List[SeatOut]] = None
+
+
 class FloorSummary(BaseModel):
 	floor_id: str
 	empty_count: int
@@ -31,6 +41,30 @@ class HealthOut(BaseModel):
 	version: str
 
 
+class StreamHealthOut(BaseModel):
+	floor_id: str
+	stream_path: str
+	live: bool
+	connected: bool
+	buffered_frames: int
+	last_frame_age_seconds: Optional[float] = None
+	reconnects: int
+	fps: float
+	last_error: Optional[str] = None
+
+
+class CascadeHealthOut(BaseModel):
+	floor_id: str
+	small_model: str
+	large_model: str
+	frames: int
+	escalated_frames: int
+	frame_escalation_rate: float
+	seats: int
+	escalated_seats: int
+	seat_escalation_rate: float
+
+
 class UserCreate(BaseModel):
 	username: str
 	password: str
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .occupancy import SeatCounters
+from .roi_loader import SeatRaster
+from .tracker import IoUTracker, detect_sparse
+
+
+# detect(frames, crop) -> one FrameDetections per frame
+DetectFn = Callable[[List[np.ndarray], Optional[Tuple[int, int, int, int]]], List[Any]]
+
+
+class CascadeStats:
+	"""
+	Escalation counters of one cascade. Refresh jobs update them from several threads
+	while /health/cascade reads them, so every access goes through the lock.
+	"""
+
+	def __init__(self) -> None:
+		self.frames = 0
+		self.escalated_frames = 0
+		self.seats = 0
+		self.escalated_seats = 0
+		self._lock = threading.Lock()
+
+	def add_frames(self, frames: int, escalated: int) -> None:
+		with self._lock:
+			self.frames += frames
+			self.escalated_frames += escalated
+
+	def add_seats(self, seats: int, escalated: int) -> None:
+		with self._lock:
+			self.seats += seats
+			self.escalated_seats += escalated
+
+	def snapshot(self) -> Dict[str, Any]:
+		"""
+		Consistent copy of the counters and the escalation rates derived from them.
+		"""
+		with self._lock:
+			frames, escalated_frames = self.frames, self.escalated_frames
+			seats, escalated_seats = self.seats, self.escalated_seats
+		return {
+			"frames": frames,
+			"escalated_frames": escalated_frames,
+			"frame_escalation_rate": escalated_frames / frames if frames else 0.0,
+			"seats": seats,
+			"escalated_seats": escalated_seats,
+			"seat_escalation_rate": escalated_seats / seats if seats else 0.0,
+		}
+
+
+class ModelCascade:
+	"""
+	Two-stage detection: a small model looks at every frame, the large model only at
+	what the small one leaves ambiguous.
+
+	Frame level: a frame is re-detected by the large model when a person/object box
+	whose center lies inside a seat scores within conf_band; the small model's result
+	for that frame is replaced.
+	Seat level (refine): after counting, seats whose person or object hit ratio lies
+	within ratio_margin of the presence threshold are recounted from the large model,
+	run only on the region around those seats.
+	"""
+
+	def __init__(
+		self,
+		small: DetectFn,
+		large: DetectFn,
+		threshold: float,
+		conf_band: Tuple[float, float] = (0.15, 0.5),
+		ratio_margin: float = 0.1,
+		crop_margin: float = 0.1,
+		stats: Optional[CascadeStats] = None,
+	) -> None:
+		self.small = small
+		self.large = large
+		self.threshold = threshold
+		self.conf_low, self.conf_high = conf_band
+		self.ratio_margin = ratio_margin
+		self.crop_margin = crop_margin
+		self.stats = stats if stats is not None else CascadeStats()
+
+	def frame_ambiguous(self, dets: Any, raster: SeatRaster) -> bool:
+		relevant = dets.person | dets.object
+		scores = dets.boxes[relevant, 4]
+		in_band = (scores >= self.conf_low) & (scores < self.conf_high)
+		if not in_band.any():
+			return False
+		return bool((raster.region_index(dets.centers(relevant)[in_band]) > 0).any())
+
+	def detect(self, frames: List[np.ndarray], raster: SeatRaster, crop: Optional[Tuple[int, int, int, int]] = None) -> List[Any]:
+		dets = self.small(frames, crop)
+		ambiguous = [i for i, d in enumerate(dets) if self.frame_ambiguous(d, raster)]
+		if ambiguous:
+			for i, d in zip(ambiguous, self.large([frames[i] for i in ambiguous], crop)):
+				dets[i] = d
+		self.stats.add_frames(len(frames), len(ambiguous))
+		return dets
+
+	def ambiguous_seats(self, counters: SeatCounters) -> np.ndarray:
+		frames = np.maximum(counters.frames, 1)
+		near_person = np.abs(counters.person / frames - self.threshold) <= self.ratio_margin
+		near_object = np.abs(counters.object / frames - self.threshold) <= self.ratio_margin
+		return (near_person | near_object) & (counters.frames > 0)
+
+	def refine(
+		self,
+		frames: Sequence[np.ndarray],
+		raster: SeatRaster,
+		counters: SeatCounters,
+		mask: Optional[np.ndarray] = None,
+		track_every: int = 1,
+		tracker: Optional[IoUTracker] = None,
+	) -> np.ndarray:
+		"""
+		Recount the seats near the threshold (within mask, if given) from the large
+		model over the same frames. Returns the (S,) mask of escalated seats.
+		"""
+		seats = self.ambiguous_seats(counters)
+		if mask is not None:
+			seats &= mask
+		self.stats.add_seats(len(seats) if mask is None else int(mask.sum()), int(seats.sum()))
+		if not seats.any() or not frames:
+			return seats
+		crop = raster.union_bbox(self.crop_margin, seats)
+		dets = detect_sparse(frames, lambda batch: self.large(batch, crop), tracker, track_every)
+		recount = SeatCounters(len(counters))
+		recount.add(
+			raster.hit_masks([d.centers(d.person) for d in dets]),
+			raster.hit_masks([d.centers(d.object) for d in dets]),
+		)
+		counters.restore(recount, seats)
+		return seats
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import collections
+import logging
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+logger = logging.getLogger("decoder")
+
+
+class FrameRing:
+	"""
+	Bounded frame buffer shared by one producer (decoder thread) and refresh jobs.
+	When full, put() blocks, so file replay never loses a frame.
+	"""
+
+	def __init__(self, capacity: int) -> None:
+		self.capacity = max(1, int(capacity))
+		self._frames: Deque[np.ndarray] = collections.deque()
+		self._cond = threading.Condition()
+		self._closed = False
+
+	def put(self, frame: np.ndarray, stop: threading.Event) -> bool:
+		with self._cond:
+			while len(self._frames) >= self.capacity:
+				if stop.is_set():
+					return False
+				self._cond.wait(timeout=0.5)
+			self._frames.append(frame)
+			self._cond.notify_all()
+			return True
+
+	def take(self, n: int, timeout: float) -> List[np.ndarray]:
+		"""
+		Pop up to n frames in arrival order, waiting at most timeout seconds for n to be ready.
+		Returns what is buffered right away once the producer has closed the ring.
+		"""
+		deadline = time.monotonic() + max(0.0, timeout)
+		with self._cond:
+			while len(self._frames) < n and not self._closed:
+				remaining = deadline - time.monotonic()
+				if remaining <= 0:
+					break
+				self._cond.wait(timeout=remaining)
+			out = [self._frames.popleft() for _ in range(min(n, len(self._frames)))]
+			self._cond.notify_all()
+			return out
+
+	def clear(self) -> None:
+		with self._cond:
+			self._frames.clear()
+			self._cond.notify_all()
+
+	def close(self) -> None:
+		"""
+		Mark the producer as gone and wake every waiting take().
+		"""
+		with self._cond:
+			self._closed = True
+			self._cond.notify_all()
+
+	@property
+	def closed(self) -> bool:
+		with self._cond:
+			return self._closed
+
+	def __len__(self) -> int:
+		with self._cond:
+			return len(self._frames)
+
+
+class FrameDecoder:
+	"""
+	Per-floor worker that owns a looping video file handle and keeps the next refresh
+	windows decoded ahead of time: it reads `sample_frames` contiguous frames, then
+	grab()s past the rest of the refresh interval (no seek, no color conversion),
+	wrapping around at the end of the file.
+	"""
+
+	def __init__(self, floor_id: str, cap: Any, total_frames: int, sample_frames: int, step_frames: int, windows: int = 2) -> None:
+		self.floor_id = floor_id
+		self.cap = cap
+		self.total_frames = total_frames
+		self.sample_frames = max(1, int(sample_frames))
+		self.skip_frames = max(0, int(step_frames) - self.sample_frames)
+		self.ring = FrameRing(self.sample_frames * max(1, windows))
+		self.last_frame_ts = 0.0
+		self.last_error: Optional[str] = None
+		# Decode timestamps of recent frames, for the measured fps in health()
+		self._frame_times: Deque[float] = collections.deque(maxlen=max(2, self.sample_frames * 2))
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+
+	def start(self) -> None:
+		if self._thread is not None and self._thread.is_alive():
+			return
+		self._stop.clear()
+		self._thread = threading.Thread(target=self._run, name=f"decoder-{self.floor_id}", daemon=True)
+		self._thread.start()
+
+	def stop(self) -> None:
+		self._stop.set()
+		self.ring.clear()
+		thread = self._thread
+		if thread is not None and thread is not threading.current_thread():
+			thread.join(timeout=5.0)
+
+	def is_alive(self) -> bool:
+		return self._thread is not None and self._thread.is_alive()
+
+	def take(self, n: int, timeout: float) -> List[np.ndarray]:
+		return self.ring.take(n, timeout)
+
+	def health(self) -> Dict[str, Any]:
+		times = list(self._frame_times)
+		fps = 0.0
+		if len(times) >= 2 and times[-1] > times[0]:
+			fps = (len(times) - 1) / (times[-1] - times[0])
+		age = time.monotonic() - self.last_frame_ts if self.last_frame_ts else None
+		return {
+			"connected": self.is_alive(),
+			"buffered_frames": len(self.ring),
+			"last_frame_age_seconds": age,
+			"reconnects": 0,
+			"fps": fps,
+			"last_error": self.last_error,
+		}
+
+	def _rewind(self) -> bool:
+		if self.total_frames <= 0:
+			return False
+		try:
+			return bool(self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0))
+		except Exception:
+			return False
+
+	def _read(self) -> Optional[np.ndarray]:
+		ret, frame = self.cap.read()
+		if (not ret or frame is None) and self._rewind():
+			ret, frame = self.cap.read()
+		return frame if ret and frame is not None else None
+
+	def _grab(self) -> bool:
+		if self.cap.grab():
+			return True
+		return self._rewind() and bool(self.cap.grab())
+
+	def _run(self) -> None:
+		try:
+			while not self._stop.is_set():
+				for _ in range(self.sample_frames):
+					frame = self._read()
+					if frame is None:
+						self.last_error = "read failed"
+						logger.warning("Decoder for floor %s reached an unreadable frame; stopping", self.floor_id)
+						return
+					now = time.monotonic()
+					self._frame_times.append(now)
+					self.last_frame_ts = now
+					if not self.ring.put(frame, self._stop):
+						return
+				for _ in range(self.skip_frames):
+					if self._stop.is_set() or not self._grab():
+						break
+		except Exception as e:
+			self.last_error = str(e)
+			logger.exception("Decoder for floor %s failed: %s", self.floor_id, e)
+		finally:
+			# Wake refresh jobs waiting in take() instead of letting them run into the timeout
+			self.ring.close()
+
+
+class LiveStreamReader:
+	"""
+	Per-floor reader for live cameras (RTSP/HTTP). A thread keeps draining the stream so
+	OpenCV's internal buffer never goes stale, keeps only the freshest `capacity` frames,
+	and reopens the stream with exponential backoff when reads fail.
+	"""
+
+	def __init__(
+		self,
+		floor_id: str,
+		stream_path: str,
+		capacity: int = 30,
+		max_frame_age: float = 5.0,
+		backoff_initial: float = 1.0,
+		backoff_max: float = 30.0,
+	) -> None:
+		self.floor_id = floor_id
+		self.stream_path = stream_path
+		self.capacity = max(1, int(capacity))
+		self.max_frame_age = max_frame_age
+		self.backoff_initial = backoff_initial
+		self.backoff_max = backoff_max
+		self.sample_frames = self.capacity
+		self.fps = 0.0
+		self.connected = False
+		self.reconnects = 0
+		self.last_frame_ts = 0.0
+		self.last_error: Optional[str] = None
+		self._frames: Deque[Tuple[float, np.ndarray]] = collections.deque(maxlen=self.capacity)
+		self._lock = threading.Lock()
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+
+	def start(self) -> None:
+		if self._thread is not None and self._thread.is_alive():
+			return
+		self._stop.clear()
+		self._thread = threading.Thread(target=self._run, name=f"live-{self.floor_id}", daemon=True)
+		self._thread.start()
+
+	def stop(self) -> None:
+		self._stop.set()
+		thread = self._thread
+		if thread is not None and thread is not threading.current_thread():
+			thread.join(timeout=5.0)
+
+	def is_alive(self) -> bool:
+		return self._thread is not None and self._thread.is_alive()
+
+	def latest(self, n: int) -> List[np.ndarray]:
+		"""
+		Up to n freshest frames (oldest first), skipping anything older than max_frame_age.
+		"""
+		cutoff = time.monotonic() - self.max_frame_age
+		with self._lock:
+			items = list(self._frames)[-max(0, n):] if n > 0 else []
+		return [frame for ts, frame in items if ts >= cutoff]
+
+	def health(self) -> Dict[str, Any]:
+		with self._lock:
+			buffered = len(self._frames)
+		age = time.monotonic() - self.last_frame_ts if self.last_frame_ts else None
+		return {
+			"connected": self.connected,
+			"buffered_frames": buffered,
+			"last_frame_age_seconds": age,
+			"reconnects": self.reconnects,
+			"fps": self.fps,
+			"last_error": self.last_error,
+		}
+
+	def _open(self) -> Any:
+		cap = cv2.VideoCapture(self.stream_path)
+		try:
+			# Keep OpenCV's own queue as short as the backend allows
+			cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+		except Exception:
+			pass
+		return cap
+
+	def _run(self) -> None:
+		backoff = self.backoff_initial
+		while not self._stop.is_set():
+			cap = self._open()
+			if not cap.isOpened():
+				self.connected = False
+				self.last_error = "open failed"
+				cap.release()
+				self.reconnects += 1
+				self._stop.wait(backoff)
+				backoff = min(self.backoff_max, backoff * 2)
+				continue
+
+			fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+			if fps and fps > 0 and fps == fps:
+				self.fps = float(fps)
+				self.sample_frames = min(self.capacity, int(round(fps)))
+			self.connected = True
+			self.last_error = None
+			backoff = self.backoff_initial
+			try:
+				while not self._stop.is_set():
+					ret, frame = cap.read()
+					if not ret or frame is None:
+						self.last_error = "read failed"
+						break
+					now = time.monotonic()
+					with self._lock:
+						self._frames.append((now, frame))
+					self.last_frame_ts = now
+			except Exception as e:
+				self.last_error = str(e)
+				logger.exception("Live stream for floor %s failed: %s", self.floor_id, e)
+			finally:
+				self.connected = False
+				try:
+					cap.release()
+				except Exception:
+					pass
+			if not self._stop.is_set():
+				self.reconnects += 1
+				self._stop.wait(backoff)
+				backoff = min(self.backoff_max, backoff * 2)
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .detections import OBJECT_NAMES_DEFAULT, FrameDetections, seat_classes
+
+
+logger = logging.getLogger("detect_pool")
+
+# (offset, shape, dtype) of one frame inside a shared-memory block
+FrameDesc = Tuple[int, Tuple[int, ...], str]
+
+
+# ---- worker process side ----
+
+_worker_detector: Any = None
+
+
+def _init_worker(model_name: str, torch_threads: int, warmup_runs: int, warmup_batch: int) -> None:
+	global _worker_detector
+	if torch_threads > 0:
+		import torch
+		torch.set_num_threads(torch_threads)
+	from .yolo_service import YOLODetector
+	_worker_detector = YOLODetector(model_name=model_name, max_batch=warmup_batch)
+	_worker_detector.warmup(warmup_runs)
+
+
+def _worker_info() -> Dict[str, Any]:
+	return {"pid": os.getpid(), "names": dict(_worker_detector.names)}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+	try:
+		return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+	except TypeError:
+		# Workers share the parent's resource tracker, which drops the block when the
+		# parent unlinks it; the worker only has to close() its mapping
+		return shared_memory.SharedMemory(name=name)
+
+
+def _detect_shared(shm_name: str, descs: List[FrameDesc], conf_th: float, iou_th: float) -> List[np.ndarray]:
+	shm = _attach(shm_name)
+	try:
+		frames = [np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset) for offset, shape, dtype in descs]
+		boxes = _worker_detector.detect_boxes(frames, conf_th, iou_th)
+		del frames
+		return boxes
+	finally:
+		shm.close()
+
+
+# ---- API process side ----
+
+class PooledDetector:
+	"""
+	Detector facade backed by worker processes that each load the model, so inference
+	does not compete with request handling for the GIL. Frames (or just their crop
+	regions) are copied once into a shared-memory block per batch; workers return
+	compact (N, 6) box arrays. Quacks like YOLODetector for refresh_floor and the
+	inference executor, which dispatches batches through submit_batch().
+	"""
+
+	def __init__(
+		self,
+		model_name: str,
+		workers: int,
+		torch_threads: int = 0,
+		warmup_runs: int = 2,
+		warmup_batch: int = 8,
+	) -> None:
+		self.model_name = model_name
+		self.workers = max(1, int(workers))
+		# Two batches per worker keep every process busy while the next batch forms
+		self.max_inflight = self.workers * 2
+		if torch_threads <= 0:
+			torch_threads = max(1, (os.cpu_count() or 1) // self.workers)
+		self.pool = ProcessPoolExecutor(
+			max_workers=self.workers,
+			mp_context=mp.get_context("spawn"),
+			initializer=_init_worker,
+			initargs=(model_name, torch_threads, warmup_runs, warmup_batch),
+		)
+		# One call per worker starts (and warms) all of them before the first refresh
+		infos = [f.result() for f in [self.pool.submit(_worker_info) for _ in range(self.workers)]]
+		self.names: Dict[int, str] = infos[0]["names"]
+		self.person_name = "person"
+		self.object_names = OBJECT_NAMES_DEFAULT
+		self.classes = seat_classes(self.names, self.person_name, self.object_names)
+		logger.info("Detection pool for %s: %d workers (pids %s)", model_name, self.workers, [i["pid"] for i in infos])
+
+	def submit_batch(
+		self,
+		frames: Sequence[np.ndarray],
+		crops: Sequence[Optional[Tuple[int, int, int, int]]] | None = None,
+		conf_th: float = 0.15,
+		iou_th: float = 0.2,
+	) -> Future:
+		"""
+		Run one batch on a worker; the future resolves to one FrameDetections per frame.
+		"""
+		if crops is None:
+			crops = [None] * len(frames)
+		regions = []
+		offsets = []
+		for frame, crop in zip(frames, crops):
+			if crop is not None:
+				x1, y1, x2, y2 = crop
+				frame = frame[y1:y2, x1:x2]
+				offsets.append((x1, y1))
+			else:
+				offsets.append((0, 0))
+			regions.append(frame)
+
+		shm = shared_memory.SharedMemory(create=True, size=max(1, sum(r.nbytes for r in regions)))
+		descs: List[FrameDesc] = []
+		offset = 0
+		view = None
+		for region in regions:
+			view = np.ndarray(region.shape, dtype=region.dtype, buffer=shm.buf, offset=offset)
+			np.copyto(view, region)
+			descs.append((offset, region.shape, region.dtype.str))
+			offset += region.nbytes
+		del view, regions
+
+		result: Future = Future()
+		result.set_running_or_notify_cancel()
+		try:
+			work = self.pool.submit(_detect_shared, shm.name, descs, conf_th, iou_th)
+		except Exception:
+			shm.close()
+			shm.unlink()
+			raise
+		work.add_done_callback(lambda f: self._finish(f, shm, offsets, result))
+		return result
+
+	def _finish(self, work: Future, shm: shared_memory.SharedMemory, offsets: List[Tuple[int, int]], result: Future) -> None:
+		shm.close()
+		shm.unlink()
+		try:
+			boxes = work.result()
+		except BaseException as e:
+			result.set_exception(e)
+			return
+		dets = []
+		for b, (dx, dy) in zip(boxes, offsets):
+			if dx or dy:
+				b[:, [0, 2]] += dx
+				b[:, [1, 3]] += dy
+			dets.append(FrameDetections(b, self.classes))
+		result.set_result(dets)
+
+	def detect_frames(
+		self,
+		frames: Sequence[np.ndarray],
+		conf_th: float = 0.15,
+		iou_th: float = 0.2,
+		max_batch: int | None = None,
+		crops: Sequence[Optional[Tuple[int, int, int, int]]] | None = None,
+	) -> List[FrameDetections]:
+		if not frames:
+			return []
+		if max_batch is None or max_batch <= 0:
+			max_batch = len(frames)
+		if crops is None:
+			crops = [None] * len(frames)
+		futures = [
+			self.submit_batch(frames[i:i + max_batch], crops[i:i + max_batch], conf_th, iou_th)
+			for i in range(0, len(frames), max_batch)
+		]
+		return [dets for f in futures for dets in f.result()]
+
+	def detect_frame(self, frame: np.ndarray, conf_th: float = 0.15, iou_th: float = 0.2) -> List[Any]:
+		return self.detect_frames([frame], conf_th, iou_th)[0].to_detections()
+
+	def warmup(self, runs: int = 2, batch_sizes: Sequence[int] | None = None) -> None:
+		# Workers warm themselves up in their initializer
+		return None
+
+	def shutdown(self) -> None:
+		self.pool.shutdown(wait=True, cancel_futures=True)
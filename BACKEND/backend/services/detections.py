@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+
+# COCO classes that mark a seat as taken by belongings
+OBJECT_NAMES_DEFAULT = {
+	"backpack", "handbag", "suitcase", "book", "laptop", "cell phone",
+	"mouse", "keyboard", "bottle", "cup", "umbrella","scissors"
+}
+
+
+@dataclass
+class Detection:
+	x1: float
+	y1: float
+	x2: float
+	y2: float
+	score: float
+	cls_name: str
+
+	@property
+	def center(self) -> Tuple[float, float]:
+		return (self.x1 + self.x2) / 2.0, (self.y1 + self.y2) / 2.0
+
+
+# Region (x1, y1, x2, y2) in frame pixels that detection is restricted to
+Crop = Tuple[int, int, int, int]
+
+
+def boxes_to_detections(boxes: np.ndarray, names: Dict[int, str]) -> List[Detection]:
+	"""
+	(N, 6) [x1, y1, x2, y2, score, class_id] rows -> Detection objects.
+	"""
+	dets: List[Detection] = []
+	for x1, y1, x2, y2, score, index in boxes.tolist():
+		idx = int(index)
+		dets.append(Detection(x1, y1, x2, y2, float(score), names.get(idx, str(idx))))
+	return dets
+
+
+@dataclass(frozen=True)
+class SeatClasses:
+	"""Class ids of a model's names table that matter for seats."""
+	names: Dict[int, str]
+	person_ids: np.ndarray
+	object_ids: np.ndarray
+
+
+def seat_classes(names: Dict[int, str], person_name: str = "person", object_names: Any = OBJECT_NAMES_DEFAULT) -> SeatClasses:
+	return SeatClasses(
+		names=names,
+		person_ids=np.array(sorted(i for i, n in names.items() if n == person_name), dtype=np.int64),
+		object_ids=np.array(sorted(i for i, n in names.items() if n in object_names), dtype=np.int64),
+	)
+
+
+class FrameDetections:
+	"""
+	One frame's detections as an (N, 6) float32 array [x1, y1, x2, y2, score, class_id]
+	plus boolean row masks for the person class and the seat object classes, so seat
+	mapping never builds per-box Python objects. to_detections() gives the Detection view.
+	"""
+	__slots__ = ("boxes", "person", "object", "names")
+
+	def __init__(self, boxes: np.ndarray, classes: SeatClasses) -> None:
+		self.boxes = boxes
+		cls = boxes[:, 5].astype(np.int64)
+		self.person = np.isin(cls, classes.person_ids)
+		self.object = np.isin(cls, classes.object_ids)
+		self.names = classes.names
+
+	def __len__(self) -> int:
+		return len(self.boxes)
+
+	def centers(self, mask: np.ndarray | None = None) -> np.ndarray:
+		"""(M, 2) float32 box centers, of the rows selected by mask if given."""
+		boxes = self.boxes if mask is None else self.boxes[mask]
+		return (boxes[:, 0:2] + boxes[:, 2:4]) * 0.5
+
+	def replace(self, boxes: np.ndarray, person: np.ndarray, object: np.ndarray) -> "FrameDetections":
+		"""Same names table, other rows (e.g. tracked boxes)."""
+		out = FrameDetections.__new__(FrameDetections)
+		out.boxes = boxes
+		out.person = person
+		out.object = object
+		out.names = self.names
+		return out
+
+	def to_detections(self) -> List[Detection]:
+		return boxes_to_detections(self.boxes, self.names)
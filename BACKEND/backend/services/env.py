@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import os
+
+
+# Small helpers for reading tuning knobs from environment variables.
+# Invalid values fall back to the default instead of failing the caller.
+
+
+def env_int(name: str, default: int) -> int:
+	try:
+		return int(os.getenv(name, str(default)))
+	except Exception:
+		return default
+
+
+def env_float(name: str, default: float) -> float:
+	try:
+		return float(os.getenv(name, str(default)))
+	except Exception:
+		return default
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+	value = os.getenv(name)
+	if value is None or value.strip() == "":
+		return default
+	return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_str(name: str, default: str) -> str:
+	value = os.getenv(name)
+	if value is None or value.strip() == "":
+		return default
+	return value.strip()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from .occupancy import SeatCounters
+from .roi_loader import SeatRaster, get_seat_raster
+from .yolo_service import BASE_DIR, PRESENCE_RATIO
+
+
+# Offline helpers shared by the model tooling (quantization, model-size calibration):
+# replay a floor's clip and reduce detections to the per-seat decisions refresh_floor makes.
+
+SeatDecision = Tuple[bool, bool]  # (person_present, object_present)
+
+
+def floor_stream_path(floor_cfg: Dict[str, Any]) -> str:
+	stream = Path(str(floor_cfg["stream_path"]))
+	if not stream.is_absolute():
+		stream = BASE_DIR / stream
+	return stream.as_posix()
+
+
+def read_floor_clips(floor_cfg: Dict[str, Any], windows: int = 5, window_frames: int = 0) -> List[List[np.ndarray]]:
+	"""
+	Read `windows` refresh-sized clips spread evenly over the floor's video.
+	window_frames defaults to one second of video, like refresh_floor.
+	"""
+	cap = cv2.VideoCapture(floor_stream_path(floor_cfg))
+	clips: List[List[np.ndarray]] = []
+	if not cap.isOpened():
+		return clips
+	try:
+		fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+		if not fps or fps <= 0 or fps != fps:
+			fps = 30.0
+		window_frames = window_frames or int(round(fps))
+		total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+		starts = [0]
+		if total > window_frames and windows > 1:
+			starts = np.linspace(0, total - window_frames, windows).astype(int).tolist()
+		for start in starts:
+			cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+			clip: List[np.ndarray] = []
+			while len(clip) < window_frames:
+				ok, frame = cap.read()
+				if not ok or frame is None:
+					break
+				clip.append(frame)
+			if clip:
+				clips.append(clip)
+	finally:
+		cap.release()
+	return clips
+
+
+def seat_decisions_from_detections(floor_cfg: Dict[str, Any], clip: List[np.ndarray], batch_dets: List[Any]) -> Dict[str, SeatDecision]:
+	"""
+	batch_dets: one FrameDetections per clip frame.
+	"""
+	h, w = clip[0].shape[:2]
+	raster = get_seat_raster(floor_cfg, (w, h))
+	return seat_decisions_from_counters(raster, count_seat_hits(raster, batch_dets))
+
+
+def count_seat_hits(raster: SeatRaster, batch_dets: List[Any]) -> SeatCounters:
+	counters = SeatCounters(len(raster.seat_ids))
+	counters.add(
+		raster.hit_masks([dets.centers(dets.person) for dets in batch_dets]),
+		raster.hit_masks([dets.centers(dets.object) for dets in batch_dets]),
+	)
+	return counters
+
+
+def seat_decisions_from_counters(raster: SeatRaster, counters: SeatCounters) -> Dict[str, SeatDecision]:
+	person, obj = counters.presence(PRESENCE_RATIO)
+	return {seat_id: (bool(person[i]), bool(obj[i])) for i, seat_id in enumerate(raster.seat_ids)}
+
+
+def clip_seat_decisions(detector: Any, floor_cfg: Dict[str, Any], clip: List[np.ndarray], max_batch: int = 8) -> Dict[str, SeatDecision]:
+	"""
+	Run the detector over a clip and reduce it to per-seat (person_present, object_present).
+	"""
+	batch_dets = detector.detect_frames(clip, max_batch=max_batch)
+	return seat_decisions_from_detections(floor_cfg, clip, batch_dets)
+
+
+@dataclass
+class Agreement:
+	seats: int = 0
+	agree: int = 0
+	mismatches: List[Tuple[str, int, SeatDecision, SeatDecision]] = field(default_factory=list)
+
+	def add(self, clip_idx: int, ref: Dict[str, SeatDecision], other: Dict[str, SeatDecision]) -> None:
+		"""
+		Compare empty/occupied per seat (empty = neither person nor object present).
+		"""
+		for seat_id, ref_dec in ref.items():
+			other_dec = other.get(seat_id, (False, False))
+			self.seats += 1
+			if any(ref_dec) == any(other_dec):
+				self.agree += 1
+			else:
+				self.mismatches.append((seat_id, clip_idx, ref_dec, other_dec))
+
+	@property
+	def rate(self) -> float:
+		return self.agree / self.seats if self.seats else 1.0
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+
+logger = logging.getLogger("inference_backends")
+
+
+def weights_sha256(path: Path) -> str:
+	h = hashlib.sha256()
+	with Path(path).open("rb") as f:
+		for block in iter(lambda: f.read(1 << 20), b""):
+			h.update(block)
+	return h.hexdigest()
+
+
+def batch_buckets(max_batch: int) -> List[int]:
+	"""
+	Batch sizes that get a traced graph: powers of two up to max_batch, plus max_batch.
+	Other batch sizes are padded up to the next bucket.
+	"""
+	max_batch = max(1, int(max_batch))
+	buckets = []
+	size = 1
+	while size < max_batch:
+		buckets.append(size)
+		size *= 2
+	buckets.append(max_batch)
+	return buckets
+
+
+def onnx_artifact_path(weights_path: Path) -> Path:
+	return Path(weights_path).with_suffix(".onnx")
+
+
+def int8_artifact_path(onnx_path: Path) -> Path:
+	onnx_path = Path(onnx_path)
+	return onnx_path.with_name(onnx_path.stem + ".int8.onnx")
+
+
+def pruned_weights_path(weights_path: Path) -> Path:
+	weights_path = Path(weights_path)
+	return weights_path.with_name(weights_path.stem + ".pruned.pt")
+
+
+def artifact_meta_path(artifact_path: Path) -> Path:
+	"""JSON sidecar (<artifact>.json) describing how a derived model was built."""
+	return Path(artifact_path).with_name(Path(artifact_path).name + ".json")
+
+
+def read_artifact_meta(artifact_path: Path) -> Optional[Dict[str, Any]]:
+	path = artifact_meta_path(artifact_path)
+	if not path.exists():
+		return None
+	try:
+		return json.loads(path.read_text(encoding="utf-8"))
+	except Exception:
+		return None
+
+
+def write_artifact_meta(artifact_path: Path, meta: Dict[str, Any]) -> None:
+	artifact_meta_path(artifact_path).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+
+class OnnxBackend:
+	"""
+	ONNX Runtime CPU inference on an artifact produced by tools/export_onnx.py.
+	Returns the raw Detect output as a numpy array (post-processed by
+	non_max_suppression_numpy), so this backend never imports torch.
+	"""
+	name = "onnx"
+	input_dtype = np.float32
+
+	def __init__(self, onnx_path: Path, threads: int = 0) -> None:
+		try:
+			import onnxruntime as ort
+		except ImportError as e:
+			raise RuntimeError("YOLO_BACKEND=onnx requires the onnxruntime package") from e
+		onnx_path = Path(onnx_path)
+		if not onnx_path.exists():
+			raise FileNotFoundError(
+				f"ONNX model not found: {onnx_path.as_posix()} (run `python -m tools.export_onnx` first)"
+			)
+		options = ort.SessionOptions()
+		options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+		if threads > 0:
+			options.intra_op_num_threads = threads
+		self.session = ort.InferenceSession(onnx_path.as_posix(), sess_options=options, providers=["CPUExecutionProvider"])
+		self.input_name = self.session.get_inputs()[0].name
+		self.path = onnx_path
+		# Class-pruned exports carry their remapped names table in the sidecar
+		self.names = (read_artifact_meta(onnx_path) or {}).get("names")
+
+	def __call__(self, images: np.ndarray) -> Any:
+		if images.dtype == np.uint8:
+			x = images.astype(np.float32)
+			x *= 1.0 / 255
+		else:
+			x = np.ascontiguousarray(images, dtype=np.float32)
+		return self.session.run(None, {self.input_name: x})[0]
+
+
+def non_max_suppression_numpy(
+	pred: np.ndarray,
+	conf_th: float = 0.001,
+	iou_th: float = 0.7,
+	classes: Optional[Sequence[int]] = None,
+	max_det: int = 300,
+) -> np.ndarray:
+	"""
+	numpy/OpenCV counterpart of util.non_max_suppression_batched for backends that
+	return numpy (ONNX Runtime). pred is the raw (B, 4 + nc, anchors) Detect output.
+	Returns an (N, 7) float32 array [batch_idx, x1, y1, x2, y2, score, cls] sorted by
+	batch index, then score (descending), with at most max_det rows per image.
+	"""
+	max_nms = 30000
+	pred = pred[0] if isinstance(pred, (list, tuple)) else pred
+	bs = pred.shape[0]
+	nc = pred.shape[1] - 4
+	pred = pred.transpose(0, 2, 1)  # (bs, anchors, 4 + nc)
+
+	cls = pred[..., 4:]
+	cls_ids = None
+	if classes is not None:
+		cls_ids = np.asarray(classes, dtype=np.int64)
+		cls = cls[..., cls_ids]
+
+	# Drop anchors without any allowed score above conf_th
+	b, a = np.nonzero(cls.max(-1) > conf_th)
+	if not len(b):
+		return np.zeros((0, 7), dtype=np.float32)
+	xywh = pred[b, a, :4].astype(np.float32)
+	cls = cls[b, a].astype(np.float32)
+
+	# One candidate per (anchor, class) above conf_th
+	i, j = np.nonzero(cls > conf_th)
+	b, xywh, scores = b[i], xywh[i], cls[i, j]
+	if cls_ids is not None:
+		j = cls_ids[j]
+	if len(scores) > max_nms * bs:
+		top = np.argsort(-scores, kind="stable")[:max_nms * bs]
+		b, xywh, scores, j = b[top], xywh[top], scores[top], j[top]
+
+	# OpenCV takes (x, y, w, h) boxes; batch and class offsets keep images and classes apart
+	rects = np.concatenate([xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, 2:]], axis=1).astype(np.float64)
+	keep = np.asarray(cv2.dnn.NMSBoxesBatched(rects, scores, (b * nc + j).astype(np.int32), 0.0, iou_th), dtype=np.int64).reshape(-1)
+
+	# Descending score within each image, images in order
+	keep = keep[np.argsort(-scores[keep], kind="stable")]
+	keep = keep[np.argsort(b[keep], kind="stable")]
+	b_keep = b[keep]
+	counts = np.bincount(b_keep, minlength=bs)
+	starts = np.cumsum(counts) - counts
+	rank = np.arange(len(keep)) - starts[b_keep]
+	keep = keep[rank < max_det]
+
+	boxes = np.concatenate([xywh[keep, :2] - xywh[keep, 2:] / 2, xywh[keep, :2] + xywh[keep, 2:] / 2], axis=1)
+	return np.concatenate([b[keep, None], boxes, scores[keep, None], j[keep, None]], axis=1).astype(np.float32)
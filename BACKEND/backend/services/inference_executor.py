@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import functools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .env import env_float, env_int
+
+
+logger = logging.getLogger("inference_executor")
+
+
+@dataclass
+class _Request:
+	frame: np.ndarray
+	crop: Optional[Tuple[int, int, int, int]] = None
+	future: Future = field(default_factory=Future)
+
+
+class InferenceExecutor:
+	"""
+	Single owner thread for the detector. Refresh jobs of every floor enqueue frames;
+	the owner thread drains the queue into batches of at most max_batch frames, waiting
+	no longer than max_wait_ms for a batch to fill, and runs one detect_frames() call per batch.
+	Blocking callers give up after timeout seconds (0 waits forever), so a hung batch
+	fails their refresh instead of blocking the thread for good.
+	"""
+
+	def __init__(
+		self,
+		detector_factory: Callable[[], Any],
+		max_batch: int = 8,
+		max_wait_ms: float = 10.0,
+		torch_threads: int = 0,
+		name: str = "inference-executor",
+		timeout: float = 0.0,
+	) -> None:
+		self.name = name
+		self.timeout = max(0.0, float(timeout))
+		self.detector_factory = detector_factory
+		self.max_batch = max(1, int(max_batch))
+		self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+		self.torch_threads = torch_threads
+		self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+		self._thread: Optional[threading.Thread] = None
+		self._start_lock = threading.Lock()
+		self._stopped = False
+
+	def _ensure_started(self) -> None:
+		if self._thread is not None and self._thread.is_alive():
+			return
+		with self._start_lock:
+			if self._thread is not None and self._thread.is_alive():
+				return
+			self._stopped = False
+			self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+			self._thread.start()
+
+	def submit(self, frame: np.ndarray, crop: Optional[Tuple[int, int, int, int]] = None) -> Future:
+		self._ensure_started()
+		req = _Request(frame=frame, crop=crop)
+		self._queue.put(req)
+		return req.future
+
+	def detect_frames(self, frames: Sequence[np.ndarray], crop: Optional[Tuple[int, int, int, int]] = None) -> List[Any]:
+		"""
+		Blocking helper: submit every frame (optionally restricted to crop) and wait
+		for all results, in order. Raises TimeoutError when they are not all done
+		within the executor's timeout; frames not started by then are cancelled.
+		"""
+		futures = [self.submit(frame, crop) for frame in frames]
+		if self.timeout <= 0:
+			return [f.result() for f in futures]
+		deadline = time.monotonic() + self.timeout
+		try:
+			return [f.result(timeout=max(0.0, deadline - time.monotonic())) for f in futures]
+		except FutureTimeout:
+			for f in futures:
+				f.cancel()
+			raise TimeoutError(f"{self.name}: no detection result within {self.timeout:g} s") from None
+
+	def shutdown(self) -> None:
+		self._stopped = True
+		self._queue.put(None)
+		thread = self._thread
+		if thread is not None:
+			thread.join(timeout=5.0)
+
+	def _collect_batch(self, first: _Request) -> List[_Request]:
+		batch = [first]
+		deadline = time.monotonic() + self.max_wait
+		while len(batch) < self.max_batch:
+			remaining = deadline - time.monotonic()
+			try:
+				if remaining > 0:
+					req = self._queue.get(timeout=remaining)
+				else:
+					req = self._queue.get_nowait()
+			except queue.Empty:
+				break
+			if req is None:
+				# Shutdown sentinel: finish this batch, then exit
+				self._queue.put(None)
+				break
+			batch.append(req)
+		return batch
+
+	def _finish_async(self, batch: List[_Request], inflight: threading.Semaphore, work: Future) -> None:
+		inflight.release()
+		try:
+			results = work.result()
+		except Exception as e:
+			logger.exception("Batch inference failed: %s", e)
+			for req in batch:
+				req.future.set_exception(e)
+			return
+		for req, dets in zip(batch, results):
+			req.future.set_result(dets)
+
+	def _run(self) -> None:
+		if self.torch_threads > 0:
+			try:
+				import torch
+				torch.set_num_threads(self.torch_threads)
+			except Exception:
+				pass
+		detector = None
+		# Set for detectors that run batches elsewhere (worker processes): bounds batches in flight
+		inflight: Optional[threading.Semaphore] = None
+		while True:
+			first = self._queue.get()
+			if first is None:
+				break
+			if inflight is not None:
+				# Every worker busy: wait here so the queue grows into a larger batch
+				inflight.acquire()
+			batch = self._collect_batch(first)
+			# 跳过调用方已取消的请求
+			batch = [req for req in batch if req.future.set_running_or_notify_cancel()]
+			if not batch:
+				if inflight is not None:
+					inflight.release()
+				continue
+			try:
+				if detector is None:
+					detector = self.detector_factory()
+					if hasattr(detector, "submit_batch"):
+						inflight = threading.BoundedSemaphore(getattr(detector, "max_inflight", 1))
+						inflight.acquire()
+				if inflight is not None:
+					work = detector.submit_batch(
+						[req.frame for req in batch],
+						crops=[req.crop for req in batch],
+					)
+					work.add_done_callback(functools.partial(self._finish_async, batch, inflight))
+					continue
+				results = detector.detect_frames(
+					[req.frame for req in batch],
+					max_batch=len(batch),
+					crops=[req.crop for req in batch],
+				)
+			except Exception as e:
+				logger.exception("Batch inference failed: %s", e)
+				if inflight is not None:
+					inflight.release()
+				for req in batch:
+					req.future.set_exception(e)
+				continue
+			for req, dets in zip(batch, results):
+				req.future.set_result(dets)
+			if self._stopped:
+				break
+
+		# Fail anything still queued so callers don't hang
+		while True:
+			try:
+				req = self._queue.get_nowait()
+			except queue.Empty:
+				break
+			if req is not None and req.future.set_running_or_notify_cancel():
+				req.future.set_exception(RuntimeError("inference executor stopped"))
+
+
+_executors: Dict[str, InferenceExecutor] = {}
+_executor_lock = threading.Lock()
+
+
+def get_executor(model_name: str | None = None) -> InferenceExecutor:
+	"""
+	One executor (owner thread + batching queue) per model; floors sharing a model share it.
+	"""
+	from .yolo_service import get_detector, resolve_model_name
+	model_name = model_name or resolve_model_name()
+	with _executor_lock:
+		executor = _executors.get(model_name)
+		if executor is None:
+			executor = InferenceExecutor(
+				functools.partial(get_detector, model_name),
+				max_batch=env_int("YOLO_MAX_BATCH_SIZE", 8),
+				max_wait_ms=env_float("INFERENCE_MAX_WAIT_MS", 10.0),
+				torch_threads=env_int("INFERENCE_TORCH_THREADS", 0),
+				name=f"inference-{model_name}",
+				timeout=env_float("INFERENCE_TIMEOUT_SECONDS", 120.0),
+			)
+			_executors[model_name] = executor
+		return executor
+
+
+def shutdown_executor() -> None:
+	with _executor_lock:
+		executors = list(_executors.values())
+		_executors.clear()
+	for executor in executors:
+		executor.shutdown()
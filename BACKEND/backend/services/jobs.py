@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional
+
+from .env import env_float, env_int
+
+
+logger = logging.getLogger("jobs")
+
+
+class JobQueueFull(Exception):
+	pass
+
+
+@dataclass
+class Job:
+	job_id: str
+	floor_id: str
+	status: str = "queued"  # queued | running | done | failed
+	created_at: float = 0.0
+	started_at: Optional[float] = None
+	finished_at: Optional[float] = None
+	result: Any = None
+	error: Optional[str] = None
+
+
+class JobQueue:
+	"""
+	Bounded in-process queue of floor refresh jobs run by a few worker threads.
+	A floor with a job still queued or running gets that job back instead of a new one.
+	Finished jobs are kept for ttl seconds so clients can poll the result. submit() and
+	get() return snapshots taken under the lock, never the Job the workers update.
+	"""
+
+	def __init__(self, max_queued: int = 64, workers: int = 2, ttl: float = 300.0) -> None:
+		self.ttl = ttl
+		self.workers = max(1, int(workers))
+		self._queue: "queue.Queue[Optional[tuple[Job, Callable[[], Any]]]]" = queue.Queue(maxsize=max(1, int(max_queued)))
+		self._jobs: Dict[str, Job] = {}
+		self._active: Dict[str, Job] = {}  # floor_id -> queued/running job
+		self._lock = threading.Lock()
+		self._threads: List[threading.Thread] = []
+
+	def _ensure_started(self) -> None:
+		if self._threads:
+			return
+		for i in range(self.workers):
+			thread = threading.Thread(target=self._run, name=f"refresh-job-{i}", daemon=True)
+			thread.start()
+			self._threads.append(thread)
+
+	def submit(self, floor_id: str, fn: Callable[[], Any]) -> Job:
+		with self._lock:
+			self._purge()
+			job = self._active.get(floor_id)
+			if job is not None:
+				return replace(job)
+			self._ensure_started()
+			job = Job(job_id=uuid.uuid4().hex, floor_id=floor_id, created_at=time.time())
+			try:
+				self._queue.put_nowait((job, fn))
+			except queue.Full:
+				raise JobQueueFull("refresh job queue is full")
+			self._jobs[job.job_id] = job
+			self._active[floor_id] = job
+			return replace(job)
+
+	def get(self, job_id: str) -> Optional[Job]:
+		with self._lock:
+			self._purge()
+			job = self._jobs.get(job_id)
+			return replace(job) if job is not None else None
+
+	def shutdown(self) -> None:
+		for _ in self._threads:
+			self._queue.put(None)
+		for thread in self._threads:
+			thread.join(timeout=5.0)
+		self._threads = []
+
+	def _purge(self) -> None:
+		cutoff = time.time() - self.ttl
+		expired = [
+			job_id for job_id, job in self._jobs.items()
+			if job.finished_at is not None and job.finished_at < cutoff
+		]
+		for job_id in expired:
+			del self._jobs[job_id]
+
+	def _run(self) -> None:
+		while True:
+			item = self._queue.get()
+			if item is None:
+				break
+			job, fn = item
+			with self._lock:
+				job.status = "running"
+				job.started_at = time.time()
+			status, result, error = "done", None, None
+			try:
+				result = fn()
+			except Exception as e:
+				logger.exception("Refresh job %s for floor %s failed: %s", job.job_id, job.floor_id, e)
+				status, error = "failed", str(e) or type(e).__name__
+			# One critical section: readers never see "done" without finished_at
+			with self._lock:
+				job.status = status
+				job.result = result
+				job.error = error
+				job.finished_at = time.time()
+				if self._active.get(job.floor_id) is job:
+					del self._active[job.floor_id]
+
+
+_job_queue: JobQueue | None = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+	global _job_queue
+	with _job_queue_lock:
+		if _job_queue is None:
+			_job_queue = JobQueue(
+				max_queued=env_int("JOB_QUEUE_SIZE", 64),
+				workers=env_int("JOB_WORKERS", 2),
+				ttl=env_float("JOB_RESULT_TTL_SECONDS", 300.0),
+			)
+		return _job_queue
+
+
+def shutdown_jobs() -> None:
+	global _job_queue
+	with _job_queue_lock:
+		jobs = _job_queue
+		_job_queue = None
+	if jobs is not None:
+		jobs.shutdown()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import cv2
+import numpy as np
+
+from .roi_loader import SeatRaster
+
+
+class MotionGate:
+	"""
+	Cheap per-floor change detector: downscaled grayscale frame differencing against a
+	reference frame, restricted to the union of the floor's desk_roi regions.
+	A seat counts as changed when at least `seat_fraction` of its pixels differ by more
+	than `pixel_th` gray levels.
+	"""
+
+	def __init__(self, raster: SeatRaster, width: int = 160, pixel_th: int = 25, seat_fraction: float = 0.02) -> None:
+		self.raster = raster
+		frame_w, frame_h = raster.frame_size
+		self.width = max(1, min(int(width), frame_w))
+		self.height = max(1, int(round(frame_h * self.width / frame_w)))
+		self.pixel_th = pixel_th
+		self.seat_fraction = seat_fraction
+		self.labels = cv2.resize(raster.label_map, (self.width, self.height), interpolation=cv2.INTER_NEAREST)
+		counts = raster.seat_counts(self.labels)
+		# Seats that vanish at this resolution get one pixel so they never divide by zero
+		self.seat_pixels = np.maximum(counts, 1)
+		self.reference: Optional[np.ndarray] = None
+
+	def prepare(self, frame: np.ndarray) -> np.ndarray:
+		gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+		small = cv2.resize(gray, (self.width, self.height), interpolation=cv2.INTER_AREA)
+		return cv2.GaussianBlur(small, (5, 5), 0)
+
+	def set_reference(self, frame: np.ndarray) -> None:
+		self.reference = self.prepare(frame)
+
+	def changed_seats(self, frames: Sequence[np.ndarray]) -> np.ndarray:
+		"""
+		(S,) bool mask of seats whose region differs from the reference in any of the frames.
+		Without a reference every seat counts as changed.
+		"""
+		num_seats = len(self.raster.seat_ids)
+		if self.reference is None:
+			return np.ones(num_seats, dtype=bool)
+		changed = np.zeros(num_seats, dtype=bool)
+		for frame in frames:
+			diff = cv2.absdiff(self.prepare(frame), self.reference) > self.pixel_th
+			counts = self.raster.seat_counts(self.labels[diff])
+			changed |= (counts / self.seat_pixels) >= self.seat_fraction
+		return changed
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+
+class SeatCounters:
+	"""
+	Per-seat hit counters of one floor: person hits, object hits and analyzed frames,
+	each an (S,) int64 array in seat config order (same order as SeatRaster.seat_ids).
+	"""
+
+	def __init__(self, num_seats: int) -> None:
+		self.person = np.zeros(num_seats, dtype=np.int64)
+		self.object = np.zeros(num_seats, dtype=np.int64)
+		self.frames = np.zeros(num_seats, dtype=np.int64)
+
+	def __len__(self) -> int:
+		return len(self.frames)
+
+	def add(self, hit_person: np.ndarray, hit_object: np.ndarray) -> None:
+		"""
+		Count one frame's (S,) hit masks, or a batch of them as (F, S).
+		"""
+		hit_person = np.atleast_2d(hit_person)
+		self.person += hit_person.sum(axis=0)
+		self.object += np.atleast_2d(hit_object).sum(axis=0)
+		self.frames += hit_person.shape[0]
+
+	def copy(self) -> "SeatCounters":
+		out = SeatCounters(0)
+		out.person = self.person.copy()
+		out.object = self.object.copy()
+		out.frames = self.frames.copy()
+		return out
+
+	def restore(self, other: "SeatCounters", mask: np.ndarray) -> None:
+		"""
+		Take other's counts for the seats selected by the (S,) mask.
+		"""
+		self.person[mask] = other.person[mask]
+		self.object[mask] = other.object[mask]
+		self.frames[mask] = other.frames[mask]
+
+	def presence(self, ratio: float) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		(person_present, object_present) (S,) bool masks: hit in at least `ratio` of the frames.
+		"""
+		frames = np.maximum(self.frames, 1)
+		return self.person / frames >= ratio, self.object / frames >= ratio
+
+
+class DecayedSeatRatios:
+	"""
+	Exponentially decayed per-seat hit ratios for continuous sampling. Each analyzed frame
+	(and its hits) is weighted by 0.5 ** (age / half_life), so the ratios are a
+	time-weighted mean over roughly the last few half-lives, whatever the sampling rate.
+	"""
+
+	def __init__(self, num_seats: int, half_life: float) -> None:
+		self.half_life = max(1e-3, float(half_life))
+		self.person = np.zeros(num_seats, dtype=np.float64)
+		self.object = np.zeros(num_seats, dtype=np.float64)
+		self.weight = 0.0
+		self.updated_ts: float | None = None
+		self.frames = 0
+
+	def add(self, hit_person: np.ndarray, hit_object: np.ndarray, ts: float) -> None:
+		if self.updated_ts is not None:
+			decay = 0.5 ** (max(0.0, ts - self.updated_ts) / self.half_life)
+			self.person *= decay
+			self.object *= decay
+			self.weight *= decay
+		self.person += hit_person
+		self.object += hit_object
+		self.weight += 1.0
+		self.updated_ts = ts
+		self.frames += 1
+
+	def ratios(self) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		(person_ratio, object_ratio) (S,) float arrays, comparable to PRESENCE_RATIO.
+		"""
+		weight = max(self.weight, 1e-9)
+		return self.person / weight, self.object / weight
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .env import env_float
+
+
+@dataclass
+class _FloorFlight:
+	future: Optional[Future] = None
+	finished_at: float = 0.0  # time.monotonic() of the last successful refresh
+	runs: int = 0
+	shared: int = 0
+	fresh_hits: int = 0
+
+
+class RefreshCoordinator:
+	"""
+	Per-floor single-flight for refresh_floor. While a refresh of a floor is running,
+	other callers wait for it instead of starting their own; a refresh that finished
+	less than `freshness` seconds ago is reused without running detection at all.
+	"""
+
+	def __init__(self, freshness: float = 2.0) -> None:
+		self.freshness = max(0.0, float(freshness))
+		self._floors: Dict[str, _FloorFlight] = {}
+		self._lock = threading.Lock()
+
+	def run(self, floor_id: str, refresh: Callable[[], Any], freshness: Optional[float] = None) -> Tuple[bool, Any]:
+		"""
+		Returns (ran, result): ran is True only for the caller that executed refresh(),
+		which also gets its result. Waiting callers see the leader's exception, if any.
+		"""
+		if freshness is None:
+			freshness = self.freshness
+		with self._lock:
+			flight = self._floors.setdefault(floor_id, _FloorFlight())
+			if flight.future is not None:
+				future = flight.future
+				flight.shared += 1
+				leader = False
+			elif freshness > 0 and time.monotonic() - flight.finished_at < freshness:
+				flight.fresh_hits += 1
+				return False, None
+			else:
+				future = Future()
+				flight.future = future
+				flight.runs += 1
+				leader = True
+
+		if not leader:
+			future.result()
+			return False, None
+
+		try:
+			result = refresh()
+		except BaseException as e:
+			future.set_exception(e)
+			raise
+		else:
+			future.set_result(None)
+			return True, result
+		finally:
+			with self._lock:
+				if future.exception() is None:
+					flight.finished_at = time.monotonic()
+				flight.future = None
+
+	def stats(self) -> Dict[str, Dict[str, int]]:
+		with self._lock:
+			return {
+				floor_id: {"runs": f.runs, "shared": f.shared, "fresh_hits": f.fresh_hits}
+				for floor_id, f in self._floors.items()
+			}
+
+
+_coordinator: RefreshCoordinator | None = None
+_coordinator_lock = threading.Lock()
+
+
+def get_refresh_coordinator() -> RefreshCoordinator:
+	global _coordinator
+	with _coordinator_lock:
+		if _coordinator is None:
+			_coordinator = RefreshCoordinator(freshness=env_float("REFRESH_FRESHNESS_SECONDS", 2.0))
+		return _coordinator
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
 import json
+import re
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
 
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 FLOORS_DIR = BASE_DIR / "config" / "floors"
 
+# Model names become file names under yolov11/weights: no path separators
+_MODEL_NAME_RE = re.compile(r"[A-Za-z0-9_.-]+")
+
 
 def _is_number(x: Any) -> bool:
 	return isinstance(x, (int, float)) and not isinstance(x, bool)
@@ -23,6 +32,31 @@ def _polygon_area(poly: List[List[float]]) -> float:
 	return abs(area) * 0.5
 
 
+def point_in_polygon(pt: Tuple[float, float], poly: List[List[float]]) -> bool:
+	"""
+	Ray casting algorithm for point-in-polygon
+	"""
+	x, y = pt
+	inside = False
+	n = len(poly)
+	for i in range(n):
+		x1, y1 = poly[i]
+		x2, y2 = poly[(i + 1) % n]
+		intersect = ((y1 > y) != (y2 > y)) and (x < (x2 - x1) * (y - y1) / (y2 - y1 + 1e-9) + x1)
+		if intersect:
+			inside = not inside
+	return inside
+
+
+def check_model_name(name: str) -> str:
+	"""
+	Return name if it is a plain checkpoint name ([A-Za-z0-9_.-]+), else raise ValueError.
+	"""
+	if not isinstance(name, str) or not _MODEL_NAME_RE.fullmatch(name):
+		raise ValueError(f"invalid model name {name!r}: use letters, digits, '_', '.' and '-' only")
+	return name
+
+
 def validate_floor_config(data: Dict[str, Any]) -> None:
 	if not isinstance(data, dict):
 		raise ValueError("config must be an object")
@@ -30,6 +64,10 @@ def validate_floor_config(data: Dict[str, Any]) -> None:
 		raise ValueError("floor_id must be a non-empty string")
 	if "stream_path" not in data or not isinstance(data["stream_path"], str) or not data["stream_path"]:
 		raise ValueError("stream_path must be a non-empty string")
+	if "live" in data and not isinstance(data["live"], bool):
+		raise ValueError("live must be a boolean")
+	if "model" in data and (not isinstance(data["model"], str) or not _MODEL_NAME_RE.fullmatch(data["model"])):
+		raise ValueError("model must be a checkpoint name of letters, digits, '_', '.' and '-'")
 
 	if "frame_size" in data:
 		fs = data["frame_size"]
@@ -87,3 +125,175 @@ def list_floor_ids() -> list[str]:
 	return sorted([p.stem for p in FLOORS_DIR.glob("*.json")])
 
 
+@dataclass
+class SeatRaster:
+	"""
+	A floor's desk_roi polygons compiled into a region label map.
+	Every distinct set of overlapping seats is one region: label_map[y, x] == r means
+	pixel (x, y) lies inside exactly the seats regions[r] marks (region 0 = no seat), so
+	a point on a shared desk edge counts for every seat whose polygon contains it.
+	The map may be downscaled from frame resolution by `scale`.
+	"""
+	seat_ids: List[str]
+	label_map: np.ndarray  # uint16, (H * scale, W * scale) region ids
+	regions: np.ndarray  # bool, (R, S) seats of each region; row 0 is all False
+	bboxes: np.ndarray  # int32, (S, 4) x1, y1, x2, y2 in frame pixels
+	frame_size: Tuple[int, int]  # (width, height)
+	scale: float
+	fingerprint: str
+
+	def region_index(self, points: np.ndarray) -> np.ndarray:
+		"""
+		Map (N, 2) frame-coordinate points to region ids (0 = outside every seat).
+		"""
+		points = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+		if points.shape[0] == 0:
+			return np.empty(0, dtype=np.int64)
+		h, w = self.label_map.shape
+		xs = np.clip((points[:, 0] * self.scale).astype(np.int64), 0, w - 1)
+		ys = np.clip((points[:, 1] * self.scale).astype(np.int64), 0, h - 1)
+		return self.label_map[ys, xs].astype(np.int64)
+
+	def hit_mask(self, points: np.ndarray) -> np.ndarray:
+		"""
+		Boolean (S,) mask of seats that contain at least one of the points.
+		"""
+		return self.regions[self.region_index(points)].any(axis=0)
+
+	def hit_masks(self, points: List[np.ndarray]) -> np.ndarray:
+		"""
+		(F, S) bool: row f marks the seats that contain at least one of points[f].
+		One label-map lookup for all frames.
+		"""
+		if not points:
+			return np.zeros((0, len(self.seat_ids)), dtype=bool)
+		pts = [np.asarray(p, dtype=np.float32).reshape(-1, 2) for p in points]
+		ids = self.region_index(np.concatenate(pts))
+		frame = np.repeat(np.arange(len(pts)), [len(p) for p in pts])
+		frame_regions = np.zeros((len(pts), len(self.regions)), dtype=bool)
+		frame_regions[frame, ids] = True
+		# Region 0 has no seats, so points outside every seat drop out here
+		return frame_regions @ self.regions
+
+	def seat_counts(self, region_ids: np.ndarray) -> np.ndarray:
+		"""
+		(S,) number of entries of region_ids (e.g. pixels of a label map) inside each seat.
+		"""
+		counts = np.bincount(np.asarray(region_ids).ravel(), minlength=len(self.regions))
+		return counts @ self.regions.astype(np.int64)
+
+	def union_bbox(self, margin: float = 0.0, mask: Optional[np.ndarray] = None) -> Tuple[int, int, int, int]:
+		"""
+		(x1, y1, x2, y2) covering every seat's bounding box (or those selected by the (S,)
+		mask), grown by `margin` times its width/height on each side and clipped to the frame.
+		"""
+		bboxes = self.bboxes if mask is None else self.bboxes[mask]
+		x1, y1 = bboxes[:, :2].min(axis=0)
+		x2, y2 = bboxes[:, 2:].max(axis=0)
+		mx = int(round((x2 - x1) * max(0.0, margin)))
+		my = int(round((y2 - y1) * max(0.0, margin)))
+		width, height = self.frame_size
+		return (
+			max(0, int(x1) - mx),
+			max(0, int(y1) - my),
+			min(width, int(x2) + mx),
+			min(height, int(y2) + my),
+		)
+
+
+def _norm_scale(scale: float) -> float:
+	return float(scale) if scale and scale > 0 else 1.0
+
+
+def _raster_fingerprint(data: Dict[str, Any], frame_size: Tuple[int, int], scale: float) -> str:
+	scale = _norm_scale(scale)
+	seats = [(s["seat_id"], s["desk_roi"]) for s in data["seats"]]
+	return json.dumps([seats, list(frame_size), scale], sort_keys=True)
+
+
+def compile_seat_raster(data: Dict[str, Any], frame_size: Tuple[int, int], scale: float = 1.0) -> SeatRaster:
+	"""
+	Rasterize every seat's desk_roi once into a uint16 region label map of
+	frame_size=(width, height), optionally downscaled by `scale`. Where polygons
+	overlap, the shared pixels get a region that belongs to all of those seats.
+	"""
+	width, height = int(frame_size[0]), int(frame_size[1])
+	scale = _norm_scale(scale)
+	map_w = max(1, int(round(width * scale)))
+	map_h = max(1, int(round(height * scale)))
+	seats = data["seats"]
+	max_regions = np.iinfo(np.uint16).max
+
+	label_map = np.zeros((map_h, map_w), dtype=np.uint16)
+	bboxes = np.zeros((len(seats), 4), dtype=np.int32)
+	# Region id -> set of seat indices, and the reverse lookup
+	members: List[frozenset] = [frozenset()]
+	region_of: Dict[frozenset, int] = {frozenset(): 0}
+	for i, s in enumerate(seats):
+		poly = np.asarray(s["desk_roi"], dtype=np.float64)
+		pts = np.round(poly * scale).astype(np.int32)
+		x1, y1 = np.floor(poly.min(axis=0)).astype(int)
+		x2, y2 = np.ceil(poly.max(axis=0)).astype(int)
+		bboxes[i] = (max(0, x1), max(0, y1), min(width, x2), min(height, y2))
+
+		# Fill the seat inside its own bounding window only
+		wx1, wy1 = np.clip(pts.min(axis=0), 0, [map_w - 1, map_h - 1])
+		wx2, wy2 = np.clip(pts.max(axis=0) + 1, 1, [map_w, map_h])
+		if wx2 <= wx1 or wy2 <= wy1:
+			continue
+		mask = np.zeros((wy2 - wy1, wx2 - wx1), dtype=np.uint8)
+		cv2.fillPoly(mask, [pts - np.array([wx1, wy1], dtype=np.int32)], color=1)
+		inside = mask.astype(bool)
+		window = label_map[wy1:wy2, wx1:wx2]
+		old_ids, inverse = np.unique(window[inside], return_inverse=True)
+		new_ids = []
+		for old in old_ids.tolist():
+			key = members[old] | {i}
+			region = region_of.get(key)
+			if region is None:
+				region = len(members)
+				if region >= max_regions:
+					raise ValueError("too many seat regions for a uint16 label map")
+				members.append(key)
+				region_of[key] = region
+			new_ids.append(region)
+		window[inside] = np.asarray(new_ids, dtype=np.uint16)[inverse.ravel()]
+
+	regions = np.zeros((len(members), len(seats)), dtype=bool)
+	for region, seat_set in enumerate(members):
+		regions[region, sorted(seat_set)] = True
+
+	return SeatRaster(
+		seat_ids=[s["seat_id"] for s in seats],
+		label_map=label_map,
+		regions=regions,
+		bboxes=bboxes,
+		frame_size=(width, height),
+		scale=scale,
+		fingerprint=_raster_fingerprint(data, (width, height), scale),
+	)
+
+
+_raster_cache: Dict[str, SeatRaster] = {}
+_raster_lock = threading.Lock()
+
+
+def get_seat_raster(data: Dict[str, Any], frame_size: Optional[Tuple[int, int]] = None, scale: float = 1.0) -> SeatRaster:
+	"""
+	Cached compile_seat_raster per floor. frame_size=(width, height) defaults to the
+	config's frame_size; the raster is rebuilt when the seats or frame size change.
+	"""
+	if frame_size is None:
+		if "frame_size" not in data:
+			raise ValueError("frame_size is required to compile the seat raster")
+		frame_size = (int(data["frame_size"][0]), int(data["frame_size"][1]))
+	key = data["floor_id"]
+	fingerprint = _raster_fingerprint(data, frame_size, scale)
+	with _raster_lock:
+		raster = _raster_cache.get(key)
+		if raster is not None and raster.fingerprint == fingerprint:
+			return raster
+	raster = compile_seat_raster(data, frame_size, scale)
+	with _raster_lock:
+		_raster_cache[key] = raster
+	return raster
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..models import Seat
+
+
+logger = logging.getLogger("seat_state")
+
+
+# Columns refresh_floor may skip writing while nothing else about a seat changed
+_TIME_COLUMNS = {"last_update_ts", "daily_empty_seconds", "total_empty_seconds"}
+
+# floor_id -> fingerprint of the seat list last provisioned in this process
+_provisioned: Dict[str, Tuple[Tuple[str, bool], ...]] = {}
+# Serialises the check-and-insert so two refreshes can't both insert a new floor's seats
+_provision_lock = threading.Lock()
+
+
+def provision_seats(db: Session, floor_id: str, seats_cfg: List[Dict[str, Any]], force: bool = False) -> None:
+	"""
+	Insert seats from the floor config that the DB doesn't have yet. Runs (and commits)
+	only when the floor's seat list differs from the one provisioned last time, or with force.
+	"""
+	fingerprint = tuple((str(s["seat_id"]), bool(s.get("has_power", 0))) for s in seats_cfg)
+	if not force and _provisioned.get(floor_id) == fingerprint:
+		return
+	with _provision_lock:
+		if not force and _provisioned.get(floor_id) == fingerprint:
+			return
+		_insert_missing_seats(db, floor_id, seats_cfg)
+		_provisioned[floor_id] = fingerprint
+
+
+def _insert_missing_seats(db: Session, floor_id: str, seats_cfg: List[Dict[str, Any]]) -> None:
+	existing_ids = {row[0] for row in db.query(Seat.seat_id).filter(Seat.floor_id == floor_id).all()}
+	added = False
+	for s in seats_cfg:
+		if s["seat_id"] not in existing_ids:
+			db.add(Seat(
+				seat_id=s["seat_id"],
+				floor_id=floor_id,
+				has_power=bool(s.get("has_power", 0)),
+				is_empty=True,
+				is_reported=False,
+				is_malicious=False,
+				lock_until_ts=0,
+				last_update_ts=0,
+				last_state_is_empty=True,
+				total_empty_seconds=0,
+				change_count=0,
+				occupancy_start_ts=0,
+			))
+			added = True
+	if added:
+		db.commit()
+
+
+# Seat columns the refresh reads/updates, and their Python types for the UPDATE rows
+_SEAT_STATE_COLUMNS = {
+	"last_update_ts": int,
+	"last_state_is_empty": bool,
+	"daily_empty_seconds": int,
+	"total_empty_seconds": int,
+	"change_count": int,
+	"occupancy_start_ts": int,
+	"is_empty": bool,
+	"is_malicious": bool,
+}
+
+
+def seat_updates(
+	seats: List[Seat],
+	now: int,
+	new_observed_is_empty: np.ndarray,
+	object_only: np.ndarray,
+	time_flush: int,
+) -> List[Tuple[Seat, Dict[str, Any]]]:
+	"""
+	New column values for every seat after a refresh, computed as (S,) array ops.
+	Returns (seat, changed columns) for the seats that need a write: any state change,
+	or time accounting that is at least time_flush seconds old. Time accounting alone is
+	deferred without loss, because the next write accumulates from the stored last_update_ts.
+	"""
+	if not seats:
+		return []
+	cur = {col: np.array([getattr(seat, col) or 0 for seat in seats], dtype=np.int64) for col in _SEAT_STATE_COLUMNS}
+	lock_until = np.array([seat.lock_until_ts or 0 for seat in seats], dtype=np.int64)
+	new = dict(cur)
+
+	# Update statistics regardless of lock; accumulate based on LAST state being empty
+	seen = cur["last_update_ts"] > 0
+	last_empty = cur["last_state_is_empty"].astype(bool)
+	delta = now - cur["last_update_ts"]
+	empty_delta = np.where(seen & last_empty & (delta > 0), delta, 0)
+	new["daily_empty_seconds"] = cur["daily_empty_seconds"] + empty_delta
+	new["total_empty_seconds"] = cur["total_empty_seconds"] + empty_delta
+	new["change_count"] = cur["change_count"] + (seen & (last_empty != new_observed_is_empty))
+	new["last_state_is_empty"] = new_observed_is_empty.astype(np.int64)
+	new["last_update_ts"] = np.full(len(seats), now, dtype=np.int64)
+
+	# Occupancy timer for malicious detection (object only)
+	occupancy = cur["occupancy_start_ts"]
+	new["occupancy_start_ts"] = np.where(object_only, np.where(occupancy == 0, now, occupancy), 0)
+
+	# Apply visual state only if not locked; malicious after 2h (7200s)
+	unlocked = now >= lock_until
+	new["is_empty"] = np.where(unlocked, new_observed_is_empty, cur["is_empty"]).astype(np.int64)
+	malicious = unlocked & (new["occupancy_start_ts"] != 0) & (now - new["occupancy_start_ts"] >= 7200)
+	new["is_malicious"] = cur["is_malicious"] | malicious
+
+	columns = list(_SEAT_STATE_COLUMNS)
+	changed = np.stack([new[col] != cur[col] for col in columns])  # (C, S)
+	is_time = np.array([col in _TIME_COLUMNS for col in columns])
+	state_changed = changed[~is_time].any(axis=0)
+	stale = changed[is_time].any(axis=0) & (now - cur["last_update_ts"] >= time_flush)
+
+	out: List[Tuple[Seat, Dict[str, Any]]] = []
+	for i in np.flatnonzero(state_changed | stale).tolist():
+		values = {
+			col: _SEAT_STATE_COLUMNS[col](new[col][i])
+			for c, col in enumerate(columns) if changed[c, i]
+		}
+		out.append((seats[i], values))
+	return out
+
+
+def write_seat_changes(db: Session, floor_id: str, changes: List[Tuple[Seat, Dict[str, Any]]]) -> None:
+	"""
+	Persist per-seat column changes with executemany UPDATEs (one per distinct set of
+	changed columns, usually one or two) and a single commit. Only changed columns are
+	written, so admin edits to other columns in between are not overwritten. The loaded
+	Seat objects get the new values as committed state (no extra SELECT, nothing dirty).
+	"""
+	if not changes:
+		return
+	table = Seat.__table__
+	groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+	for seat, values in changes:
+		columns = tuple(sorted(values))
+		row = {"b_seat_id": seat.seat_id}
+		row.update(values)
+		groups.setdefault(columns, []).append(row)
+	try:
+		for columns, rows in groups.items():
+			stmt = (
+				update(table)
+				.where(table.c.seat_id == bindparam("b_seat_id"))
+				.values({col: bindparam(col) for col in columns})
+			)
+			db.execute(stmt, rows)
+		expire_on_commit = db.expire_on_commit
+		db.expire_on_commit = False
+		try:
+			db.commit()
+		finally:
+			db.expire_on_commit = expire_on_commit
+	except Exception as e:
+		# 如果提交失败，回滚
+		try:
+			db.rollback()
+		except Exception:
+			pass
+		# 记录错误但不抛出异常，避免影响其他楼层
+		logger.error(f"Failed to commit seat updates for floor {floor_id}: {e}")
+		return
+	for seat, values in changes:
+		for key, value in values.items():
+			set_committed_value(seat, key, value)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+import numpy as np
+
+
+class SequentialSampler:
+	"""
+	Per-seat Wald sequential probability ratio test on the person/object hit indicators.
+
+	For each seat and category it tests H0: p <= threshold - delta against
+	H1: p >= threshold + delta, using the same hit counts refresh_floor keeps anyway.
+	Sampling can stop once every seat's log-likelihood ratio sits outside the
+	(lower, upper) band at the same frame count. Because the decision is taken on the
+	same frames the counters hold, the later `ratio >= threshold` check agrees with
+	the test as long as the clip stays short (a few dozen frames).
+	"""
+
+	def __init__(
+		self,
+		num_seats: int,
+		threshold: float = 0.3,
+		delta: float = 0.15,
+		alpha: float = 0.05,
+		beta: float = 0.05,
+		min_frames: int = 4,
+	) -> None:
+		p0 = min(max(threshold - delta, 1e-3), 1 - 1e-3)
+		p1 = min(max(threshold + delta, 1e-3), 1 - 1e-3)
+		self.hit_llr = math.log(p1 / p0)
+		self.miss_llr = math.log((1 - p1) / (1 - p0))
+		self.upper = math.log((1 - beta) / alpha)
+		self.lower = math.log(beta / (1 - alpha))
+		self.min_frames = max(1, int(min_frames))
+		self.hits = np.zeros((num_seats, 2), dtype=np.int64)  # [:, 0] person, [:, 1] object
+		self.frames = 0
+
+	def update(self, hit_person: np.ndarray, hit_object: np.ndarray) -> None:
+		"""
+		Add one frame's (S,) hit masks, or a batch of them as (F, S).
+		"""
+		hit_person = np.atleast_2d(hit_person)
+		self.hits[:, 0] += hit_person.sum(axis=0)
+		self.hits[:, 1] += np.atleast_2d(hit_object).sum(axis=0)
+		self.frames += hit_person.shape[0]
+
+	def llr(self) -> np.ndarray:
+		return self.hits * self.hit_llr + (self.frames - self.hits) * self.miss_llr
+
+	def settled(self, mask: Optional[np.ndarray] = None) -> bool:
+		"""
+		True when every seat (or every seat in mask) has both tests decided.
+		"""
+		if self.frames < self.min_frames:
+			return False
+		llr = self.llr()
+		decided = ((llr >= self.upper) | (llr <= self.lower)).all(axis=1)
+		if mask is not None:
+			decided = decided | ~mask
+		return bool(decided.all())
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .env import env_flag, env_float
+from .occupancy import DecayedSeatRatios
+from .roi_loader import get_seat_raster
+
+
+logger = logging.getLogger("streaming")
+
+
+class FloorStreamSampler:
+	"""
+	Continuous low-rate sampling for one floor (STREAM_SAMPLING=1). A thread analyzes
+	`rate` frames per second spread evenly over time instead of one contiguous burst
+	per refresh: video files read one frame and grab() past the next fps / rate - 1
+	(paced to wall-clock time), live cameras take the freshest frame the reader kept.
+	Each frame goes through the model's inference executor and its seat hits are folded
+	into exponentially decayed per-seat ratios; refresh_floor only publishes them.
+	"""
+
+	def __init__(self, floor_id: str, floor_cfg: Dict[str, Any], vstate: Any, executor: Any, rate: float, half_life: float) -> None:
+		self.floor_id = floor_id
+		self.floor_cfg = floor_cfg
+		self.vstate = vstate
+		self.executor = executor
+		self.rate = max(0.01, float(rate))
+		self.half_life = half_life
+		# With no analyzed frame for this long the estimate is not published
+		self.stale_after = max(5.0, 5.0 / self.rate)
+		self._raster: Any = None
+		self._ratios: Optional[DecayedSeatRatios] = None
+		self._lock = threading.Lock()
+		self._stop = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+
+	def start(self) -> None:
+		if self._thread is not None and self._thread.is_alive():
+			return
+		self._stop.clear()
+		self._thread = threading.Thread(target=self._run, name=f"stream-{self.floor_id}", daemon=True)
+		self._thread.start()
+
+	def stop(self) -> None:
+		self._stop.set()
+		thread = self._thread
+		if thread is not None and thread is not threading.current_thread():
+			thread.join(timeout=5.0)
+
+	def is_alive(self) -> bool:
+		return self._thread is not None and self._thread.is_alive()
+
+	def update_config(self, floor_cfg: Dict[str, Any], executor: Any) -> None:
+		self.floor_cfg = floor_cfg
+		self.executor = executor
+
+	def estimate(self, seat_ids: List[str]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+		"""
+		Current (person_ratio, object_ratio) per seat in seat_ids order, or None when
+		nothing recent was analyzed for this seat layout.
+		"""
+		with self._lock:
+			if self._ratios is None or self._ratios.updated_ts is None or self._raster.seat_ids != seat_ids:
+				return None
+			if time.monotonic() - self._ratios.updated_ts > self.stale_after:
+				return None
+			person, obj = self._ratios.ratios()
+			return person.copy(), obj.copy()
+
+	def _next_frame(self) -> Optional[np.ndarray]:
+		if self.vstate.live:
+			frames = self.vstate.decoder.latest(1) if self.vstate.decoder is not None else []
+			return frames[-1] if frames else None
+		cap = self.vstate.cap
+		ret, frame = cap.read()
+		if (not ret or frame is None) and self.vstate.total_frames > 0:
+			cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+			ret, frame = cap.read()
+		if not ret or frame is None:
+			return None
+		# Skip ahead so the file plays at wall-clock speed between samples
+		for _ in range(max(0, int(round(self.vstate.fps / self.rate)) - 1)):
+			if not cap.grab():
+				if self.vstate.total_frames <= 0 or not cap.set(cv2.CAP_PROP_POS_FRAMES, 0):
+					break
+		return frame
+
+	def _analyze(self, frame: np.ndarray, ts: float) -> None:
+		h, w = frame.shape[:2]
+		cfg = self.floor_cfg
+		raster = get_seat_raster(cfg, (w, h), env_float("ROI_RASTER_SCALE", 1.0))
+		crop = raster.union_bbox(env_float("YOLO_ROI_CROP_MARGIN", 0.1)) if env_flag("YOLO_ROI_CROP", False) else None
+		dets = self.executor.detect_frames([frame], crop)[0]
+		hit_person = raster.hit_mask(dets.centers(dets.person))
+		hit_object = raster.hit_mask(dets.centers(dets.object))
+		with self._lock:
+			if raster is not self._raster:
+				# New floor layout or frame size: start a fresh estimate
+				self._raster = raster
+				self._ratios = DecayedSeatRatios(len(raster.seat_ids), self.half_life)
+			self._ratios.add(hit_person, hit_object, ts)
+
+	def _run(self) -> None:
+		period = 1.0 / self.rate
+		next_tick = time.monotonic()
+		while not self._stop.is_set():
+			try:
+				frame = self._next_frame()
+				if frame is not None:
+					self._analyze(frame, time.monotonic())
+			except Exception as e:
+				logger.warning("Stream sampling for floor %s failed: %s", self.floor_id, e)
+			next_tick += period
+			delay = next_tick - time.monotonic()
+			if delay < 0:
+				# Falling behind: drop the missed ticks instead of bursting to catch up
+				next_tick = time.monotonic()
+				delay = 0.0
+			self._stop.wait(delay)
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import torch
+
+from .inference_backends import batch_buckets
+from .yolo_util import ensure_yolo_path
+
+
+logger = logging.getLogger("torch_backend")
+
+
+def load_torch_model(
+	weights_path: Path,
+	device: str,
+	fuse: bool = False,
+	channels_last: bool = False,
+) -> Tuple[torch.nn.Module, Dict[str, Any]]:
+	"""
+	Load a yolov11 checkpoint ({"model": YOLO, ...}) for inference on device.
+	fuse folds every Conv+BN pair (YOLO.fuse) before the model is moved or halved.
+	"""
+	ensure_yolo_path()
+	ckpt = torch.load(Path(weights_path).as_posix(), map_location="cpu", weights_only=False)
+	model = ckpt["model"].float().eval()
+	if fuse and hasattr(model, "fuse"):
+		model.fuse()
+	model = model.to(device)
+	if device.startswith("cuda"):
+		model.half()
+	if channels_last:
+		model = model.to(memory_format=torch.channels_last)
+	model.eval()
+	return model, ckpt
+
+
+class DetectOutput(torch.nn.Module):
+	"""Only the decoded predictions, not the raw per-level feature maps (for tracing/export)."""
+
+	def __init__(self, model: torch.nn.Module) -> None:
+		super().__init__()
+		self.model = model
+
+	def forward(self, x):
+		out = self.model(x)
+		return out[0] if isinstance(out, (list, tuple)) else out
+
+
+def traced_artifact_path(
+	cache_dir: Path,
+	model_name: str,
+	weights_sha: str,
+	batch: int,
+	imgsz: int,
+	device: str,
+	fused: bool = False,
+	channels_last: bool = False,
+) -> Path:
+	kind = "cuda" if device.startswith("cuda") else "cpu"
+	version = torch.__version__.split("+")[0]
+	# Fused and unfused graphs (and NCHW / NHWC ones) are different programs
+	layout = ("fused" if fused else "unfused") + (".nhwc" if channels_last else ".nchw")
+	return Path(cache_dir) / f"{model_name}.{weights_sha[:16]}.b{batch}x{imgsz}.{layout}.{kind}.torch{version}.ts"
+
+
+class TorchBackend:
+	"""
+	PyTorch inference. Takes NCHW RGB batches (uint8, or float32 already scaled to
+	[0, 1]), returns raw Detect output.
+
+	With trace_dir set, the model is traced with torch.jit (fixed imgsz x imgsz input)
+	once per batch bucket (batch_buckets(max_batch)), frozen and cached on disk under a
+	name keyed by the weights hash and build flags, so later processes load the graph
+	instead of tracing again. Smaller batches are zero-padded up to their bucket; batches
+	above max_batch and tracing errors fall back to eager mode.
+	"""
+	name = "torch"
+
+	def __init__(
+		self,
+		model: torch.nn.Module,
+		device: str,
+		channels_last: bool = False,
+		trace_dir: Optional[Path] = None,
+		model_name: str = "model",
+		weights_sha: str = "",
+		imgsz: int = 640,
+		max_batch: int = 8,
+		fused: bool = False,
+	) -> None:
+		self.model = model
+		self.device = device
+		self.channels_last = channels_last
+		self.trace_dir = Path(trace_dir) if trace_dir is not None else None
+		self.model_name = model_name
+		self.weights_sha = weights_sha
+		self.imgsz = imgsz
+		self.fused = fused
+		self.buckets = batch_buckets(max_batch)
+		self._graphs: Dict[int, Any] = {}
+		# CPU: normalize on the host in the preprocessing pass; GPU: ship uint8, normalize on device
+		self.input_dtype = np.uint8 if device.startswith("cuda") else np.float32
+
+	def _trace(self, x: torch.Tensor) -> Any:
+		path = traced_artifact_path(
+			self.trace_dir,
+			self.model_name,
+			self.weights_sha,
+			x.shape[0],
+			self.imgsz,
+			self.device,
+			fused=self.fused,
+			channels_last=self.channels_last,
+		)
+		if path.exists():
+			try:
+				return torch.jit.load(path.as_posix(), map_location=self.device)
+			except Exception as e:
+				logger.warning("Discarding unreadable traced graph %s: %s", path.as_posix(), e)
+		# Trace the allocating Detect path; static-shape buffers must not become graph constants
+		detect = getattr(self.model, "detect", None)
+		static = getattr(detect, "static", False)
+		if static:
+			detect.static = False
+		try:
+			with torch.no_grad():
+				graph = torch.jit.trace(DetectOutput(self.model), x, check_trace=False)
+				graph = torch.jit.freeze(graph.eval())
+		except Exception as e:
+			logger.warning("Tracing failed, using eager mode: %s", e)
+			return self.model
+		finally:
+			if static:
+				detect.static = True
+		try:
+			path.parent.mkdir(parents=True, exist_ok=True)
+			tmp = path.with_name(path.name + ".tmp")
+			torch.jit.save(graph, tmp.as_posix())
+			tmp.replace(path)
+		except Exception as e:
+			logger.warning("Could not cache traced graph at %s: %s", path.as_posix(), e)
+		return graph
+
+	def _bucket(self, x: torch.Tensor) -> int:
+		"""
+		Batch size of the traced graph that serves x, or 0 to run x in eager mode.
+		"""
+		if self.trace_dir is None or tuple(x.shape[2:]) != (self.imgsz, self.imgsz):
+			return 0
+		for size in self.buckets:
+			if size >= x.shape[0]:
+				return size
+		return 0
+
+	def _graph(self, x: torch.Tensor) -> Any:
+		graph = self._graphs.get(x.shape[0])
+		if graph is None:
+			graph = self._trace(x)
+			self._graphs[x.shape[0]] = graph
+		return graph
+
+	@torch.no_grad()
+	def __call__(self, images: np.ndarray) -> Any:
+		x = torch.from_numpy(images).to(self.device)
+		if self.device.startswith("cuda"):
+			x = x.half()
+		elif x.dtype != torch.float32:
+			x = x.float()
+		if images.dtype == np.uint8:
+			x = x / 255
+		n = x.shape[0]
+		bucket = self._bucket(x)
+		if bucket == 0:
+			if self.channels_last:
+				x = x.contiguous(memory_format=torch.channels_last)
+			return self.model(x)
+		if bucket > n:
+			# Zero frames pad the batch to a traced size; their predictions are dropped below
+			x = torch.cat([x, x.new_zeros((bucket - n, *x.shape[1:]))])
+		if self.channels_last:
+			x = x.contiguous(memory_format=torch.channels_last)
+		graph = self._graph(x)
+		if graph is self.model:
+			# Tracing failed for this size: eager mode, no padding needed
+			return self.model(x[:n])
+		return graph(x)[:n]
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+	"""
+	(A, B) IoU matrix between (A, 4) and (B, 4) x1, y1, x2, y2 boxes.
+	"""
+	if len(a) == 0 or len(b) == 0:
+		return np.zeros((len(a), len(b)), dtype=np.float32)
+	x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+	y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+	x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+	y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+	inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+	area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+	area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+	return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-6)
+
+
+class IoUTracker:
+	"""
+	Lightweight multi-object tracker for detect-sparse, track-dense counting.
+
+	Tracks live in (T, ...) arrays: box, per-frame velocity, class, score and the
+	person/object masks of the detection that started them. update() takes a detector
+	result: every track is predicted forward with constant velocity, tracks and boxes
+	of the same class are paired greedily by IoU, matched tracks jump to the detected
+	box and blend the observed motion into their velocity (an alpha filter instead of
+	a full Kalman filter), new boxes start tracks and tracks unmatched for more than
+	max_misses detector frames are dropped. predict() covers the frames in between.
+	Each call advances one frame and returns a FrameDetections of the tracked boxes.
+	"""
+
+	def __init__(self, iou_th: float = 0.3, max_misses: int = 1, alpha: float = 0.5) -> None:
+		self.iou_th = iou_th
+		self.max_misses = max(0, int(max_misses))
+		self.alpha = alpha
+		self.boxes = np.zeros((0, 4), dtype=np.float32)
+		self.velocity = np.zeros((0, 4), dtype=np.float32)
+		self.cls = np.zeros(0, dtype=np.float32)
+		self.scores = np.zeros(0, dtype=np.float32)
+		self.person = np.zeros(0, dtype=bool)
+		self.object = np.zeros(0, dtype=bool)
+		self.misses = np.zeros(0, dtype=np.int64)
+		# Frames since the last update()
+		self.age = 0
+		self._template: Any = None
+
+	def __len__(self) -> int:
+		return len(self.boxes)
+
+	def _output(self, boxes: np.ndarray) -> Any:
+		rows = np.concatenate([boxes, self.scores[:, None], self.cls[:, None]], axis=1).astype(np.float32)
+		return self._template.replace(rows, self.person.copy(), self.object.copy())
+
+	def predict(self) -> Any:
+		"""
+		Tracked boxes for the next frame without a detector result.
+		"""
+		self.age += 1
+		if self._template is None:
+			return None
+		return self._output(self.boxes + self.velocity * self.age)
+
+	def update(self, dets: Any) -> Any:
+		"""
+		Fold the detector result for the next frame into the tracks.
+		"""
+		self._template = dets
+		steps = self.age + 1
+		self.age = 0
+		predicted = self.boxes + self.velocity * steps
+		det_boxes = dets.boxes[:, :4]
+
+		iou = box_iou(predicted, det_boxes)
+		iou[self.cls[:, None] != dets.boxes[None, :, 5]] = 0.0
+		track_idx, det_idx = np.nonzero(iou >= self.iou_th)
+		order = np.argsort(-iou[track_idx, det_idx], kind="stable")
+		matched_tracks = np.zeros(len(self.boxes), dtype=bool)
+		matched_dets = np.zeros(len(det_boxes), dtype=bool)
+		for t, d in zip(track_idx[order].tolist(), det_idx[order].tolist()):
+			if matched_tracks[t] or matched_dets[d]:
+				continue
+			matched_tracks[t] = True
+			matched_dets[d] = True
+			observed = (det_boxes[d] - self.boxes[t]) / steps
+			self.velocity[t] = self.alpha * observed + (1 - self.alpha) * self.velocity[t]
+			self.boxes[t] = det_boxes[d]
+			self.scores[t] = dets.boxes[d, 4]
+			self.misses[t] = 0
+
+		# Unmatched tracks coast on their prediction for a few detector frames
+		self.boxes[~matched_tracks] = predicted[~matched_tracks]
+		self.misses[~matched_tracks] += 1
+		keep = self.misses <= self.max_misses
+		new = ~matched_dets
+		self.boxes = np.concatenate([self.boxes[keep], det_boxes[new]]).astype(np.float32)
+		self.velocity = np.concatenate([self.velocity[keep], np.zeros((int(new.sum()), 4), dtype=np.float32)])
+		self.cls = np.concatenate([self.cls[keep], dets.boxes[new, 5]]).astype(np.float32)
+		self.scores = np.concatenate([self.scores[keep], dets.boxes[new, 4]]).astype(np.float32)
+		self.person = np.concatenate([self.person[keep], dets.person[new]])
+		self.object = np.concatenate([self.object[keep], dets.object[new]])
+		self.misses = np.concatenate([self.misses[keep], np.zeros(int(new.sum()), dtype=np.int64)])
+		return self._output(self.boxes)
+
+
+def detect_sparse(
+	frames: Sequence[np.ndarray],
+	detect: Callable[[List[np.ndarray]], List[Any]],
+	tracker: Optional[IoUTracker],
+	every: int,
+	start: int = 0,
+) -> List[Any]:
+	"""
+	One FrameDetections per frame. Frames whose clip index (start + i) is a multiple of
+	`every` go through detect() in a single call; with a tracker, every frame is answered
+	from its tracks, so the frames in between get constant-velocity predictions.
+	"""
+	every = max(1, int(every))
+	if tracker is None or every == 1:
+		return detect(list(frames))
+	keys = [i for i in range(len(frames)) if (start + i) % every == 0]
+	key_dets = dict(zip(keys, detect([frames[i] for i in keys]))) if keys else {}
+	out: List[Any] = []
+	for i in range(len(frames)):
+		dets = tracker.update(key_dets[i]) if i in key_dets else tracker.predict()
+		if dets is not None:
+			out.append(dets)
+	return out
@@ -1,44 +1,60 @@
 from __future__ import annotations
 
+import functools
 import time
 import threading
 from dataclasses import dataclass
-import os
 from pathlib import Path
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Sequence, Tuple, Any
 
 import cv2
 import numpy as np
-import torch
 from sqlalchemy.orm import Session
 
 from ..models import Seat
+from .cascade import CascadeStats, ModelCascade
+from .decoder import FrameDecoder, LiveStreamReader
+from .detections import (  # noqa: F401 (re-exported)
+	OBJECT_NAMES_DEFAULT,
+	Crop,
+	Detection,
+	FrameDetections,
+	SeatClasses,
+	boxes_to_detections,
+	seat_classes,
+)
+from .env import env_flag, env_float, env_int, env_str
+from .inference_backends import (
+	OnnxBackend,
+	batch_buckets,
+	int8_artifact_path,
+	non_max_suppression_numpy,
+	onnx_artifact_path,
+	pruned_weights_path,
+	read_artifact_meta,
+	weights_sha256,
+)
+from .inference_executor import get_executor
+from .motion import MotionGate
+from .occupancy import SeatCounters
+from .roi_loader import SeatRaster, check_model_name, get_seat_raster, point_in_polygon  # noqa: F401 (point_in_polygon re-exported)
+from .seat_state import provision_seats, seat_updates, write_seat_changes
+from .sequential import SequentialSampler
+from .streaming import FloorStreamSampler
+from .tracker import IoUTracker, detect_sparse
 from .rollover import perform_rollovers_if_needed
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 YOLO_DIR = BASE_DIR / "yolov11"
-from .yolo_util import util  # type: ignore
+from .yolo_util import preprocess  # type: ignore
 
 
-OBJECT_NAMES_DEFAULT = {
-	"backpack", "handbag", "suitcase", "book", "laptop", "cell phone",
-	"mouse", "keyboard", "bottle", "cup", "umbrella","scissors"
-}
-
-
-@dataclass
-class Detection:
-	x1: float
-	y1: float
-	x2: float
-	y2: float
-	score: float
-	cls_name: str
-
-	@property
-	def center(self) -> Tuple[float, float]:
-		return (self.x1 + self.x2) / 2.0, (self.y1 + self.y2) / 2.0
+# A seat counts a person/object as present when it is hit in at least this share of frames
+PRESENCE_RATIO = 0.3
 
+# Checkpoints live in yolov11/weights/<name>.pt; sizes follow yolov11/nets/nn.py (yolo_v11_n ... x)
+DEFAULT_MODEL = "yolo11x"
+MODEL_SIZES = ("n", "s", "m", "l", "x")
 
 @dataclass
 class VideoState:
@@ -47,6 +63,8 @@ class VideoState:
 	fps: float
 	next_frame_idx: int
 	stream_path: str
+	decoder: Optional[FrameDecoder | LiveStreamReader] = None
+	live: bool = False
 
 
 _video_states: Dict[str, VideoState] = {}
@@ -54,7 +72,53 @@ _video_locks: Dict[str, threading.Lock] = {}
 _global_video_lock = threading.Lock()  # 保护全局字典的锁
 
 
-def _open_or_get_video_state(floor_id: str, stream_path: str) -> VideoState:
+LIVE_SCHEMES = ("rtsp://", "rtsps://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+
+
+def is_live_source(floor_cfg: Dict[str, Any]) -> bool:
+	"""
+	Live camera streams are flagged with "live": true or recognised by their URL scheme.
+	"""
+	if "live" in floor_cfg:
+		return bool(floor_cfg["live"])
+	return str(floor_cfg.get("stream_path", "")).lower().startswith(LIVE_SCHEMES)
+
+
+def _stop_readers(floor_id: str, state: VideoState) -> None:
+	"""
+	Stop everything reading the floor's old state (sampler, decoder) before its capture is
+	released or replaced. Callers hold the floor lock.
+	"""
+	_stop_stream(floor_id)
+	if state.decoder is not None:
+		state.decoder.stop()
+		state.decoder = None
+
+
+def _open_live_state(floor_id: str, stream_path: str, state: VideoState | None) -> VideoState:
+	if state is not None and state.live and state.stream_path == stream_path and state.decoder is not None and state.decoder.is_alive():
+		return state
+	if state is not None:
+		_stop_readers(floor_id, state)
+		if state.cap is not None:
+			try:
+				state.cap.release()
+			except Exception:
+				pass
+	reader = LiveStreamReader(
+		floor_id,
+		stream_path,
+		capacity=env_int("LIVE_BUFFER_FRAMES", 30),
+		max_frame_age=env_float("LIVE_MAX_FRAME_AGE_SECONDS", 5.0),
+		backoff_max=env_float("LIVE_RECONNECT_MAX_SECONDS", 30.0),
+	)
+	reader.start()
+	state = VideoState(cap=None, total_frames=0, fps=30.0, next_frame_idx=0, stream_path=stream_path, decoder=reader, live=True)
+	_video_states[floor_id] = state
+	return state
+
+
+def _open_or_get_video_state(floor_id: str, stream_path: str, live: bool = False) -> VideoState:
 	# 获取或创建该楼层的锁
 	with _global_video_lock:
 		if floor_id not in _video_locks:
@@ -64,6 +128,12 @@ def _open_or_get_video_state(floor_id: str, stream_path: str) -> VideoState:
 	# 使用楼层锁保护视频状态访问
 	with floor_lock:
 		state = _video_states.get(floor_id)
+		if live:
+			return _open_live_state(floor_id, stream_path, state)
+		if state and state.live:
+			# Switched from a live stream back to a file
+			_stop_readers(floor_id, state)
+			state = None
 		if state and state.stream_path == stream_path:
 			# 检查视频句柄是否仍然有效
 			try:
@@ -71,18 +141,22 @@ def _open_or_get_video_state(floor_id: str, stream_path: str) -> VideoState:
 					return state
 				else:
 					# 视频句柄已关闭，需要重新打开
+					_stop_readers(floor_id, state)
 					try:
 						state.cap.release()
 					except Exception:
 						pass
 			except Exception:
 				# 如果检查失败，尝试释放并重新打开
+				_stop_readers(floor_id, state)
 				try:
 					state.cap.release()
 				except Exception:
 					pass
 		
 		# 需要创建新的视频句柄
+		if state is not None:
+			_stop_readers(floor_id, state)
 		cap = cv2.VideoCapture(stream_path)
 		if not cap.isOpened():
 			# create a dummy state to avoid reopening loop
@@ -101,109 +175,492 @@ def _open_or_get_video_state(floor_id: str, stream_path: str) -> VideoState:
 		return state
 
 
-class YOLODetector:
-	def __init__(self) -> None:
-		self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
-		weights_path = YOLO_DIR / "weights" / "yolo11x.pt"
-		ckpt = torch.load(weights_path.as_posix(), map_location=self.device, weights_only=False)
-		self.model = ckpt["model"].float().to(self.device)
-		if self.device.startswith("cuda"):
-			self.model.half()
-		self.model.eval()
-		# Load names from args.yaml
-		import yaml
-		with (YOLO_DIR / "utils" / "args.yaml").open("r", encoding="utf-8") as f:
-			params = yaml.safe_load(f)
-		self.names = params.get("names", {})
-		self.person_name = "person"
-		self.object_names = OBJECT_NAMES_DEFAULT
+def _refresh_step_frames(vstate: VideoState) -> int:
+	"""
+	Frames between the starts of two refresh windows (wall-clock refresh interval).
+	"""
+	interval_seconds = env_int("REFRESH_INTERVAL_SECONDS", 5)
+	return int(round(max(0.0, vstate.fps) * max(0, interval_seconds)))
 
-	@torch.no_grad()
-	def detect_frame(self, frame: np.ndarray, conf_th: float = 0.15, iou_th: float = 0.2) -> List[Detection]:
-		shape = frame.shape[:2]  # (h, w)
-		image = frame.copy()
-
-		# Resize short edge to <= inp_size (letterbox)
-		inp_size = 640
-		r = inp_size / max(shape[0], shape[1])
-		if r != 1:
-			resample = cv2.INTER_LINEAR if r > 1 else cv2.INTER_AREA
-			image = cv2.resize(image, dsize=(int(shape[1] * r), int(shape[0] * r)), interpolation=resample)
-		height, width = image.shape[:2]
-
-		# Scale ratio (new / old)
-		r = min(1.0, inp_size / height, inp_size / width)
-
-		# Compute padding
-		pad = int(round(width * r)), int(round(height * r))
-		w = (inp_size - pad[0]) / 2
-		h = (inp_size - pad[1]) / 2
-
-		if (width, height) != pad:  # resize
-			image = cv2.resize(image, pad, interpolation=cv2.INTER_LINEAR)
-		top, bottom = int(round(h - 0.1)), int(round(h + 0.1))
-		left, right = int(round(w - 0.1)), int(round(w + 0.1))
-		image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT)
-
-		# To tensor
-		x = image.transpose((2, 0, 1))[::-1]
-		x = np.ascontiguousarray(x)
-		x = torch.from_numpy(x).unsqueeze(0).to(self.device)
-		if self.device.startswith("cuda"):
-			x = x.half()
+
+def _ensure_decoder(floor_id: str, vstate: VideoState, sample_frames: int) -> FrameDecoder:
+	"""
+	Start (or restart) the floor's background decoder. Callers hold the floor lock.
+	"""
+	decoder = vstate.decoder
+	if decoder is None or not decoder.is_alive() or decoder.sample_frames != sample_frames:
+		if decoder is not None:
+			decoder.stop()
+		decoder = FrameDecoder(
+			floor_id,
+			vstate.cap,
+			total_frames=vstate.total_frames,
+			sample_frames=sample_frames,
+			step_frames=_refresh_step_frames(vstate) or sample_frames,
+			windows=env_int("VIDEO_DECODER_WINDOWS", 2),
+		)
+		if vstate.next_frame_idx > 0 and vstate.total_frames > 0:
+			# Continue where inline reads left off
+			try:
+				vstate.cap.set(cv2.CAP_PROP_POS_FRAMES, vstate.next_frame_idx)
+			except Exception:
+				pass
+		vstate.decoder = decoder
+		decoder.start()
+	return decoder
+
+
+_streams: Dict[str, FloorStreamSampler] = {}
+
+
+def _ensure_stream(floor_id: str, floor_cfg: Dict[str, Any], vstate: VideoState, model_name: str) -> FloorStreamSampler:
+	"""
+	Start (or restart) the floor's continuous sampler. Callers hold the floor lock.
+	"""
+	executor = get_executor(model_name)
+	stream = _streams.get(floor_id)
+	if stream is not None and stream.vstate is vstate and stream.is_alive():
+		stream.update_config(floor_cfg, executor)
+		return stream
+	if stream is not None:
+		stream.stop()
+	if not vstate.live and vstate.decoder is not None:
+		# The sampler reads the file handle itself
+		vstate.decoder.stop()
+		vstate.decoder = None
+	stream = FloorStreamSampler(
+		floor_id,
+		floor_cfg,
+		vstate,
+		executor,
+		rate=env_float("STREAM_SAMPLE_FPS", 2.0),
+		half_life=env_float("STREAM_HALF_LIFE_SECONDS", 5.0),
+	)
+	_streams[floor_id] = stream
+	stream.start()
+	return stream
+
+
+def _stop_stream(floor_id: str) -> None:
+	"""
+	Stop the floor's continuous sampler (STREAM_SAMPLING was turned off). Callers hold the floor lock.
+	"""
+	stream = _streams.pop(floor_id, None)
+	if stream is not None:
+		stream.stop()
+
+
+def stream_health() -> List[Dict[str, Any]]:
+	"""
+	Reader/decoder status for every floor that has been refreshed at least once.
+	"""
+	with _global_video_lock:
+		items = sorted(_video_states.items())
+	out: List[Dict[str, Any]] = []
+	for floor_id, state in items:
+		if state.decoder is not None:
+			info = state.decoder.health()
 		else:
-			x = x.float()
-		x = x / 255
+			opened = False
+			try:
+				opened = bool(state.cap is not None and state.cap.isOpened())
+			except Exception:
+				pass
+			info = {
+				"connected": opened,
+				"buffered_frames": 0,
+				"last_frame_age_seconds": None,
+				"reconnects": 0,
+				"fps": state.fps,
+				"last_error": None,
+			}
+		info.update({"floor_id": floor_id, "stream_path": state.stream_path, "live": state.live})
+		out.append(info)
+	return out
+
+
+def stop_video_decoders() -> None:
+	with _global_video_lock:
+		streams = list(_streams.values())
+		_streams.clear()
+		states = list(_video_states.values())
+	for stream in streams:
+		stream.stop()
+	for state in states:
+		if state.decoder is not None:
+			state.decoder.stop()
+			state.decoder = None
+
+
+def letterbox(frame: np.ndarray, inp_size: int = 640) -> Tuple[np.ndarray, Tuple[float, float, float, Tuple[int, int]]]:
+	"""
+	Resize + pad a BGR frame to inp_size x inp_size.
+	Returns the padded image and (pad_w, pad_h, gain, original_shape) to undo it.
+	"""
+	return preprocess.letterbox(frame, inp_size)
+
+
+def model_weights_path(model_name: str) -> Path:
+	# Checkpoints are unpickled in full: never let a name point outside yolov11/weights
+	return YOLO_DIR / "weights" / f"{check_model_name(model_name)}.pt"
 
-		# Inference + NMS
-		outputs = self.model(x)
-		outputs = util.non_max_suppression(outputs, conf_th, iou_th)[0]
 
-		dets: List[Detection] = []
-		if outputs is None or len(outputs) == 0:
-			return dets
+def resolve_model_name(floor_cfg: Dict[str, Any] | None = None) -> str:
+	"""
+	Model for a floor: its config's "model" key, else YOLO_MODEL, else yolo11x.
+	Raises ValueError for names that are not plain checkpoint names.
+	"""
+	if floor_cfg and floor_cfg.get("model"):
+		return check_model_name(str(floor_cfg["model"]))
+	return check_model_name(env_str("YOLO_MODEL", DEFAULT_MODEL) or DEFAULT_MODEL)
+
+
+def resolve_cascade_model() -> str:
+	"""
+	Small model of the cascade (YOLO_CASCADE), or "" when the cascade is off.
+	"""
+	name = env_str("YOLO_CASCADE", "")
+	return check_model_name(name) if name else ""
+
+
+def select_weights(model_name: str) -> Path:
+	"""
+	Checkpoint to load for model_name: the class-pruned derivative from
+	tools/prune_classes.py when present and built from the current weights
+	(YOLO_PRUNED=0 disables it), else the full checkpoint.
+	"""
+	weights_path = model_weights_path(model_name)
+	pruned = pruned_weights_path(weights_path)
+	if not env_flag("YOLO_PRUNED", True) or not pruned.exists():
+		return weights_path
+	meta = read_artifact_meta(pruned) or {}
+	if weights_path.exists() and meta.get("source_sha256") != weights_sha256(weights_path):
+		import logging
+		logging.getLogger("yolo_service").warning(f"Ignoring stale pruned model {pruned.as_posix()}; re-run tools.prune_classes")
+		return weights_path
+	return pruned
+
+
+class YOLODetector:
+	def __init__(self, backend: Any = None, model_name: str | None = None, max_batch: int | None = None) -> None:
+		"""
+		backend: optional ready-made TorchBackend/OnnxBackend; by default it is chosen by
+		YOLO_BACKEND (torch | onnx | onnx-int8).
+		model_name: checkpoint under yolov11/weights (default YOLO_MODEL, then yolo11x).
+		max_batch: largest batch the torch backend traces a graph for (default YOLO_MAX_BATCH_SIZE).
+		"""
+		self.model_name = model_name or resolve_model_name()
+		self.max_batch = max_batch or env_int("YOLO_MAX_BATCH_SIZE", 8)
+		weights_path = select_weights(self.model_name)
+		kind = env_str("YOLO_BACKEND", "torch").lower()
+		self.model = None
+		names = None
+		if backend is not None:
+			self.backend = backend
+			self.device = getattr(backend, "device", "cpu")
+			self.model = getattr(backend, "model", None)
+		elif kind in ("onnx", "onnx-int8"):
+			# ONNX Runtime CPU provider; the checkpoint itself is never loaded
+			self.device = "cpu"
+			default_path = onnx_artifact_path(weights_path)
+			if not default_path.exists():
+				default_path = onnx_artifact_path(model_weights_path(self.model_name))
+			if kind == "onnx-int8":
+				default_path = int8_artifact_path(default_path)
+			onnx_path = default_path
+			if self.model_name == resolve_model_name():
+				# YOLO_ONNX_PATH overrides the deployment-wide model only
+				onnx_path = Path(env_str("YOLO_ONNX_PATH", default_path.as_posix()))
+			if not onnx_path.is_absolute():
+				onnx_path = BASE_DIR / onnx_path
+			self.backend = OnnxBackend(onnx_path, threads=env_int("ONNX_THREADS", 0))
+		else:
+			# torch is only imported on this path, so ONNX deployments never load it
+			import torch
+			from .torch_backend import TorchBackend, load_torch_model
+			self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
+			channels_last = env_flag("YOLO_CHANNELS_LAST", True)
+			fuse = env_flag("YOLO_FUSE", True)
+			self.model, ckpt = load_torch_model(
+				weights_path,
+				self.device,
+				fuse=fuse,
+				channels_last=channels_last,
+			)
+			names = ckpt.get("names")
+			if hasattr(self.model, "static_shapes"):
+				# Eager path (and tracing fallback): anchors/output buffers built once per input shape
+				self.model.static_shapes(env_flag("YOLO_STATIC_SHAPES", True))
+			trace_dir = None
+			weights_sha = ""
+			if env_flag("YOLO_COMPILE", True):
+				trace_dir = Path(env_str("YOLO_COMPILE_CACHE_DIR", (YOLO_DIR / "weights" / "compiled").as_posix()))
+				if not trace_dir.is_absolute():
+					trace_dir = BASE_DIR / trace_dir
+				weights_sha = weights_sha256(weights_path)
+			self.backend = TorchBackend(
+				self.model,
+				self.device,
+				channels_last=channels_last,
+				trace_dir=trace_dir,
+				model_name=weights_path.stem,
+				weights_sha=weights_sha,
+				max_batch=self.max_batch,
+				fused=fuse,
+			)
+		names = names or getattr(self.backend, "names", None)
+		if names:
+			# Pruned model: its own remapped class table (JSON sidecars store string keys)
+			self.names = {int(k): v for k, v in names.items()}
+		else:
+			# Load names from args.yaml
+			import yaml
+			with (YOLO_DIR / "utils" / "args.yaml").open("r", encoding="utf-8") as f:
+				params = yaml.safe_load(f)
+			self.names = params.get("names", {})
+		self.person_name = "person"
+		self.object_names = OBJECT_NAMES_DEFAULT
+		self.classes = seat_classes(self.names, self.person_name, self.object_names)
+		self.inp_size = 640
+		# Cached resize/pad plans per frame (or crop) size and a reusable input batch
+		self.preprocess = preprocess.Letterbox(self.inp_size)
+		# Only seat-relevant classes reach NMS (None when the model has nothing else)
+		self.class_ids: List[int] | None = sorted(
+			self.classes.person_ids.tolist() + self.classes.object_ids.tolist()
+		)
+		if len(self.class_ids) == len(self.names):
+			self.class_ids = None
+
+	def _to_boxes(
+		self,
+		outputs: np.ndarray,
+		meta: Tuple[float, float, float, Tuple[int, int]],
+		offset: Tuple[int, int] = (0, 0),
+	) -> np.ndarray:
+		if len(outputs) == 0:
+			return np.zeros((0, 6), dtype=np.float32)
 
 		# Undo padding and scaling to original shape
+		w, h, gain, shape = meta
+		outputs = np.array(outputs, dtype=np.float32)
 		outputs[:, [0, 2]] -= w
 		outputs[:, [1, 3]] -= h
-		outputs[:, :4] /= min(height / shape[0], width / shape[1])
-		outputs[:, 0].clamp_(0, shape[1])
-		outputs[:, 1].clamp_(0, shape[0])
-		outputs[:, 2].clamp_(0, shape[1])
-		outputs[:, 3].clamp_(0, shape[0])
+		outputs[:, :4] /= gain
+		outputs[:, [0, 2]] = np.clip(outputs[:, [0, 2]], 0, shape[1])
+		outputs[:, [1, 3]] = np.clip(outputs[:, [1, 3]], 0, shape[0])
+		# Crop coordinates -> frame coordinates
+		if offset != (0, 0):
+			outputs[:, [0, 2]] += offset[0]
+			outputs[:, [1, 3]] += offset[1]
+		return outputs
+
+	def _nms(self, outputs: Any, conf_th: float, iou_th: float) -> np.ndarray:
+		"""
+		Batched NMS on the raw backend output -> (N, 7) numpy rows [batch_idx, box, score, cls].
+		"""
+		if isinstance(outputs, np.ndarray):
+			return non_max_suppression_numpy(outputs, conf_th, iou_th, classes=self.class_ids)
+		from .yolo_util import util
+		rows = util.non_max_suppression_batched(outputs, conf_th, iou_th, classes=self.class_ids)
+		return rows.float().cpu().numpy()
+
+	def detect_boxes(
+		self,
+		frames: Sequence[np.ndarray],
+		conf_th: float = 0.15,
+		iou_th: float = 0.2,
+		max_batch: int | None = None,
+		crops: Sequence[Crop | None] | None = None,
+	) -> List[np.ndarray]:
+		"""
+		Batched detection: letterbox every frame into one NCHW batch, run a single
+		forward pass and a batched NMS per chunk of at most max_batch frames.
+		crops optionally gives one (x1, y1, x2, y2) region per frame; only that region
+		is letterboxed and boxes are mapped back to frame coordinates.
+		Returns one (N, 6) float32 array [x1, y1, x2, y2, score, class_id] per frame, in order.
+		"""
+		results: List[np.ndarray] = []
+		if not frames:
+			return results
+		if max_batch is None or max_batch <= 0:
+			max_batch = len(frames)
+		if crops is None:
+			crops = [None] * len(frames)
+
+		for start in range(0, len(frames), max_batch):
+			chunk = []
+			offsets = []
+			for frame, crop in zip(frames[start:start + max_batch], crops[start:start + max_batch]):
+				offset = (0, 0)
+				if crop is not None:
+					x1, y1, x2, y2 = crop
+					frame = frame[y1:y2, x1:x2]
+					offset = (x1, y1)
+				chunk.append(frame)
+				offsets.append(offset)
+
+			# Letterbox + HWC -> CHW + BGR -> RGB (+ /255 for float backends) into a reused batch
+			x, metas = self.preprocess.batch(chunk, getattr(self.backend, "input_dtype", np.uint8))
+
+			# Inference + NMS
+			rows = self._nms(self.backend(x), conf_th, iou_th)
+			counts = np.bincount(rows[:, 0].astype(np.int64), minlength=len(metas))
+			for out, meta, offset in zip(np.split(rows[:, 1:], np.cumsum(counts)[:-1]), metas, offsets):
+				results.append(self._to_boxes(out, meta, offset))
+		return results
+
+	def detect_frames(
+		self,
+		frames: Sequence[np.ndarray],
+		conf_th: float = 0.15,
+		iou_th: float = 0.2,
+		max_batch: int | None = None,
+		crops: Sequence[Crop | None] | None = None,
+	) -> List[FrameDetections]:
+		"""
+		detect_boxes() with one FrameDetections per input frame.
+		"""
+		boxes = self.detect_boxes(frames, conf_th, iou_th, max_batch, crops)
+		return [FrameDetections(b, self.classes) for b in boxes]
+
+	def detect_frame(self, frame: np.ndarray, conf_th: float = 0.15, iou_th: float = 0.2) -> List[Detection]:
+		return self.detect_frames([frame], conf_th, iou_th)[0].to_detections()
+
+	def warmup(self, runs: int = 2, batch_sizes: Sequence[int] | None = None) -> None:
+		"""
+		Run blank batches so tracing, allocator growth and kernel selection happen
+		before the first real refresh. Defaults to every traced batch bucket.
+		"""
+		if batch_sizes is None:
+			batch_sizes = batch_buckets(self.max_batch)
+		blank = np.zeros((self.inp_size, self.inp_size, 3), dtype=np.uint8)
+		for batch in sorted(set(max(1, b) for b in batch_sizes)):
+			for _ in range(max(0, runs)):
+				self.detect_frames([blank] * batch)
+
+
+@dataclass
+class _MotionState:
+	gate: MotionGate
+	counters: SeatCounters | None = None
+	detect_ts: int = 0
+
+
+_motion_states: Dict[str, _MotionState] = {}
+
+
+def _get_motion_state(floor_id: str, raster: SeatRaster) -> _MotionState:
+	state = _motion_states.get(floor_id)
+	if state is None or state.gate.raster is not raster:
+		# New floor or the seat layout changed: start over without a reference frame
+		state = _MotionState(gate=MotionGate(
+			raster,
+			pixel_th=env_int("MOTION_PIXEL_THRESHOLD", 25),
+			seat_fraction=env_float("MOTION_SEAT_FRACTION", 0.02),
+		))
+		_motion_states[floor_id] = state
+	return state
+
+
+def _new_tracker(track_every: int) -> IoUTracker | None:
+	if track_every <= 1:
+		return None
+	return IoUTracker(
+		iou_th=env_float("TRACK_IOU_THRESHOLD", 0.3),
+		max_misses=env_int("TRACK_MAX_MISSES", 1),
+	)
+
+
+# (floor_id, small model, large model) -> escalation counters since startup
+_cascade_stats: Dict[Tuple[str, str, str], CascadeStats] = {}
+_cascade_stats_lock = threading.Lock()
 
-		for box in outputs:
-			x1, y1, x2, y2, score, index = box.tolist()
-			idx = int(index)
-			cls_name = self.names.get(idx, str(idx))
-			dets.append(Detection(x1, y1, x2, y2, float(score), cls_name))
-		return dets
 
+def _get_cascade_stats(floor_id: str, small_model: str, large_model: str) -> CascadeStats:
+	with _cascade_stats_lock:
+		return _cascade_stats.setdefault((floor_id, small_model, large_model), CascadeStats())
 
-_detector: YOLODetector | None = None
 
+def cascade_health() -> List[Dict[str, Any]]:
+	"""
+	Escalation rates of the model cascade (YOLO_CASCADE) per floor and model pair.
+	"""
+	with _cascade_stats_lock:
+		items = sorted(_cascade_stats.items())
+	return [
+		{
+			"floor_id": floor_id,
+			"small_model": small_model,
+			"large_model": large_model,
+			**stats.snapshot(),
+		}
+		for (floor_id, small_model, large_model), stats in items
+	]
+
+
+_detectors: Dict[str, Any] = {}
+_detectors_lock = threading.Lock()
 
-def get_detector() -> YOLODetector:
-	global _detector
-	if _detector is None:
-		_detector = YOLODetector()
-	return _detector
+
+def get_detector(model_name: str | None = None) -> Any:
+	"""
+	One detector per model name, loaded on first use: an in-process YOLODetector, or a
+	PooledDetector over DETECT_WORKERS worker processes when that is set.
+	"""
+	model_name = model_name or resolve_model_name()
+	with _detectors_lock:
+		detector = _detectors.get(model_name)
+		if detector is None:
+			workers = env_int("DETECT_WORKERS", 0)
+			if workers > 0:
+				from .detect_pool import PooledDetector
+				detector = PooledDetector(
+					model_name,
+					workers,
+					torch_threads=env_int("DETECT_WORKER_THREADS", 0),
+					warmup_runs=env_int("YOLO_WARMUP_RUNS", 2),
+					warmup_batch=env_int("YOLO_MAX_BATCH_SIZE", 8),
+				)
+			else:
+				detector = YOLODetector(model_name=model_name)
+				# Every batch bucket, so no graph is traced inside the inference executor
+				detector.warmup(env_int("YOLO_WARMUP_RUNS", 2))
+			_detectors[model_name] = detector
+		return detector
+
+
+def shutdown_detectors() -> None:
+	"""
+	Stop detector worker processes (if any) and drop every loaded detector.
+	"""
+	with _detectors_lock:
+		detectors = list(_detectors.values())
+		_detectors.clear()
+	for detector in detectors:
+		shutdown = getattr(detector, "shutdown", None)
+		if shutdown is not None:
+			shutdown()
 
 
-def point_in_polygon(pt: Tuple[float, float], poly: List[List[float]]) -> bool:
+def preload_detectors() -> None:
 	"""
-	Ray casting algorithm for point-in-polygon
+	Load and warm up every model the configured floors use (called at startup).
 	"""
-	x, y = pt
-	inside = False
-	n = len(poly)
-	for i in range(n):
-		x1, y1 = poly[i]
-		x2, y2 = poly[(i + 1) % n]
-		intersect = ((y1 > y) != (y2 > y)) and (x < (x2 - x1) * (y - y1) / (y2 - y1 + 1e-9) + x1)
-		if intersect:
-			inside = not inside
-	return inside
+	from .roi_loader import list_floor_ids, load_floor_config
+	import logging
+	names = {resolve_model_name()}
+	if resolve_cascade_model():
+		names.add(resolve_cascade_model())
+	for floor_id in list_floor_ids():
+		try:
+			names.add(resolve_model_name(load_floor_config(floor_id)))
+		except Exception:
+			continue
+	for name in sorted(names):
+		try:
+			get_detector(name)
+		except Exception as e:
+			logging.getLogger("yolo_service").error(f"Preloading model {name} failed: {e}")
 
 
 def refresh_floor(db: Session, floor_cfg: Dict[str, Any], sample_frames: int = 16) -> List[Seat]:
@@ -219,39 +676,31 @@ def refresh_floor(db: Session, floor_cfg: Dict[str, Any], sample_frames: int = 1
 		# best-effort; don't block detection
 		pass
 	floor_id = floor_cfg["floor_id"]
-	# Normalize stream path to absolute (relative to project root)
-	_stream = Path(str(floor_cfg["stream_path"]))
-	if not _stream.is_absolute():
-		_stream = (BASE_DIR / _stream)
-	stream_path = _stream.as_posix()
+	live = is_live_source(floor_cfg)
+	if live:
+		stream_path = str(floor_cfg["stream_path"])
+	else:
+		# Normalize stream path to absolute (relative to project root)
+		_stream = Path(str(floor_cfg["stream_path"]))
+		if not _stream.is_absolute():
+			_stream = (BASE_DIR / _stream)
+		stream_path = _stream.as_posix()
 	seats_cfg = floor_cfg["seats"]
 
-	# Ensure all seats exist in DB
-	existing = {s.seat_id: s for s in db.query(Seat).filter(Seat.floor_id == floor_id).all()}
-	for s in seats_cfg:
-		if s["seat_id"] not in existing:
-			db.add(Seat(
-				seat_id=s["seat_id"],
-				floor_id=floor_id,
-				has_power=bool(s.get("has_power", 0)),
-				is_empty=True,
-				is_reported=False,
-				is_malicious=False,
-				lock_until_ts=0,
-				last_update_ts=0,
-				last_state_is_empty=True,
-				total_empty_seconds=0,
-				change_count=0,
-				occupancy_start_ts=0,
-			))
-	db.commit()
+	# Ensure all seats exist in DB (only when the floor's seat list changed)
+	provision_seats(db, floor_id, seats_cfg)
 	existing = {s.seat_id: s for s in db.query(Seat).filter(Seat.floor_id == floor_id).all()}
+	if any(s["seat_id"] not in existing for s in seats_cfg):
+		# Rows were removed behind our back (e.g. DB reset): provision again
+		provision_seats(db, floor_id, seats_cfg, force=True)
+		existing = {s.seat_id: s for s in db.query(Seat).filter(Seat.floor_id == floor_id).all()}
 
-	# Initialize counters
-	counters: Dict[str, Dict[str, int]] = {s["seat_id"]: {"person": 0, "object": 0, "frames": 0} for s in seats_cfg}
+	# Initialize counters ((S,) arrays in seat config order)
+	seat_ids = [s["seat_id"] for s in seats_cfg]
+	counters = SeatCounters(len(seat_ids))
 
 	# Persistent handle + sequential advance
-	vstate = _open_or_get_video_state(floor_id, stream_path)
+	vstate = _open_or_get_video_state(floor_id, stream_path, live=live)
 	
 	# 获取该楼层的锁，确保视频读取操作是线程安全的
 	with _global_video_lock:
@@ -259,129 +708,228 @@ def refresh_floor(db: Session, floor_cfg: Dict[str, Any], sample_frames: int = 1
 			_video_locks[floor_id] = threading.Lock()
 		floor_lock = _video_locks[floor_id]
 	
-	# 使用锁保护整个视频读取过程
-	with floor_lock:
-		cap = vstate.cap
-		if not cap.isOpened():
-			# If stream can't open, do nothing
+	model_name = resolve_model_name(floor_cfg)
+	if env_flag("STREAM_SAMPLING", False):
+		# Frames are analyzed continuously in the background; publish the current estimate
+		with floor_lock:
+			stream = _ensure_stream(floor_id, floor_cfg, vstate, model_name)
+		estimate = stream.estimate(seat_ids)
+		if estimate is None:
+			# Nothing recent analyzed yet: keep the stored state
 			return list(existing.values())
+		person_ratio, object_ratio = estimate
+		return _publish_presence(db, floor_id, existing, seat_ids, person_ratio >= PRESENCE_RATIO, object_ratio >= PRESENCE_RATIO, now_ts)
 
-		detector = get_detector()
-
-		# Determine how many frames to sample this refresh: default 30 per second
-		sample_frames = int(round(vstate.fps)) if vstate.fps > 0 else 30
-		if sample_frames <= 0:
-			sample_frames = 30
-
-		# Seek to next frame index (some backends may ignore seek; we still try)
-		try:
-			if vstate.next_frame_idx > 0 and vstate.total_frames > 0:
-				cap.set(cv2.CAP_PROP_POS_FRAMES, vstate.next_frame_idx)
-		except Exception as e:
-			# 如果 seek 失败，从当前位置继续
-			pass
+	# 使用锁保护整个视频读取过程
+	clip_frames: List[np.ndarray] = []
+	with floor_lock:
+		_stop_stream(floor_id)
+		if vstate.live:
+			# Live camera: no seeking, just the freshest frames the reader thread kept
+			reader = vstate.decoder
+			clip_frames = reader.latest(reader.sample_frames) if reader is not None else []
+		else:
+			cap = vstate.cap
+			if not cap.isOpened():
+				# If stream can't open, do nothing
+				return list(existing.values())
+
+			# Determine how many frames to sample this refresh: default 30 per second
+			sample_frames = int(round(vstate.fps)) if vstate.fps > 0 else 30
+			if sample_frames <= 0:
+				sample_frames = 30
+
+			if env_flag("VIDEO_DECODER_THREAD", True):
+				# Frames are decoded ahead of time by the floor's decoder thread
+				decoder = _ensure_decoder(floor_id, vstate, sample_frames)
+				clip_frames = decoder.take(sample_frames, env_float("VIDEO_DECODER_TIMEOUT", 10.0))
+			else:
+				if vstate.decoder is not None:
+					vstate.decoder.stop()
+					vstate.decoder = None
+				# Seek to next frame index (some backends may ignore seek; we still try)
+				try:
+					if vstate.next_frame_idx > 0 and vstate.total_frames > 0:
+						cap.set(cv2.CAP_PROP_POS_FRAMES, vstate.next_frame_idx)
+				except Exception as e:
+					# 如果 seek 失败，从当前位置继续
+					pass
 
-		read_frames = 0
-		while read_frames < sample_frames:
-			try:
-				ret, frame = cap.read()
-				if not ret or frame is None:
-					# Attempt wrap-around if we know total frames
-					if vstate.total_frames > 0:
-						vstate.next_frame_idx = 0
-						try:
-							cap.set(cv2.CAP_PROP_POS_FRAMES, vstate.next_frame_idx)
-							ret, frame = cap.read()
-							if not ret or frame is None:
+				clip_frames = []
+				while len(clip_frames) < sample_frames:
+					try:
+						ret, frame = cap.read()
+						if not ret or frame is None:
+							# Attempt wrap-around if we know total frames
+							if vstate.total_frames > 0:
+								vstate.next_frame_idx = 0
+								try:
+									cap.set(cv2.CAP_PROP_POS_FRAMES, vstate.next_frame_idx)
+									ret, frame = cap.read()
+									if not ret or frame is None:
+										break
+								except Exception:
+									break
+							else:
 								break
-						except Exception:
-							break
-					else:
+						clip_frames.append(frame)
+					except Exception as e:
+						# 如果读取失败，记录错误但继续处理
 						break
-				read_frames += 1
-				dets = detector.detect_frame(frame)
-
-				# For quicker mapping, build per-category points list
-				person_pts = [d.center for d in dets if d.cls_name == detector.person_name]
-				object_pts = [d.center for d in dets if d.cls_name in detector.object_names]
-
-				for s in seats_cfg:
-					seat_id = s["seat_id"]
-					roi = s["desk_roi"]
-					hit_person = any(point_in_polygon(pt, roi) for pt in person_pts)
-					hit_object = any(point_in_polygon(pt, roi) for pt in object_pts)
-					if hit_person:
-						counters[seat_id]["person"] += 1
-					if hit_object:
-						counters[seat_id]["object"] += 1
-					counters[seat_id]["frames"] += 1
-			except Exception as e:
-				# 如果读取失败，记录错误但继续处理
-				break
-
-		# Advance next frame index by wall-clock interval (e.g., 5s) instead of contiguous frames
-		try:
-			interval_seconds = int(os.getenv("REFRESH_INTERVAL_SECONDS", "5"))
-		except Exception:
-			interval_seconds = 5
-		step_frames = int(round(max(0.0, vstate.fps) * max(0, interval_seconds))) or read_frames
-		if vstate.total_frames > 0:
-			vstate.next_frame_idx = (vstate.next_frame_idx + step_frames) % vstate.total_frames
-		else:
-			vstate.next_frame_idx += step_frames
-
-	# Apply thresholds (在锁外执行，避免长时间持有锁)
-	now = now_ts
-	for s in seats_cfg:
-		seat = existing[s["seat_id"]]
-		stats = counters[seat.seat_id]
-		frames = max(1, stats["frames"])
-		person_ratio = stats["person"] / frames
-		object_ratio = stats["object"] / frames
-		person_present = person_ratio >= 0.3
-		object_present = object_ratio >= 0.3
-		new_observed_is_empty = not (person_present or object_present)
-
-		# Update statistics regardless of lock
-		if seat.last_update_ts > 0:
-			delta = now - seat.last_update_ts
-			# accumulate based on LAST state being empty
-			if seat.last_state_is_empty and delta > 0:
-				seat.daily_empty_seconds += delta
-				seat.total_empty_seconds += delta
-			if seat.last_state_is_empty != new_observed_is_empty:
-				seat.change_count += 1
-		seat.last_state_is_empty = new_observed_is_empty
-		seat.last_update_ts = now
-
-		# Update occupancy timer for malicious detection (object only)
-		if object_present and not person_present:
-			if seat.occupancy_start_ts == 0:
-				seat.occupancy_start_ts = now
-		else:
-			seat.occupancy_start_ts = 0
+				read_frames = len(clip_frames)
 
-		# Apply visual state only if not locked
-		if now >= seat.lock_until_ts:
-			seat.is_empty = new_observed_is_empty
-			# Malicious after 2h (7200s)
-			if seat.occupancy_start_ts and (now - seat.occupancy_start_ts) >= 7200:
-				seat.is_malicious = True
-
-		db.add(seat)
-
-	try:
-		db.commit()
-	except Exception as e:
-		# 如果提交失败，回滚
+				# Advance next frame index by wall-clock interval (e.g., 5s) instead of contiguous frames
+				step_frames = _refresh_step_frames(vstate) or read_frames
+				if vstate.total_frames > 0:
+					vstate.next_frame_idx = (vstate.next_frame_idx + step_frames) % vstate.total_frames
+				else:
+					vstate.next_frame_idx += step_frames
+
+	if not clip_frames:
+		# No fresh frames (stalled decoder, live reader without new frames): keep the stored state
+		return list(existing.values())
+
+	executor = get_executor(model_name)
+	small_model = resolve_cascade_model()
+	cascade = None
+	if small_model and small_model != model_name:
+		# Small model on every frame; the floor's model only where it is ambiguous
+		small_executor = get_executor(small_model)
+		large_executor = executor
+		cascade = ModelCascade(
+			lambda frames, c: small_executor.detect_frames(frames, crop=c),
+			lambda frames, c: large_executor.detect_frames(frames, crop=c),
+			PRESENCE_RATIO,
+			conf_band=(env_float("CASCADE_CONF_LOW", 0.15), env_float("CASCADE_CONF_HIGH", 0.5)),
+			ratio_margin=env_float("CASCADE_RATIO_MARGIN", 0.1),
+			crop_margin=env_float("YOLO_ROI_CROP_MARGIN", 0.1),
+			stats=_get_cascade_stats(floor_id, small_model, model_name),
+		)
+		executor = small_executor
+
+	raster = None
+	changed = None
+	motion = None
+	if clip_frames:
+		h, w = clip_frames[0].shape[:2]
+		raster = get_seat_raster(floor_cfg, (w, h), env_float("ROI_RASTER_SCALE", 1.0))
+		if env_flag("MOTION_GATE", True):
+			motion = _get_motion_state(floor_id, raster)
+			if motion.counters is not None and now_ts - motion.detect_ts < env_int("MOTION_MAX_SKIP_SECONDS", 60):
+				changed = motion.gate.changed_seats([clip_frames[0], clip_frames[-1]])
+
+	if changed is not None and not changed.any():
+		# Nothing moved inside any seat region since the last detection pass: reuse its counters
+		counters = motion.counters.copy()
+		clip_frames = []
+
+	# Batched detection via the shared executor, which batches frames across floors
+	# (在锁外执行，避免长时间持有锁)
+	sampler = None
+	max_frames = len(clip_frames)
+	if clip_frames and env_flag("SEQUENTIAL_SAMPLING", False):
+		# Stop detecting once every seat's empty/occupied decision is settled
+		sampler = SequentialSampler(
+			len(raster.seat_ids),
+			threshold=PRESENCE_RATIO,
+			delta=env_float("SEQUENTIAL_DELTA", 0.15),
+			alpha=env_float("SEQUENTIAL_ALPHA", 0.05),
+			beta=env_float("SEQUENTIAL_BETA", 0.05),
+			min_frames=env_int("SAMPLE_MIN_FRAMES", 4),
+		)
+		max_frames = min(max_frames, env_int("SAMPLE_MAX_FRAMES", max_frames) or max_frames)
+	crop = None
+	if clip_frames and env_flag("YOLO_ROI_CROP", False):
+		crop = raster.union_bbox(env_float("YOLO_ROI_CROP_MARGIN", 0.1))
+
+	# Detect every track_every-th frame; the tracker predicts the frames in between
+	track_every = env_int("YOLO_TRACK_EVERY", 1)
+	tracker = _new_tracker(track_every) if clip_frames else None
+	if cascade is not None:
+		detect = functools.partial(cascade.detect, raster=raster, crop=crop)
+	else:
+		detect = functools.partial(executor.detect_frames, crop=crop)
+
+	analyzed = 0
+	while analyzed < max_frames:
+		if sampler is None:
+			step = max_frames
+		elif analyzed == 0:
+			step = sampler.min_frames
+		else:
+			step = executor.max_batch
+		chunk = clip_frames[analyzed:min(max_frames, analyzed + step)]
 		try:
-			db.rollback()
-		except Exception:
-			pass
-		# 记录错误但不抛出异常，避免影响其他楼层
-		import logging
-		logging.getLogger("yolo_service").error(f"Failed to commit seat updates for floor {floor_id}: {e}")
-	
+			batch_dets = detect_sparse(chunk, detect, tracker, track_every, start=analyzed)
+		except Exception as e:
+			import logging
+			logging.getLogger("yolo_service").error(f"Detection failed for floor {floor_id}: {e}")
+			break
+		analyzed += len(chunk)
+
+		# Map detection centers to seats through the precompiled label map (one lookup per batch)
+		hit_person = raster.hit_masks([dets.centers(dets.person) for dets in batch_dets])
+		hit_object = raster.hit_masks([dets.centers(dets.object) for dets in batch_dets])
+		counters.add(hit_person, hit_object)
+		if sampler is not None:
+			sampler.update(hit_person, hit_object)
+
+		if sampler is not None and sampler.settled(changed):
+			break
+
+	if motion is not None and analyzed > 0 and changed is not None:
+		# Seats without motion keep the counters of the previous detection pass
+		counters.restore(motion.counters, ~changed)
+	if cascade is not None and analyzed > 0:
+		# Seats whose ratios sit near the threshold are recounted by the large model
+		try:
+			cascade.refine(
+				clip_frames[:analyzed],
+				raster,
+				counters,
+				mask=changed,
+				track_every=track_every,
+				tracker=_new_tracker(track_every),
+			)
+		except Exception as e:
+			import logging
+			logging.getLogger("yolo_service").error(f"Cascade escalation failed for floor {floor_id}: {e}")
+	if motion is not None and analyzed > 0:
+		motion.gate.set_reference(clip_frames[analyzed - 1])
+		motion.counters = counters.copy()
+		motion.detect_ts = now_ts
+
+	if max_frames > 0 and analyzed == 0:
+		# Detection failed before any frame was counted: keep the stored state
+		return list(existing.values())
+
+	person_present, object_present = counters.presence(PRESENCE_RATIO)
+	return _publish_presence(db, floor_id, existing, seat_ids, person_present, object_present, now_ts)
+
+
+def _publish_presence(
+	db: Session,
+	floor_id: str,
+	existing: Dict[str, Seat],
+	seat_ids: List[str],
+	person_present: np.ndarray,
+	object_present: np.ndarray,
+	now_ts: int,
+) -> List[Seat]:
+	"""
+	Turn per-seat presence masks into seat state (array ops over every seat of the floor)
+	and write the seats that changed.
+	"""
+	new_empty = ~(person_present | object_present)
+	object_only = object_present & ~person_present
+	present = np.array([seat_id in existing for seat_id in seat_ids], dtype=bool)
+	seats = [existing[seat_id] for seat_id in seat_ids if seat_id in existing]
+	changes = seat_updates(
+		seats,
+		now_ts,
+		new_empty[present],
+		object_only[present],
+		env_int("SEAT_TIME_FLUSH_SECONDS", 60),
+	)
+	write_seat_changes(db, floor_id, changes)
 	return list(existing.values())
-
-
@@ -5,7 +5,8 @@ from __future__ import annotations
 
 try:
 	# When package context is intact
-	from ...yolov11.utils import util as _util  # type: ignore
+	from ...yolov11.utils import preprocess as _preprocess  # type: ignore
+	_PACKAGED = True
 except Exception:
 	import sys
 	from pathlib import Path
@@ -15,8 +16,32 @@ except Exception:
 	UTILS_DIR = YOLO_DIR / "utils"
 	if UTILS_DIR.as_posix() not in sys.path:
 		sys.path.insert(0, UTILS_DIR.as_posix())
-	import util as _util  # type: ignore
+	import preprocess as _preprocess  # type: ignore
+	_PACKAGED = False
 
-util = _util
+preprocess = _preprocess
 
 
+def __getattr__(name: str):
+	# yolov11 util pulls in torch (and matplotlib): load it only when the torch path asks for it
+	if name != "util":
+		raise AttributeError(name)
+	if _PACKAGED:
+		from ...yolov11.utils import util as _util  # type: ignore
+	else:
+		import util as _util  # type: ignore
+	globals()["util"] = _util
+	return _util
+
+
+def ensure_yolo_path() -> None:
+	"""
+	Make yolov11/ importable as a top-level root so pickled checkpoints that reference
+	`nets.nn` / `utils.util` can be unpickled from the backend process.
+	"""
+	import sys
+	from pathlib import Path
+
+	yolo_dir = Path(__file__).resolve().parents[2] / "yolov11"
+	if yolo_dir.as_posix() not in sys.path:
+		sys.path.append(yolo_dir.as_posix())
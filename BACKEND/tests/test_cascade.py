@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+
+from backend.services.cascade import CascadeStats, ModelCascade
+from backend.services.detections import FrameDetections, seat_classes
+from backend.services.occupancy import SeatCounters
+from backend.services.roi_loader import compile_seat_raster
+
+
+CLASSES = seat_classes({0: "person", 1: "laptop", 2: "car"})
+
+# Seats A, B, C in a 200 x 200 frame; everything else is outside every seat
+FLOOR = {
+	"floor_id": "CASCADE-TEST",
+	"seats": [
+		{"seat_id": "A", "desk_roi": [[0, 0], [40, 0], [40, 40], [0, 40]]},
+		{"seat_id": "B", "desk_roi": [[60, 0], [100, 0], [100, 40], [60, 40]]},
+		{"seat_id": "C", "desk_roi": [[0, 60], [40, 60], [40, 100], [0, 100]]},
+	],
+}
+CENTER = {"A": (20, 20), "B": (80, 20), "C": (20, 80), None: (150, 150)}
+
+
+@pytest.fixture(scope="module")
+def raster():
+	return compile_seat_raster(FLOOR, (200, 200))
+
+
+def _box(seat, score, cls=0, half=10):
+	x, y = CENTER[seat]
+	return [x - half, y - half, x + half, y + half, score, cls]
+
+
+def _dets(*boxes):
+	return FrameDetections(np.asarray(boxes, dtype=np.float32).reshape(-1, 6), CLASSES)
+
+
+class FakeDetect:
+	"""DetectFn returning fixed detections per frame (keyed by the frame's fill value)."""
+
+	def __init__(self, by_frame):
+		self.by_frame = by_frame
+		self.calls = []
+
+	def __call__(self, frames, crop):
+		keys = [int(f[0, 0, 0]) for f in frames]
+		self.calls.append((keys, crop))
+		return [self.by_frame(k) for k in keys]
+
+
+def _frames(count):
+	return [np.full((200, 200, 3), i, dtype=np.uint8) for i in range(count)]
+
+
+def _cascade(small=None, large=None, **kwargs):
+	kwargs.setdefault("threshold", 0.5)
+	return ModelCascade(small or FakeDetect(lambda k: _dets()), large or FakeDetect(lambda k: _dets()), **kwargs)
+
+
+@pytest.mark.parametrize("score, expected", [
+	(0.14, False),
+	(0.15, True),  # lower band edge is inclusive
+	(0.3, True),
+	(0.49, True),
+	(0.5, False),  # upper band edge is exclusive
+	(0.9, False),
+])
+def test_frame_ambiguous_band_edges(raster, score, expected):
+	cascade = _cascade(conf_band=(0.15, 0.5))
+	assert cascade.frame_ambiguous(_dets(_box("A", score)), raster) is expected
+
+
+def test_frame_ambiguous_ignores_boxes_centered_outside_seats(raster):
+	cascade = _cascade(conf_band=(0.15, 0.5))
+	assert not cascade.frame_ambiguous(_dets(_box(None, 0.3)), raster)
+	# Overlaps A, B and C but its center (50, 50) is in none of them
+	assert not cascade.frame_ambiguous(_dets([10, 10, 90, 90, 0.3, 0]), raster)
+	# Classes that are neither person nor seat object never escalate
+	assert not cascade.frame_ambiguous(_dets(_box("A", 0.3, cls=2)), raster)
+	# Seat objects do
+	assert cascade.frame_ambiguous(_dets(_box("B", 0.3, cls=1)), raster)
+	assert not cascade.frame_ambiguous(_dets(), raster)
+
+
+def test_detect_escalates_only_ambiguous_frames(raster):
+	small = FakeDetect(lambda k: _dets(_box("A", 0.3 if k == 1 else 0.9)))
+	large = FakeDetect(lambda k: _dets(_box("B", 0.95)))
+	cascade = _cascade(small, large)
+	dets = cascade.detect(_frames(3), raster, crop=(0, 0, 120, 120))
+	assert large.calls == [([1], (0, 0, 120, 120))]
+	assert dets[1].boxes[0, 4] == pytest.approx(0.95)
+	assert dets[0].boxes[0, 4] == pytest.approx(0.9)
+	snap = cascade.stats.snapshot()
+	assert (snap["frames"], snap["escalated_frames"]) == (3, 1)
+
+
+def _counters(person, object, frames):
+	counters = SeatCounters(len(frames))
+	counters.person[:] = person
+	counters.object[:] = object
+	counters.frames[:] = frames
+	return counters
+
+
+def test_ambiguous_seats_margin():
+	cascade = _cascade(threshold=0.5, ratio_margin=0.1)
+	counters = _counters(
+		person=[45, 39, 58, 62, 0],
+		object=[0, 0, 0, 0, 45],
+		frames=[100, 100, 100, 100, 100],
+	)
+	np.testing.assert_array_equal(cascade.ambiguous_seats(counters), [True, False, True, False, True])
+
+
+def test_ambiguous_seats_skips_seats_without_frames():
+	# A ratio of 0 is within the margin of this threshold, but 0 / 0 frames is no evidence
+	cascade = _cascade(threshold=0.05, ratio_margin=0.1)
+	counters = _counters(person=[0, 0], object=[0, 0], frames=[0, 10])
+	np.testing.assert_array_equal(cascade.ambiguous_seats(counters), [False, True])
+
+
+def test_refine_restores_only_ambiguous_seats_from_a_seat_crop(raster):
+	# Large model sees a person in every seat on every frame
+	large = FakeDetect(lambda k: _dets(_box("A", 0.9), _box("B", 0.9), _box("C", 0.9)))
+	cascade = _cascade(large=large, threshold=0.5, ratio_margin=0.1, crop_margin=0.25)
+	# Only B is near the threshold
+	counters = _counters(person=[10, 5, 0], object=[0, 0, 0], frames=[10, 10, 10])
+
+	escalated = cascade.refine(_frames(4), raster, counters)
+
+	np.testing.assert_array_equal(escalated, [False, True, False])
+	expected_crop = raster.union_bbox(0.25, escalated)
+	assert expected_crop == (50, 0, 110, 50)
+	assert large.calls == [([0, 1, 2, 3], expected_crop)]
+	np.testing.assert_array_equal(counters.person, [10, 4, 0])
+	np.testing.assert_array_equal(counters.frames, [10, 4, 10])
+	snap = cascade.stats.snapshot()
+	assert (snap["seats"], snap["escalated_seats"]) == (3, 1)
+
+
+def test_refine_respects_mask(raster):
+	large = FakeDetect(lambda k: _dets(_box("B", 0.9)))
+	cascade = _cascade(large=large, threshold=0.5, ratio_margin=0.1, stats=CascadeStats())
+	counters = _counters(person=[10, 5, 0], object=[0, 0, 0], frames=[10, 10, 10])
+	mask = np.array([True, False, True])
+
+	escalated = cascade.refine(_frames(4), raster, counters, mask=mask)
+
+	assert not escalated.any()
+	assert large.calls == []
+	np.testing.assert_array_equal(counters.person, [10, 5, 0])
+	snap = cascade.stats.snapshot()
+	assert (snap["seats"], snap["escalated_seats"]) == (2, 0)
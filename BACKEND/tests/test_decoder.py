@@ -0,0 +1,46 @@
+import threading
+import time
+
+import numpy as np
+
+from backend.services.decoder import FrameDecoder, FrameRing
+
+
+class _ShortCapture:
+	"""Capture stub that yields a few frames and then fails every read."""
+
+	def __init__(self, frames: int) -> None:
+		self.frames = frames
+
+	def read(self):
+		if self.frames <= 0:
+			return False, None
+		self.frames -= 1
+		return True, np.zeros((4, 4, 3), dtype=np.uint8)
+
+	def grab(self) -> bool:
+		return False
+
+	def set(self, prop, value) -> bool:
+		return False
+
+
+def test_take_returns_buffered_frames_once_closed():
+	ring = FrameRing(8)
+	ring.put(np.zeros(1), threading.Event())
+	ring.close()
+	start = time.monotonic()
+	frames = ring.take(4, timeout=5.0)
+	assert len(frames) == 1
+	assert time.monotonic() - start < 1.0
+
+
+def test_take_does_not_wait_for_a_dead_decoder():
+	decoder = FrameDecoder("T", _ShortCapture(3), total_frames=0, sample_frames=5, step_frames=5)
+	decoder.start()
+	start = time.monotonic()
+	frames = decoder.take(5, timeout=5.0)
+	assert len(frames) == 3
+	assert time.monotonic() - start < 1.0
+	assert not decoder.is_alive()
+	assert decoder.health()["last_error"] == "read failed"
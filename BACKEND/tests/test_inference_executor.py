@@ -0,0 +1,80 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from backend.services.inference_executor import InferenceExecutor
+
+
+class _FakeDetector:
+	"""Records batch sizes; each result is the frame's first pixel value."""
+
+	def __init__(self, gate=None):
+		self.batches = []
+		self.gate = gate
+
+	def detect_frames(self, frames, max_batch=None, crops=None):
+		if self.gate is not None:
+			self.gate.wait(5.0)
+		self.batches.append(len(frames))
+		return [int(frame.flat[0]) for frame in frames]
+
+
+def _frame(value):
+	return np.full((2, 2, 3), value, dtype=np.uint8)
+
+
+def test_requests_from_several_threads_coalesce_into_bounded_batches():
+	detector = _FakeDetector(gate=threading.Event())
+	executor = InferenceExecutor(lambda: detector, max_batch=4, max_wait_ms=50.0)
+	results = {}
+
+	def worker(i):
+		results[i] = executor.detect_frames([_frame(i), _frame(i + 100)])
+
+	threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+	for t in threads:
+		t.start()
+	time.sleep(0.2)
+	detector.gate.set()
+	for t in threads:
+		t.join(5.0)
+	executor.shutdown()
+
+	assert results == {i: [i, i + 100] for i in range(6)}
+	assert sum(detector.batches) == 12
+	assert max(detector.batches) <= 4
+	# Frames queued while the first batch ran were batched together
+	assert len(detector.batches) < 12
+
+
+def test_queued_requests_fail_after_shutdown():
+	gate = threading.Event()
+	detector = _FakeDetector(gate=gate)
+	executor = InferenceExecutor(lambda: detector, max_batch=1, max_wait_ms=0.0)
+	running = executor.submit(_frame(1))
+	time.sleep(0.1)
+	queued = [executor.submit(_frame(i)) for i in range(2, 5)]
+
+	stopper = threading.Thread(target=executor.shutdown)
+	stopper.start()
+	time.sleep(0.1)
+	gate.set()
+	stopper.join(5.0)
+
+	assert running.result(1.0) == 1
+	for future in queued:
+		with pytest.raises(RuntimeError):
+			future.result(1.0)
+
+
+def test_detect_frames_times_out_on_a_hung_batch():
+	gate = threading.Event()
+	executor = InferenceExecutor(lambda: _FakeDetector(gate=gate), max_batch=2, max_wait_ms=0.0, timeout=0.2)
+	start = time.monotonic()
+	with pytest.raises(TimeoutError):
+		executor.detect_frames([_frame(1), _frame(2), _frame(3)])
+	assert time.monotonic() - start < 2.0
+	gate.set()
+	executor.shutdown()
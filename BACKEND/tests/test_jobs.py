@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from backend.services.jobs import JobQueue, JobQueueFull
+
+
+def _wait_for(queue, job_id, statuses, timeout=5.0):
+	deadline = time.time() + timeout
+	while time.time() < deadline:
+		job = queue.get(job_id)
+		if job is not None and job.status in statuses:
+			return job
+		time.sleep(0.01)
+	raise AssertionError(f"job {job_id} never reached {statuses}")
+
+
+@pytest.fixture
+def job_queue():
+	queues = []
+
+	def make(**kwargs):
+		q = JobQueue(**kwargs)
+		queues.append(q)
+		return q
+
+	yield make
+	for q in queues:
+		q.shutdown()
+
+
+def test_same_floor_is_deduplicated_while_active(job_queue):
+	q = job_queue(max_queued=4, workers=1)
+	release = threading.Event()
+	calls = []
+
+	def work():
+		calls.append(1)
+		release.wait(5.0)
+		return "rows"
+
+	first = q.submit("F1", work)
+	second = q.submit("F1", work)
+	other = q.submit("F2", lambda: "other")
+	assert second.job_id == first.job_id
+	assert other.job_id != first.job_id
+
+	release.set()
+	done = _wait_for(q, first.job_id, {"done"})
+	assert done.result == "rows"
+	assert len(calls) == 1
+	# Once finished the floor gets a new job
+	assert q.submit("F1", lambda: "again").job_id != first.job_id
+
+
+def test_full_queue_raises(job_queue):
+	q = job_queue(max_queued=1, workers=1)
+	release = threading.Event()
+	running = q.submit("F1", lambda: release.wait(5.0))
+	_wait_for(q, running.job_id, {"running"})
+	q.submit("F2", lambda: None)
+	with pytest.raises(JobQueueFull):
+		q.submit("F3", lambda: None)
+	release.set()
+
+
+def test_done_job_is_complete_when_observed(job_queue):
+	q = job_queue(workers=1)
+	job = q.submit("F1", lambda: [1, 2])
+	done = _wait_for(q, job.job_id, {"done", "failed"})
+	assert done.status == "done"
+	assert done.result == [1, 2]
+	assert done.finished_at is not None
+	assert done.error is None
+
+
+def test_failed_job_reports_error(job_queue):
+	q = job_queue(workers=1)
+
+	def boom():
+		raise RuntimeError("video missing")
+
+	job = q.submit("F1", boom)
+	failed = _wait_for(q, job.job_id, {"done", "failed"})
+	assert failed.status == "failed"
+	assert failed.error == "video missing"
+	assert failed.finished_at is not None
+
+
+def test_get_returns_a_snapshot(job_queue):
+	q = job_queue(workers=1)
+	release = threading.Event()
+	job = q.submit("F1", lambda: release.wait(5.0))
+	snapshot = q.get(job.job_id)
+	release.set()
+	_wait_for(q, job.job_id, {"done"})
+	assert snapshot.finished_at is None
+	assert job.finished_at is None
+
+
+def test_finished_jobs_are_purged_after_ttl(job_queue):
+	q = job_queue(workers=1, ttl=0.05)
+	job = q.submit("F1", lambda: None)
+	_wait_for(q, job.job_id, {"done"})
+	time.sleep(0.1)
+	assert q.get(job.job_id) is None
+
+
+def test_async_endpoint_returns_503_when_full(monkeypatch):
+	pytest.importorskip("fastapi")
+	from fastapi import HTTPException
+
+	from backend.routes import seats
+
+	class FullQueue:
+		def submit(self, floor_id, fn):
+			raise JobQueueFull("refresh job queue is full")
+
+	monkeypatch.setattr(seats, "get_job_queue", lambda: FullQueue())
+	with pytest.raises(HTTPException) as exc:
+		seats.refresh_floor_async_endpoint("F1")
+	assert exc.value.status_code == 503
@@ -0,0 +1,47 @@
+import copy
+
+import pytest
+
+from backend.services.roi_loader import check_model_name, load_floor_config, validate_floor_config
+from backend.services.yolo_service import model_weights_path, resolve_cascade_model, resolve_model_name
+
+
+@pytest.mark.parametrize("name", ["yolo11x", "yolo11s.pruned", "my_model-v2"])
+def test_plain_names_are_accepted(name):
+	assert check_model_name(name) == name
+	assert model_weights_path(name).name == f"{name}.pt"
+
+
+@pytest.mark.parametrize("name", ["../../somewhere/x", "a/b", "a\\b", "/etc/passwd", "", "yolo 11"])
+def test_path_like_names_are_rejected(name):
+	with pytest.raises(ValueError):
+		check_model_name(name)
+	with pytest.raises(ValueError):
+		model_weights_path(name)
+
+
+def test_floor_config_model_is_validated():
+	data = copy.deepcopy(load_floor_config("F1"))
+	data["model"] = "yolo11s"
+	validate_floor_config(data)
+	data["model"] = "../../somewhere/x"
+	with pytest.raises(ValueError):
+		validate_floor_config(data)
+
+
+def test_env_model_names_are_validated(monkeypatch):
+	monkeypatch.setenv("YOLO_MODEL", "yolo11m")
+	assert resolve_model_name() == "yolo11m"
+	monkeypatch.setenv("YOLO_MODEL", "../x")
+	with pytest.raises(ValueError):
+		resolve_model_name()
+	with pytest.raises(ValueError):
+		resolve_model_name({"model": "../x"})
+
+	monkeypatch.delenv("YOLO_CASCADE", raising=False)
+	assert resolve_cascade_model() == ""
+	monkeypatch.setenv("YOLO_CASCADE", "yolo11n")
+	assert resolve_cascade_model() == "yolo11n"
+	monkeypatch.setenv("YOLO_CASCADE", "../../x")
+	with pytest.raises(ValueError):
+		resolve_cascade_model()
@@ -0,0 +1,42 @@
+import numpy as np
+
+from backend.services.occupancy import SeatCounters
+
+
+def test_add_accepts_single_frames_and_batches():
+	counters = SeatCounters(3)
+	counters.add(np.array([True, False, False]), np.array([False, False, True]))
+	counters.add(np.array([[True, True, False], [False, False, False]]), np.zeros((2, 3), dtype=bool))
+	assert counters.person.tolist() == [2, 1, 0]
+	assert counters.object.tolist() == [0, 0, 1]
+	assert counters.frames.tolist() == [3, 3, 3]
+
+
+def test_restore_takes_masked_seats_from_other():
+	previous = SeatCounters(3)
+	previous.add(np.ones((4, 3), dtype=bool), np.zeros((4, 3), dtype=bool))
+	current = SeatCounters(3)
+	current.add(np.zeros((2, 3), dtype=bool), np.ones((2, 3), dtype=bool))
+
+	current.restore(previous, np.array([True, False, True]))
+	assert current.person.tolist() == [4, 0, 4]
+	assert current.object.tolist() == [0, 2, 0]
+	assert current.frames.tolist() == [4, 2, 4]
+	# restore copies values; later changes to either side stay independent
+	previous.add(np.ones(3, dtype=bool), np.ones(3, dtype=bool))
+	assert current.frames.tolist() == [4, 2, 4]
+
+
+def test_copy_is_independent_and_presence_uses_ratio():
+	counters = SeatCounters(2)
+	counters.add(np.array([[True, False], [False, False], [True, False]]), np.array([[False, True], [False, False], [False, False]]))
+	snapshot = counters.copy()
+	counters.add(np.ones(2, dtype=bool), np.ones(2, dtype=bool))
+	assert snapshot.frames.tolist() == [3, 3]
+
+	person, obj = snapshot.presence(0.3)
+	assert person.tolist() == [True, False]
+	assert obj.tolist() == [False, True]
+	# No analyzed frames: nothing is present
+	person, obj = SeatCounters(2).presence(0.3)
+	assert not person.any() and not obj.any()
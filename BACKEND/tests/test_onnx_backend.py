@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from backend.services.inference_backends import non_max_suppression_numpy
+
+
+def _greedy_nms(boxes, scores, iou_th):
+	"""Reference single-class NMS on xyxy boxes."""
+	order = np.argsort(-scores, kind="stable")
+	keep = []
+	while len(order):
+		i = order[0]
+		keep.append(i)
+		rest = order[1:]
+		x1 = np.maximum(boxes[i, 0], boxes[rest, 0])
+		y1 = np.maximum(boxes[i, 1], boxes[rest, 1])
+		x2 = np.minimum(boxes[i, 2], boxes[rest, 2])
+		y2 = np.minimum(boxes[i, 3], boxes[rest, 3])
+		inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+		area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+		iou = inter / (area[i] + area[rest] - inter)
+		order = rest[iou <= iou_th]
+	return keep
+
+
+def _random_pred(rng, batch=2, nc=3, anchors=200):
+	xy = rng.uniform(0, 640, (batch, 2, anchors))
+	wh = rng.uniform(20, 120, (batch, 2, anchors))
+	scores = rng.uniform(0, 1, (batch, nc, anchors)) ** 4
+	return np.concatenate([xy, wh, scores], axis=1).astype(np.float32)
+
+
+def test_numpy_nms_matches_greedy_reference():
+	rng = np.random.default_rng(0)
+	pred = _random_pred(rng)
+	conf_th, iou_th = 0.3, 0.45
+	rows = non_max_suppression_numpy(pred, conf_th, iou_th)
+
+	assert np.all(np.diff(rows[:, 0]) >= 0)
+	for b in range(pred.shape[0]):
+		p = pred[b].T
+		boxes = np.concatenate([p[:, :2] - p[:, 2:4] / 2, p[:, :2] + p[:, 2:4] / 2], axis=1)
+		expected = []
+		for c in range(3):
+			idx = np.flatnonzero(p[:, 4 + c] > conf_th)
+			for k in _greedy_nms(boxes[idx], p[idx, 4 + c], iou_th):
+				expected.append((*boxes[idx[k]], p[idx[k], 4 + c], c))
+		expected = np.array(sorted(expected, key=lambda r: -r[4]), dtype=np.float32)
+		got = rows[rows[:, 0] == b, 1:]
+		assert np.all(np.diff(got[:, 4]) <= 0)
+		assert np.allclose(got, expected, atol=1e-4)
+
+
+def test_numpy_nms_class_filter_and_empty_result():
+	rng = np.random.default_rng(1)
+	pred = _random_pred(rng)
+	rows = non_max_suppression_numpy(pred, 0.3, 0.45, classes=[2])
+	assert len(rows) and set(rows[:, 6].tolist()) == {2.0}
+	assert non_max_suppression_numpy(pred, 1.1, 0.45).shape == (0, 7)
+
+
+def test_onnx_backend_matches_torch(tmp_path):
+	torch = pytest.importorskip("torch")
+	pytest.importorskip("torchvision")
+	pytest.importorskip("onnxruntime")
+	from backend.services.inference_backends import OnnxBackend
+	from backend.services.torch_backend import TorchBackend
+	from backend.services.yolo_util import ensure_yolo_path, util
+	from tools.export_onnx import export_model
+
+	ensure_yolo_path()
+	from nets import nn
+
+	torch.manual_seed(0)
+	model = nn.yolo_v11_n(num_cls=80).float().eval()
+	imgsz = 320
+	onnx_path = export_model(model, tmp_path / "yolo_v11_n.onnx", imgsz=imgsz)
+
+	rng = np.random.default_rng(0)
+	x = rng.integers(0, 256, (2, 3, imgsz, imgsz), dtype=np.uint8)
+	ref = TorchBackend(model, "cpu")(x)
+	ref = (ref[0] if isinstance(ref, (list, tuple)) else ref).numpy()
+	got = OnnxBackend(onnx_path)(x)
+	assert isinstance(got, np.ndarray)
+	assert got.shape == ref.shape
+	assert np.abs(ref[:, :4] - got[:, :4]).max() <= 0.05
+	assert np.abs(ref[:, 4:] - got[:, 4:]).max() <= 1e-3
+
+	# Threshold well inside the score distribution so both paths keep boxes
+	conf_th = float(np.quantile(ref[:, 4:].max(axis=1), 0.99))
+	ref_rows = util.non_max_suppression_batched(torch.from_numpy(ref), conf_th, 0.45).numpy()
+	got_rows = non_max_suppression_numpy(got, conf_th, 0.45)
+	assert len(ref_rows) > 0
+	assert len(ref_rows) == len(got_rows)
+	assert np.array_equal(ref_rows[:, [0, 6]], got_rows[:, [0, 6]])
+	assert np.allclose(ref_rows[:, 1:5], got_rows[:, 1:5], atol=0.05)
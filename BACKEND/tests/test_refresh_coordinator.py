@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from backend.services.refresh_coordinator import RefreshCoordinator
+
+
+def _start(target, count):
+	threads = [threading.Thread(target=target) for _ in range(count)]
+	for t in threads:
+		t.start()
+	return threads
+
+
+def test_concurrent_callers_share_one_refresh():
+	coordinator = RefreshCoordinator(freshness=0.0)
+	release = threading.Event()
+	calls = []
+	outcomes = []
+	lock = threading.Lock()
+
+	def refresh():
+		calls.append(1)
+		release.wait(5.0)
+		return "rows"
+
+	def caller():
+		result = coordinator.run("F1", refresh)
+		with lock:
+			outcomes.append(result)
+
+	threads = _start(caller, 200)
+	# Let every caller join the in-flight refresh before it finishes
+	deadline = time.monotonic() + 5.0
+	while coordinator.stats().get("F1", {}).get("shared", 0) < 199 and time.monotonic() < deadline:
+		time.sleep(0.01)
+	release.set()
+	for t in threads:
+		t.join(5.0)
+
+	assert len(calls) == 1
+	assert coordinator.stats()["F1"] == {"runs": 1, "shared": 199, "fresh_hits": 0}
+	assert outcomes.count((True, "rows")) == 1
+	assert outcomes.count((False, None)) == 199
+
+
+def test_freshness_window_skips_the_refresh():
+	coordinator = RefreshCoordinator(freshness=60.0)
+	calls = []
+	assert coordinator.run("F1", lambda: calls.append(1) or "rows") == (True, "rows")
+	assert coordinator.run("F1", lambda: calls.append(1) or "rows") == (False, None)
+	assert len(calls) == 1
+	assert coordinator.stats()["F1"]["fresh_hits"] == 1
+	# freshness=0 forces a new run; other floors are independent
+	assert coordinator.run("F1", lambda: "again", freshness=0.0) == (True, "again")
+	assert coordinator.run("F2", lambda: "other") == (True, "other")
+
+
+def test_waiters_get_the_leaders_exception():
+	coordinator = RefreshCoordinator(freshness=0.0)
+	release = threading.Event()
+	errors = []
+
+	def refresh():
+		release.wait(5.0)
+		raise RuntimeError("camera offline")
+
+	def caller():
+		try:
+			coordinator.run("F1", refresh)
+		except RuntimeError as e:
+			errors.append(str(e))
+
+	threads = _start(caller, 5)
+	deadline = time.monotonic() + 5.0
+	while coordinator.stats().get("F1", {}).get("shared", 0) < 4 and time.monotonic() < deadline:
+		time.sleep(0.01)
+	release.set()
+	for t in threads:
+		t.join(5.0)
+	assert errors == ["camera offline"] * 5
+
+
+def test_failed_run_does_not_count_as_fresh():
+	coordinator = RefreshCoordinator(freshness=60.0)
+
+	def fail():
+		raise RuntimeError("boom")
+
+	with pytest.raises(RuntimeError):
+		coordinator.run("F1", fail)
+	# No finished_at from the failure: the next caller runs instead of being served stale
+	assert coordinator.run("F1", lambda: "rows") == (True, "rows")
+	assert coordinator.stats()["F1"] == {"runs": 2, "shared": 0, "fresh_hits": 0}
@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+import pytest
+
+from backend.services.roi_loader import compile_seat_raster, list_floor_ids, load_floor_config, point_in_polygon
+
+
+# 栅格化在多边形边缘上和射线法可能差一个像素，边缘附近的点不做比较
+EDGE_MARGIN = 2.0
+GRID_STEP = 8
+
+
+def _grid(frame_size):
+	width, height = frame_size
+	xs, ys = np.meshgrid(np.arange(0, width, GRID_STEP) + 0.5, np.arange(0, height, GRID_STEP) + 0.5)
+	return np.stack([xs.ravel(), ys.ravel()], axis=1)
+
+
+def _reference_hits(seats, points):
+	"""Per-point seat membership with the original polygon test, plus a near-edge mask."""
+	hits = np.zeros((len(points), len(seats)), dtype=bool)
+	near_edge = np.zeros(len(points), dtype=bool)
+	for j, s in enumerate(seats):
+		contour = np.asarray(s["desk_roi"], dtype=np.float32).reshape(-1, 1, 2)
+		for k, (x, y) in enumerate(points):
+			hits[k, j] = point_in_polygon((x, y), s["desk_roi"])
+			if abs(cv2.pointPolygonTest(contour, (float(x), float(y)), True)) < EDGE_MARGIN:
+				near_edge[k] = True
+	return hits, near_edge
+
+
+@pytest.mark.parametrize("floor_id", list_floor_ids())
+def test_raster_matches_point_in_polygon(floor_id):
+	data = load_floor_config(floor_id)
+	frame_size = (int(data["frame_size"][0]), int(data["frame_size"][1]))
+	raster = compile_seat_raster(data, frame_size)
+	points = _grid(frame_size)
+	expected, near_edge = _reference_hits(data["seats"], points)
+
+	got = raster.regions[raster.region_index(points)]
+	keep = ~near_edge
+	assert np.array_equal(got[keep], expected[keep])
+
+
+def test_overlapping_seats_both_hit():
+	data = load_floor_config("F1")
+	raster = compile_seat_raster(data, tuple(data["frame_size"]))
+	# 已发布的 F1 配置中桌面区域互相重叠，重叠像素必须同时属于两个座位
+	assert (raster.regions.sum(axis=1) > 1).any()
+	shared = raster.regions[raster.label_map].sum(axis=-1) > 1
+	ys, xs = np.nonzero(shared)
+	point = np.array([[xs[0] + 0.5, ys[0] + 0.5]])
+	assert raster.hit_mask(point).sum() > 1
+	assert np.array_equal(raster.hit_masks([point, np.empty((0, 2))]).sum(axis=1), [raster.hit_mask(point).sum(), 0])
+
+
+def test_seat_counts_counts_shared_pixels_for_each_seat():
+	data = {
+		"floor_id": "T",
+		"seats": [
+			{"seat_id": "A", "desk_roi": [[0, 0], [10, 0], [10, 10], [0, 10]]},
+			{"seat_id": "B", "desk_roi": [[5, 0], [15, 0], [15, 10], [5, 10]]},
+		],
+	}
+	raster = compile_seat_raster(data, (20, 12))
+	counts = raster.seat_counts(raster.label_map)
+	areas = [(raster.regions[raster.label_map][..., j]).sum() for j in range(2)]
+	assert counts.tolist() == areas
+	assert raster.hit_mask(np.array([[7.5, 5.5]])).tolist() == [True, True]
+	assert raster.hit_mask(np.array([[2.5, 5.5]])).tolist() == [True, False]
+	assert raster.hit_mask(np.array([[18.5, 5.5]])).tolist() == [False, False]
@@ -0,0 +1,152 @@
+import threading
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.db import Base
+from backend.models import Seat
+from backend.services import seat_state
+from backend.services.seat_state import provision_seats, seat_updates, write_seat_changes
+
+
+NOW = 10_000
+
+
+@pytest.fixture()
+def session_factory():
+	engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+	Base.metadata.create_all(engine)
+	yield sessionmaker(autocommit=False, autoflush=False, bind=engine), engine
+	engine.dispose()
+
+
+def _seats(db, floor_id="T", count=3):
+	provision_seats(db, floor_id, [{"seat_id": f"{floor_id}-{i}", "has_power": 0} for i in range(count)], force=True)
+	return db.query(Seat).filter(Seat.floor_id == floor_id).order_by(Seat.seat_id).all()
+
+
+def _observe(seats, empty, object_only=None, now=NOW, time_flush=60):
+	empty = np.asarray(empty, dtype=bool)
+	if object_only is None:
+		object_only = np.zeros(len(seats), dtype=bool)
+	return seat_updates(seats, now, empty, np.asarray(object_only, dtype=bool), time_flush)
+
+
+def test_seat_updates_only_returns_seats_that_need_a_write(session_factory):
+	factory, _ = session_factory
+	db = factory()
+	seats = _seats(db)
+	for seat in seats:
+		seat.last_update_ts = NOW - 5
+		seat.last_state_is_empty = True
+		seat.is_empty = True
+	db.commit()
+
+	# Same state, time accounting only 5 s old: nothing to write
+	assert _observe(seats, [True, True, True]) == []
+
+	# Seat 1 became occupied: its state columns change, the others stay deferred
+	changes = _observe(seats, [True, False, True])
+	assert [seat.seat_id for seat, _ in changes] == ["T-1"]
+	values = changes[0][1]
+	assert values["is_empty"] is False
+	assert values["last_state_is_empty"] is False
+	assert values["change_count"] == 1
+	assert values["daily_empty_seconds"] == 5
+	assert "is_malicious" not in values
+
+	# Time accounting older than time_flush is written even without a state change
+	changes = _observe(seats, [True, True, True], now=NOW + 120)
+	assert len(changes) == 3
+	assert set(changes[0][1]) == {"last_update_ts", "daily_empty_seconds", "total_empty_seconds"}
+
+
+def test_seat_updates_respects_lock(session_factory):
+	factory, _ = session_factory
+	db = factory()
+	seats = _seats(db, count=1)
+	seats[0].lock_until_ts = NOW + 60
+	seats[0].last_update_ts = NOW - 5
+	db.commit()
+
+	values = dict(_observe(seats, [False]))[seats[0]]
+	assert "is_empty" not in values
+	assert values["last_state_is_empty"] is False
+
+
+def test_write_seat_changes_updates_only_changed_columns(session_factory):
+	factory, engine = session_factory
+	db = factory()
+	seats = _seats(db)
+	for seat in seats:
+		seat.last_update_ts = NOW - 5
+	db.commit()
+
+	# An admin edit to another column lands between the read and the write
+	admin = factory()
+	admin.query(Seat).filter(Seat.seat_id == "T-0").update({"is_reported": True})
+	admin.commit()
+	admin.close()
+
+	statements = []
+
+	@event.listens_for(engine, "before_cursor_execute")
+	def _count(conn, cursor, statement, parameters, context, executemany):
+		if statement.startswith("UPDATE"):
+			statements.append((statement, executemany))
+
+	changes = _observe(seats, [False, False, True])
+	write_seat_changes(db, "T", changes)
+	event.remove(engine, "before_cursor_execute", _count)
+
+	# Both occupied seats share one column set: a single executemany UPDATE
+	assert len(statements) == 1
+	assert statements[0][1] is True
+	assert "is_reported" not in statements[0][0]
+	# Written values are committed state on the loaded objects, nothing left dirty
+	assert not db.dirty
+	assert seats[0].is_empty is False
+
+	check = factory()
+	rows = {seat.seat_id: seat for seat in check.query(Seat).all()}
+	assert rows["T-0"].is_reported is True
+	assert rows["T-0"].is_empty is False
+	assert rows["T-1"].is_empty is False
+	assert rows["T-2"].is_empty is True
+	check.close()
+	db.close()
+
+
+def test_concurrent_provision_inserts_each_seat_once(tmp_path, monkeypatch):
+	monkeypatch.setattr(seat_state, "_provisioned", {})
+	engine = create_engine(f"sqlite:///{tmp_path / 'seats.db'}", connect_args={"check_same_thread": False, "timeout": 30})
+	Base.metadata.create_all(engine)
+	factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+	seats_cfg = [{"seat_id": f"P-{i}", "has_power": i % 2} for i in range(5)]
+	barrier = threading.Barrier(8)
+	errors = []
+
+	def worker():
+		db = factory()
+		try:
+			barrier.wait()
+			provision_seats(db, "P", seats_cfg)
+		except Exception as e:
+			errors.append(e)
+		finally:
+			db.close()
+
+	threads = [threading.Thread(target=worker) for _ in range(8)]
+	for t in threads:
+		t.start()
+	for t in threads:
+		t.join()
+
+	assert errors == []
+	check = factory()
+	assert sorted(row[0] for row in check.query(Seat.seat_id).all()) == [f"P-{i}" for i in range(5)]
+	check.close()
+	engine.dispose()
@@ -0,0 +1,47 @@
+import numpy as np
+
+from backend.services.sequential import SequentialSampler
+
+
+def _frames(person, obj, n):
+	return np.tile(np.asarray(person, dtype=bool), (n, 1)), np.tile(np.asarray(obj, dtype=bool), (n, 1))
+
+
+def test_not_settled_before_min_frames():
+	sampler = SequentialSampler(2, min_frames=4)
+	sampler.update(*_frames([True, True], [True, True], 3))
+	assert sampler.frames == 3
+	assert not sampler.settled()
+	sampler.update(*_frames([True, True], [True, True], 1))
+	assert sampler.settled()
+
+
+def test_empty_seats_settle_after_enough_misses():
+	sampler = SequentialSampler(1, min_frames=4)
+	sampler.update(*_frames([False], [False], 4))
+	# 4 misses are not yet enough evidence at alpha = beta = 0.05
+	assert not sampler.settled()
+	sampler.update(*_frames([False], [False], 3))
+	assert sampler.settled()
+	assert (sampler.llr() <= sampler.lower).all()
+
+
+def test_undecided_seat_blocks_unless_masked_out():
+	sampler = SequentialSampler(2, min_frames=4)
+	# Seat 0 is clearly occupied; seat 1 alternates right at the threshold
+	for i in range(8):
+		sampler.update(np.array([True, i % 3 == 0]), np.array([True, False]))
+	assert not sampler.settled()
+	assert sampler.settled(np.array([True, False]))
+
+
+def test_single_frame_and_batch_updates_agree():
+	rng = np.random.default_rng(0)
+	person = rng.random((6, 3)) < 0.4
+	obj = rng.random((6, 3)) < 0.2
+	one, batch = SequentialSampler(3), SequentialSampler(3)
+	for p, o in zip(person, obj):
+		one.update(p, o)
+	batch.update(person, obj)
+	assert one.frames == batch.frames == 6
+	assert np.array_equal(one.hits, batch.hits)
@@ -0,0 +1,114 @@
+import time
+
+import numpy as np
+import pytest
+
+from backend.services import yolo_service
+from backend.services.detections import FrameDetections, seat_classes
+from backend.services.occupancy import DecayedSeatRatios
+from backend.services.streaming import FloorStreamSampler
+
+
+CLASSES = seat_classes({0: "person", 1: "laptop", 2: "car"})
+
+FLOOR_CFG = {
+	"floor_id": "STREAM-TEST",
+	"frame_size": [100, 100],
+	"seats": [
+		{"seat_id": "S-A", "desk_roi": [[0, 0], [40, 0], [40, 40], [0, 40]]},
+		{"seat_id": "S-B", "desk_roi": [[60, 60], [100, 60], [100, 100], [60, 100]]},
+	],
+}
+SEAT_IDS = ["S-A", "S-B"]
+
+
+def test_decayed_ratios_weight_frames_by_age():
+	ratios = DecayedSeatRatios(2, half_life=1.0)
+	ratios.add(np.array([1.0, 0.0]), np.array([0.0, 1.0]), ts=0.0)
+	# One half-life later the first frame counts half as much as the new one
+	ratios.add(np.array([0.0, 0.0]), np.array([0.0, 1.0]), ts=1.0)
+	person, obj = ratios.ratios()
+	np.testing.assert_allclose(person, [0.5 / 1.5, 0.0])
+	np.testing.assert_allclose(obj, [0.0, 1.0])
+	# Same timestamp: no further decay, plain weight 1
+	ratios.add(np.array([0.0, 0.0]), np.array([0.0, 0.0]), ts=1.0)
+	person, obj = ratios.ratios()
+	np.testing.assert_allclose(person, [0.5 / 2.5, 0.0])
+	np.testing.assert_allclose(obj, [0.0, 1.5 / 2.5])
+	assert ratios.frames == 3
+
+
+def test_decayed_ratios_ignore_timestamps_going_backwards():
+	ratios = DecayedSeatRatios(1, half_life=1.0)
+	ratios.add(np.array([1.0]), np.array([0.0]), ts=10.0)
+	ratios.add(np.array([0.0]), np.array([0.0]), ts=5.0)
+	person, _ = ratios.ratios()
+	np.testing.assert_allclose(person, [0.5])
+
+
+class FakeExecutor:
+	def __init__(self, boxes):
+		self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 6)
+
+	def detect_frames(self, frames, crop=None):
+		return [FrameDetections(self.boxes, CLASSES) for _ in frames]
+
+
+def _sampler(boxes):
+	return FloorStreamSampler("STREAM-TEST", FLOOR_CFG, vstate=None, executor=FakeExecutor(boxes), rate=2.0, half_life=5.0)
+
+
+FRAME = np.zeros((100, 100, 3), dtype=np.uint8)
+# A person centered in seat A, a laptop centered in seat B, a car ignored
+BOXES = [
+	[10, 10, 30, 30, 0.9, 0],
+	[70, 70, 90, 90, 0.8, 1],
+	[70, 70, 90, 90, 0.8, 2],
+]
+
+
+def test_estimate_reports_recent_frames():
+	sampler = _sampler(BOXES)
+	assert sampler.estimate(SEAT_IDS) is None
+	sampler._analyze(FRAME, time.monotonic())
+	person, obj = sampler.estimate(SEAT_IDS)
+	np.testing.assert_allclose(person, [1.0, 0.0])
+	np.testing.assert_allclose(obj, [0.0, 1.0])
+
+
+def test_estimate_is_none_once_stale():
+	sampler = _sampler(BOXES)
+	sampler._analyze(FRAME, time.monotonic() - sampler.stale_after - 1.0)
+	assert sampler.estimate(SEAT_IDS) is None
+
+
+def test_estimate_is_none_for_another_seat_layout():
+	sampler = _sampler(BOXES)
+	sampler._analyze(FRAME, time.monotonic())
+	assert sampler.estimate(["S-A"]) is None
+	assert sampler.estimate(["S-B", "S-A"]) is None
+
+
+def test_reopening_a_file_stops_the_sampler_before_release(monkeypatch, tmp_path):
+	events = []
+
+	class ClosedCap:
+		def isOpened(self):
+			return False
+
+		def release(self):
+			events.append("release")
+
+	class Stream:
+		def stop(self):
+			events.append("stop")
+
+	path = str(tmp_path / "missing.mp4")
+	state = yolo_service.VideoState(cap=ClosedCap(), total_frames=10, fps=30.0, next_frame_idx=0, stream_path=path)
+	monkeypatch.setitem(yolo_service._video_states, "STREAM-TEST", state)
+	monkeypatch.setitem(yolo_service._streams, "STREAM-TEST", Stream())
+
+	new_state = yolo_service._open_or_get_video_state("STREAM-TEST", path)
+	assert events == ["stop", "release"]
+	assert "STREAM-TEST" not in yolo_service._streams
+	assert new_state is not state
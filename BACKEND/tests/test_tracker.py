@@ -0,0 +1,69 @@
+import numpy as np
+
+from backend.services.detections import FrameDetections, seat_classes
+from backend.services.tracker import IoUTracker, box_iou, detect_sparse
+
+
+CLASSES = seat_classes({0: "person", 24: "backpack", 2: "car"})
+
+
+def _dets(*rows):
+	boxes = np.array(rows, dtype=np.float32).reshape(-1, 6)
+	return FrameDetections(boxes, CLASSES)
+
+
+def test_box_iou():
+	a = np.array([[0, 0, 10, 10]], dtype=np.float32)
+	b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]], dtype=np.float32)
+	assert np.allclose(box_iou(a, b), [[1.0, 1 / 3, 0.0]])
+
+
+def test_matched_track_follows_detection_and_learns_velocity():
+	tracker = IoUTracker(iou_th=0.3, max_misses=1, alpha=1.0)
+	tracker.update(_dets([0, 0, 10, 10, 0.9, 0]))
+	out = tracker.update(_dets([2, 0, 12, 10, 0.8, 0]))
+	assert len(tracker) == 1
+	assert np.allclose(out.boxes[0, :4], [2, 0, 12, 10])
+	assert out.person.tolist() == [True]
+	# In-between frame: constant-velocity prediction
+	predicted = tracker.predict()
+	assert np.allclose(predicted.boxes[0, :4], [4, 0, 14, 10])
+
+
+def test_unmatched_track_coasts_for_max_misses_detector_frames():
+	tracker = IoUTracker(iou_th=0.3, max_misses=1)
+	tracker.update(_dets([0, 0, 10, 10, 0.9, 24]))
+
+	# First detector frame without a match: the track is still emitted (coasting)
+	out = tracker.update(_dets())
+	assert len(out) == 1
+	assert out.object.tolist() == [True]
+	# Frames predicted in between keep emitting it too
+	assert len(tracker.predict()) == 1
+
+	# Second miss exceeds TRACK_MAX_MISSES=1: dropped
+	out = tracker.update(_dets())
+	assert len(out) == 0
+	assert len(tracker) == 0
+
+
+def test_tracks_only_match_boxes_of_the_same_class():
+	tracker = IoUTracker(iou_th=0.3, max_misses=0)
+	tracker.update(_dets([0, 0, 10, 10, 0.9, 0]))
+	out = tracker.update(_dets([0, 0, 10, 10, 0.9, 24]))
+	# The person track is dropped (max_misses=0) and the backpack starts its own track
+	assert out.boxes[:, 5].tolist() == [24.0]
+
+
+def test_detect_sparse_calls_detector_on_every_nth_frame():
+	calls = []
+
+	def detect(frames):
+		calls.append(len(frames))
+		return [_dets([0, 0, 10, 10, 0.9, 0]) for _ in frames]
+
+	frames = [np.zeros((2, 2, 3), dtype=np.uint8)] * 7
+	out = detect_sparse(frames, detect, IoUTracker(), every=3)
+	assert calls == [3]  # frames 0, 3, 6 in one batch
+	assert len(out) == 7
+	assert all(len(d) == 1 for d in out)
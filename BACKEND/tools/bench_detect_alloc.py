@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path so `import backend` works even if CWD is tools/
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+import torch
+from torch.profiler import ProfilerActivity, profile
+
+from backend.services.torch_backend import load_torch_model
+from backend.services.yolo_util import ensure_yolo_path
+
+
+def _build_model(weights: str | None, size: str) -> torch.nn.Module:
+	if weights:
+		model, _ = load_torch_model(Path(weights), "cpu", fuse=True)
+		return model
+	ensure_yolo_path()
+	from nets import nn
+	return getattr(nn, f"yolo_v11_{size}")().eval()
+
+
+@torch.no_grad()
+def _measure(model: torch.nn.Module, feats: list, iters: int) -> tuple[int, int, float]:
+	"""
+	Allocations (count, bytes) and mean time of Detect alone over iters calls.
+	"""
+	detect = model.detect
+	detect(list(feats))  # first call builds the static cache, if enabled
+	with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+		for _ in range(iters):
+			detect(list(feats))
+	count = 0
+	allocated = 0
+	for event in prof.events():
+		if event.name == "[memory]" and event.cpu_memory_usage > 0:
+			count += 1
+			allocated += event.cpu_memory_usage
+	t0 = time.perf_counter()
+	for _ in range(iters):
+		detect(list(feats))
+	elapsed = (time.perf_counter() - t0) / iters
+	return count // iters, allocated // iters, elapsed
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Per-call allocations of Detect: dynamic vs static-shape mode")
+	parser.add_argument("--weights", default=None, help="Checkpoint to load (default: randomly initialized model of --size)")
+	parser.add_argument("--size", default="n", choices=["n", "s", "m", "l", "x"])
+	parser.add_argument("--batch", type=int, default=8)
+	parser.add_argument("--imgsz", type=int, default=640)
+	parser.add_argument("--iters", type=int, default=50)
+	args = parser.parse_args()
+
+	model = _build_model(args.weights, args.size)
+	x = torch.rand(args.batch, 3, args.imgsz, args.imgsz)
+	with torch.no_grad():
+		feats = list(model.head(model.backbone(x)))
+
+	print(f"{'mode':<10}{'allocs/call':>14}{'MiB/call':>12}{'ms/call':>10}")
+	for mode, enabled in (("dynamic", False), ("static", True)):
+		model.static_shapes(enabled)
+		count, allocated, elapsed = _measure(model, feats, args.iters)
+		print(f"{mode:<10}{count:>14}{allocated / 2**20:>12.2f}{elapsed * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+	main()
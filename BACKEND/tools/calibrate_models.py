@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path so `import backend` works even if CWD is tools/
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.evaluation import Agreement, read_floor_clips, seat_decisions_from_detections
+from backend.services.roi_loader import list_floor_ids, load_floor_config
+from backend.services.yolo_service import DEFAULT_MODEL, MODEL_SIZES, YOLODetector, model_weights_path
+
+
+def _available_models(requested: list[str] | None) -> list[str]:
+	names = requested or [f"yolo11{size}" for size in MODEL_SIZES]
+	found = []
+	for name in names:
+		if model_weights_path(name).exists():
+			found.append(name)
+		else:
+			print(f"Skip {name}: {model_weights_path(name).as_posix()} not found")
+	return found
+
+
+def calibrate(models: list[str], reference: str, floor_ids: list[str], windows: int, window_frames: int, batch: int) -> None:
+	"""
+	Replay each floor's clips through every model; report throughput and per-seat
+	empty/occupied agreement with the reference model.
+	"""
+	floors = []
+	for floor_id in floor_ids:
+		cfg = load_floor_config(floor_id)
+		clips = read_floor_clips(cfg, windows, window_frames)
+		if not clips:
+			print(f"Skip floor {floor_id}: no frames from {cfg['stream_path']}")
+			continue
+		floors.append((floor_id, cfg, clips))
+	if not floors:
+		raise SystemExit("No floor clips to replay")
+
+	decisions: dict[str, dict[str, list]] = {}
+	fps: dict[str, float] = {}
+	for name in [reference] + [m for m in models if m != reference]:
+		detector = YOLODetector(model_name=name, max_batch=batch)
+		# Warm up every batch bucket so no timed batch pays for lazy initialization or tracing
+		detector.warmup()
+		frames = 0
+		elapsed = 0.0
+		decisions[name] = {}
+		for floor_id, cfg, clips in floors:
+			per_clip = []
+			for clip in clips:
+				t0 = time.perf_counter()
+				batch_dets = detector.detect_frames(clip, max_batch=batch)
+				elapsed += time.perf_counter() - t0
+				frames += len(clip)
+				per_clip.append(seat_decisions_from_detections(cfg, clip, batch_dets))
+			decisions[name][floor_id] = per_clip
+		fps[name] = frames / elapsed if elapsed > 0 else 0.0
+		del detector
+
+	print()
+	print(f"{'model':<12}{'fps':>10}{'agree':>10}   per floor (vs {reference})")
+	for name in decisions:
+		total = Agreement()
+		per_floor = []
+		for floor_id, _, _ in floors:
+			floor_agreement = Agreement()
+			for idx, (ref, got) in enumerate(zip(decisions[reference][floor_id], decisions[name][floor_id])):
+				floor_agreement.add(idx, ref, got)
+				total.add(idx, ref, got)
+			per_floor.append(f"{floor_id}={floor_agreement.rate:.1%}")
+		print(f"{name:<12}{fps[name]:>10.2f}{total.rate:>10.1%}   {' '.join(per_floor)}")
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Compare YOLO model sizes: throughput vs seat-decision agreement with yolo11x")
+	parser.add_argument("--models", nargs="*", default=None, help="Model names under yolov11/weights (default: every yolo11{n,s,m,l,x}.pt found)")
+	parser.add_argument("--reference", default=DEFAULT_MODEL, help="Reference model for agreement (default yolo11x)")
+	parser.add_argument("--floors", nargs="*", default=None, help="Floor ids (default: all configured floors)")
+	parser.add_argument("--windows", type=int, default=5, help="Clips per floor")
+	parser.add_argument("--window-frames", type=int, default=0, help="Frames per clip (default: one second of video)")
+	parser.add_argument("--batch", type=int, default=8, help="Frames per forward pass")
+	args = parser.parse_args()
+
+	if not model_weights_path(args.reference).exists():
+		raise SystemExit(f"Reference weights not found: {model_weights_path(args.reference).as_posix()}")
+	models = _available_models(args.models)
+	calibrate(models, args.reference, args.floors or list_floor_ids(), args.windows, args.window_frames, args.batch)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path so `import backend` works even if CWD is tools/
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.cascade import ModelCascade
+from backend.services.evaluation import Agreement, count_seat_hits, read_floor_clips, seat_decisions_from_counters
+from backend.services.roi_loader import get_seat_raster, list_floor_ids, load_floor_config
+from backend.services.yolo_service import DEFAULT_MODEL, PRESENCE_RATIO, YOLODetector, model_weights_path
+
+
+def evaluate(small: str, large: str, floor_ids: list[str], windows: int, window_frames: int, batch: int, conf_band: tuple[float, float], ratio_margin: float) -> None:
+	"""
+	Replay each floor's clips through the pure large model (reference) and through the
+	small -> large cascade; report time, frame/seat escalation rates and per-seat
+	empty/occupied agreement with the reference.
+	"""
+	floors = []
+	for floor_id in floor_ids:
+		cfg = load_floor_config(floor_id)
+		clips = read_floor_clips(cfg, windows, window_frames)
+		if not clips:
+			print(f"Skip floor {floor_id}: no frames from {cfg['stream_path']}")
+			continue
+		floors.append((floor_id, cfg, clips))
+	if not floors:
+		raise SystemExit("No floor clips to replay")
+
+	small_detector = YOLODetector(model_name=small, max_batch=batch)
+	large_detector = YOLODetector(model_name=large, max_batch=batch)
+	# Warm up every batch bucket so no timed batch pays for lazy initialization or tracing
+	for detector in (small_detector, large_detector):
+		detector.warmup()
+
+	def run(detector):
+		return lambda frames, crop: detector.detect_frames(frames, max_batch=batch, crops=[crop] * len(frames))
+
+	large_calls = 0
+
+	def counted_large(frames, crop):
+		nonlocal large_calls
+		large_calls += len(frames)
+		return run(large_detector)(frames, crop)
+
+	cascade = ModelCascade(run(small_detector), counted_large, PRESENCE_RATIO, conf_band=conf_band, ratio_margin=ratio_margin)
+
+	ref_seconds = 0.0
+	cascade_seconds = 0.0
+	total = Agreement()
+	per_floor = []
+	for floor_id, cfg, clips in floors:
+		floor_agreement = Agreement()
+		for idx, clip in enumerate(clips):
+			h, w = clip[0].shape[:2]
+			raster = get_seat_raster(cfg, (w, h))
+
+			t0 = time.perf_counter()
+			ref = seat_decisions_from_counters(raster, count_seat_hits(raster, run(large_detector)(clip, None)))
+			ref_seconds += time.perf_counter() - t0
+
+			t0 = time.perf_counter()
+			counters = count_seat_hits(raster, cascade.detect(clip, raster))
+			cascade.refine(clip, raster, counters)
+			got = seat_decisions_from_counters(raster, counters)
+			cascade_seconds += time.perf_counter() - t0
+
+			floor_agreement.add(idx, ref, got)
+			total.add(idx, ref, got)
+		per_floor.append(f"{floor_id}={floor_agreement.rate:.1%}")
+
+	stats = cascade.stats.snapshot()
+	print()
+	print(f"{large} only:  {ref_seconds:.2f} s")
+	print(f"{small} -> {large}:  {cascade_seconds:.2f} s, {large} ran on {large_calls} frames")
+	print(f"frame escalation rate: {stats['frame_escalation_rate']:.1%} ({stats['escalated_frames']}/{stats['frames']})")
+	print(f"seat escalation rate:  {stats['seat_escalation_rate']:.1%} ({stats['escalated_seats']}/{stats['seats']})")
+	print(f"agreement with {large}: {total.rate:.1%}   {' '.join(per_floor)}")
+	for seat_id, clip_idx, ref_dec, dec in total.mismatches[:10]:
+		print(f"    mismatch {seat_id} clip {clip_idx}: {large} {ref_dec} vs cascade {dec}")
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Compare the small -> large model cascade (YOLO_CASCADE) with the large model alone")
+	parser.add_argument("--small", default="yolo11n", help="First-stage model (default yolo11n)")
+	parser.add_argument("--large", default=DEFAULT_MODEL, help="Escalation / reference model (default yolo11x)")
+	parser.add_argument("--floors", nargs="*", default=None, help="Floor ids (default: all configured floors)")
+	parser.add_argument("--windows", type=int, default=5, help="Clips per floor")
+	parser.add_argument("--window-frames", type=int, default=0, help="Frames per clip (default: one second of video)")
+	parser.add_argument("--batch", type=int, default=8, help="Frames per forward pass")
+	parser.add_argument("--conf-low", type=float, default=0.15, help="CASCADE_CONF_LOW")
+	parser.add_argument("--conf-high", type=float, default=0.5, help="CASCADE_CONF_HIGH")
+	parser.add_argument("--ratio-margin", type=float, default=0.1, help="CASCADE_RATIO_MARGIN")
+	args = parser.parse_args()
+
+	for name in (args.small, args.large):
+		if not model_weights_path(name).exists():
+			raise SystemExit(f"Weights not found: {model_weights_path(name).as_posix()}")
+	evaluate(
+		args.small,
+		args.large,
+		args.floors or list_floor_ids(),
+		args.windows,
+		args.window_frames,
+		args.batch,
+		(args.conf_low, args.conf_high),
+		args.ratio_margin,
+	)
+
+
+if __name__ == "__main__":
+	main()
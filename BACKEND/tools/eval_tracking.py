@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import argparse
+import functools
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path so `import backend` works even if CWD is tools/
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.evaluation import Agreement, read_floor_clips, seat_decisions_from_detections
+from backend.services.roi_loader import list_floor_ids, load_floor_config
+from backend.services.tracker import IoUTracker, detect_sparse
+from backend.services.yolo_service import YOLODetector
+
+
+def evaluate(model: str | None, floor_ids: list[str], windows: int, window_frames: int, every: list[int], batch: int, iou_th: float, max_misses: int) -> None:
+	"""
+	Replay each floor's clips with detection on every frame (reference) and with
+	detection on every Nth frame plus tracking; report detector calls, time and per-seat
+	empty/occupied agreement with the reference.
+	"""
+	floors = []
+	for floor_id in floor_ids:
+		cfg = load_floor_config(floor_id)
+		clips = read_floor_clips(cfg, windows, window_frames)
+		if not clips:
+			print(f"Skip floor {floor_id}: no frames from {cfg['stream_path']}")
+			continue
+		floors.append((floor_id, cfg, clips))
+	if not floors:
+		raise SystemExit("No floor clips to replay")
+
+	detector = YOLODetector(model_name=model, max_batch=batch)
+	# Warm up every batch bucket so no timed batch pays for lazy initialization or tracing
+	detector.warmup()
+	detect = functools.partial(detector.detect_frames, max_batch=batch)
+
+	print(f"{'every':>6}{'calls':>10}{'seconds':>10}{'agree':>10}   per floor (vs every=1)")
+	reference: dict[str, list] = {}
+	for n in [1] + [k for k in every if k > 1]:
+		calls = 0
+		elapsed = 0.0
+		total = Agreement()
+		per_floor = []
+
+		def counted(frames):
+			nonlocal calls
+			calls += len(frames)
+			return detect(frames)
+
+		for floor_id, cfg, clips in floors:
+			floor_agreement = Agreement()
+			decisions = []
+			for clip in clips:
+				tracker = IoUTracker(iou_th=iou_th, max_misses=max_misses) if n > 1 else None
+				t0 = time.perf_counter()
+				batch_dets = detect_sparse(clip, counted, tracker, n)
+				elapsed += time.perf_counter() - t0
+				decisions.append(seat_decisions_from_detections(cfg, clip, batch_dets))
+			if n == 1:
+				reference[floor_id] = decisions
+			for idx, (ref, got) in enumerate(zip(reference[floor_id], decisions)):
+				floor_agreement.add(idx, ref, got)
+				total.add(idx, ref, got)
+			per_floor.append(f"{floor_id}={floor_agreement.rate:.1%}")
+		print(f"{n:>6}{calls:>10}{elapsed:>10.2f}{total.rate:>10.1%}   {' '.join(per_floor)}")
+		for seat_id, clip_idx, ref_dec, dec in total.mismatches[:10]:
+			print(f"    mismatch {seat_id} clip {clip_idx}: every=1 {ref_dec} vs {dec}")
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Compare detect-every-Nth-frame + IoU tracking against detecting every frame")
+	parser.add_argument("--model", default=None, help="Model name under yolov11/weights (default YOLO_MODEL, then yolo11x)")
+	parser.add_argument("--every", type=int, nargs="*", default=[2, 3, 5], help="YOLO_TRACK_EVERY values to try")
+	parser.add_argument("--floors", nargs="*", default=None, help="Floor ids (default: all configured floors)")
+	parser.add_argument("--windows", type=int, default=5, help="Clips per floor")
+	parser.add_argument("--window-frames", type=int, default=0, help="Frames per clip (default: one second of video)")
+	parser.add_argument("--batch", type=int, default=8, help="Frames per forward pass")
+	parser.add_argument("--iou", type=float, default=0.3, help="TRACK_IOU_THRESHOLD")
+	parser.add_argument("--max-misses", type=int, default=1, help="TRACK_MAX_MISSES")
+	args = parser.parse_args()
+	evaluate(args.model, args.floors or list_floor_ids(), args.windows, args.window_frames, args.every, args.batch, args.iou, args.max_misses)
+
+
+if __name__ == "__main__":
+	main()
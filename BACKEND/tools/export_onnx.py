@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path so `import backend` works even if CWD is tools/
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+import cv2
+import numpy as np
+import torch
+
+from backend.services.inference_backends import (
+	OnnxBackend,
+	onnx_artifact_path,
+	read_artifact_meta,
+	weights_sha256,
+	write_artifact_meta,
+)
+from backend.services.roi_loader import list_floor_ids, load_floor_config
+from backend.services.torch_backend import DetectOutput, TorchBackend, load_torch_model
+from backend.services.yolo_service import letterbox
+from backend.services.yolo_util import util
+
+
+DEFAULT_WEIGHTS = PROJECT_ROOT / "yolov11" / "weights" / "yolo11x.pt"
+
+
+def export(weights: Path, out: Path, opset: int, imgsz: int, force: bool) -> Path:
+	sha = weights_sha256(weights)
+	meta = read_artifact_meta(out)
+	if not force and out.exists() and meta and meta.get("weights_sha256") == sha and meta.get("imgsz") == imgsz:
+		print(f"Up to date: {out.as_posix()}")
+		return out
+
+	model, ckpt = load_torch_model(weights, "cpu")
+	export_model(model, out, opset, imgsz)
+	meta = {
+		"weights": weights.name,
+		"weights_sha256": sha,
+		"imgsz": imgsz,
+		"opset": opset,
+		"torch": torch.__version__,
+	}
+	if ckpt.get("names"):
+		meta["names"] = ckpt["names"]
+	write_artifact_meta(out, meta)
+	print(f"Wrote {out.as_posix()}")
+	return out
+
+
+def export_model(model: torch.nn.Module, out: Path, opset: int = 17, imgsz: int = 640) -> Path:
+	"""
+	Export a loaded yolov11 model's decoded predictions to ONNX with a dynamic batch axis.
+	"""
+	dummy = torch.zeros(1, 3, imgsz, imgsz)
+	out.parent.mkdir(parents=True, exist_ok=True)
+	torch.onnx.export(
+		DetectOutput(model),
+		dummy,
+		out.as_posix(),
+		opset_version=opset,
+		input_names=["images"],
+		output_names=["output"],
+		dynamic_axes={"images": {0: "batch"}, "output": {0: "batch"}},
+		do_constant_folding=True,
+	)
+	return out
+
+
+def _sample_frames(video: str | None, count: int) -> list[np.ndarray]:
+	paths = [video] if video else []
+	if not paths:
+		for floor_id in list_floor_ids():
+			try:
+				stream = Path(load_floor_config(floor_id)["stream_path"])
+			except Exception:
+				continue
+			paths.append((stream if stream.is_absolute() else PROJECT_ROOT / stream).as_posix())
+	frames: list[np.ndarray] = []
+	for path in paths:
+		cap = cv2.VideoCapture(path)
+		while cap.isOpened() and len(frames) < count:
+			ok, frame = cap.read()
+			if not ok or frame is None:
+				break
+			frames.append(frame)
+		cap.release()
+		if len(frames) >= count:
+			break
+	if not frames:
+		# No video available: random noise still exercises every operator
+		rng = np.random.default_rng(0)
+		frames = [rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8) for _ in range(count)]
+	return frames
+
+
+@torch.no_grad()
+def check(weights: Path, onnx_path: Path, video: str | None, count: int, atol: float, box_atol: float) -> bool:
+	"""
+	Equivalence check: same letterboxed batch through torch and ONNX Runtime.
+	Compares raw predictions and the post-NMS detections.
+	"""
+	model, _ = load_torch_model(weights, "cpu")
+	torch_backend = TorchBackend(model, "cpu")
+	onnx_backend = OnnxBackend(onnx_path)
+
+	images = [letterbox(frame)[0] for frame in _sample_frames(video, count)]
+	x = np.ascontiguousarray(np.stack(images).transpose((0, 3, 1, 2))[:, ::-1])
+	ref = torch_backend(x)
+	ref = ref[0] if isinstance(ref, (list, tuple)) else ref
+	got = torch.from_numpy(onnx_backend(x))
+
+	box_diff = (ref[:, :4] - got[:, :4]).abs().max().item()
+	cls_diff = (ref[:, 4:] - got[:, 4:]).abs().max().item()
+	print(f"max |box diff| = {box_diff:.5f} px, max |score diff| = {cls_diff:.6f}")
+
+	ok = cls_diff <= atol and box_diff <= box_atol
+	for i, (a, b) in enumerate(zip(util.non_max_suppression(ref.clone(), 0.15, 0.2), util.non_max_suppression(got.clone(), 0.15, 0.2))):
+		same_count = len(a) == len(b)
+		same_classes = same_count and torch.equal(a[:, 5].sort().values, b[:, 5].sort().values)
+		print(f"frame {i}: torch {len(a)} boxes, onnx {len(b)} boxes{'' if same_classes else '  <-- mismatch'}")
+		ok = ok and same_classes
+	print("PASS" if ok else "FAIL")
+	return ok
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Export the YOLO checkpoint to ONNX for YOLO_BACKEND=onnx")
+	parser.add_argument("--weights", default=DEFAULT_WEIGHTS.as_posix(), help="Checkpoint path (default yolov11/weights/yolo11x.pt)")
+	parser.add_argument("--out", default=None, help="ONNX output path (default: next to the weights, .onnx)")
+	parser.add_argument("--opset", type=int, default=17)
+	parser.add_argument("--imgsz", type=int, default=640)
+	parser.add_argument("--force", action="store_true", help="Re-export even if the cached artifact matches the weights")
+	parser.add_argument("--check", action="store_true", help="Compare ONNX Runtime against torch after exporting")
+	parser.add_argument("--video", default=None, help="Video for --check (default: floor streams from config/floors)")
+	parser.add_argument("--frames", type=int, default=4, help="Frames used by --check")
+	parser.add_argument("--atol", type=float, default=1e-3, help="Max allowed class score difference for --check")
+	parser.add_argument("--box-atol", type=float, default=0.05, help="Max allowed box coordinate difference in input pixels for --check")
+	args = parser.parse_args()
+
+	weights = Path(args.weights)
+	out = Path(args.out) if args.out else onnx_artifact_path(weights)
+	export(weights, out, args.opset, args.imgsz, args.force)
+	if args.check and not check(weights, out, args.video, args.frames, args.atol, args.box_atol):
+		raise SystemExit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path so `import backend` works even if CWD is tools/
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+import torch
+import yaml
+
+from backend.services.inference_backends import pruned_weights_path, weights_sha256, write_artifact_meta
+from backend.services.torch_backend import DetectOutput, load_torch_model
+from backend.services.yolo_service import OBJECT_NAMES_DEFAULT, YOLO_DIR, letterbox
+
+from tools.export_onnx import DEFAULT_WEIGHTS, _sample_frames
+
+
+def _coco_names() -> dict[int, str]:
+	with (YOLO_DIR / "utils" / "args.yaml").open("r", encoding="utf-8") as f:
+		return yaml.safe_load(f).get("names", {})
+
+
+def _keep_ids(names: dict[int, str], wanted: list[str]) -> list[int]:
+	by_name = {v: k for k, v in names.items()}
+	missing = [n for n in wanted if n not in by_name]
+	if missing:
+		raise SystemExit(f"Unknown class names: {', '.join(missing)}")
+	return sorted(by_name[n] for n in wanted)
+
+
+@torch.no_grad()
+def prune_detect(model: torch.nn.Module, keep: list[int]) -> None:
+	"""
+	Slice the last 1x1 conv of every cls branch to the kept classes and shrink
+	Detect.nc/no to match; box/DFL branches are untouched.
+	"""
+	detect = model.detect
+	index = torch.tensor(keep, dtype=torch.long)
+	for branch in detect.cls:
+		old = branch[-1]
+		new = torch.nn.Conv2d(old.in_channels, len(keep), 1, bias=old.bias is not None).to(old.weight.device)
+		new.weight.copy_(old.weight[index])
+		if old.bias is not None:
+			new.bias.copy_(old.bias[index])
+		branch[-1] = new.requires_grad_(False)
+	detect.nc = len(keep)
+	detect.no = detect.nc + detect.reg_max * 4
+
+
+@torch.no_grad()
+def check(full: torch.nn.Module, pruned: torch.nn.Module, keep: list[int], frames: int, atol: float) -> bool:
+	"""
+	Kept class scores and boxes from the pruned model must match the full model's.
+	"""
+	images = [letterbox(frame)[0] for frame in _sample_frames(None, frames)]
+	x = np.ascontiguousarray(np.stack(images).transpose((0, 3, 1, 2))[:, ::-1])
+	x = torch.from_numpy(x).float() / 255
+	ref = DetectOutput(full)(x)
+	got = DetectOutput(pruned)(x)
+	box_diff = (ref[:, :4] - got[:, :4]).abs().max().item()
+	cls_diff = (ref[:, 4:][:, keep] - got[:, 4:]).abs().max().item()
+	print(f"max |box diff| = {box_diff:.6f} px, max |score diff| = {cls_diff:.6f}")
+	ok = cls_diff <= atol and box_diff <= atol
+	print("PASS" if ok else "FAIL")
+	return ok
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Derive a detector whose head only scores person + seat object classes")
+	parser.add_argument("--weights", default=DEFAULT_WEIGHTS.as_posix(), help="Checkpoint path (default yolov11/weights/yolo11x.pt)")
+	parser.add_argument("--out", default=None, help="Output checkpoint (default: <stem>.pruned.pt next to the weights)")
+	parser.add_argument("--classes", nargs="*", default=None, help="Class names to keep (default: person + OBJECT_NAMES_DEFAULT)")
+	parser.add_argument("--check", action="store_true", help="Compare kept scores against the full model on floor frames")
+	parser.add_argument("--frames", type=int, default=2, help="Frames used by --check")
+	parser.add_argument("--atol", type=float, default=1e-4)
+	args = parser.parse_args()
+
+	weights = Path(args.weights)
+	out = Path(args.out) if args.out else pruned_weights_path(weights)
+	coco = _coco_names()
+	keep = _keep_ids(coco, args.classes or ["person"] + sorted(OBJECT_NAMES_DEFAULT))
+
+	model, ckpt = load_torch_model(weights, "cpu")
+	full_nc = model.detect.nc
+	prune_detect(model, keep)
+	names = {i: coco[k] for i, k in enumerate(keep)}
+
+	if args.check:
+		full, _ = load_torch_model(weights, "cpu")
+		if not check(full, model, keep, args.frames, args.atol):
+			raise SystemExit(1)
+
+	pruned_ckpt = dict(ckpt)
+	pruned_ckpt["model"] = model.half()
+	pruned_ckpt["names"] = names
+	torch.save(pruned_ckpt, out.as_posix())
+	write_artifact_meta(out, {
+		"source": weights.name,
+		"source_sha256": weights_sha256(weights),
+		"classes": keep,
+		"names": names,
+	})
+	print(f"Wrote {out.as_posix()} ({full_nc} -> {len(keep)} classes)")
+
+
+if __name__ == "__main__":
+	main()
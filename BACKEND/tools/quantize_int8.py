@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path so `import backend` works even if CWD is tools/
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+
+from backend.services.evaluation import Agreement, clip_seat_decisions, read_floor_clips
+from backend.services.inference_backends import (
+	OnnxBackend,
+	int8_artifact_path,
+	onnx_artifact_path,
+	read_artifact_meta,
+	write_artifact_meta,
+)
+from backend.services.roi_loader import list_floor_ids, load_floor_config
+from backend.services.yolo_service import YOLODetector, letterbox
+
+from tools.export_onnx import DEFAULT_WEIGHTS, export
+
+
+def _floor_configs() -> list:
+	configs = []
+	for floor_id in list_floor_ids():
+		try:
+			configs.append(load_floor_config(floor_id))
+		except Exception as e:
+			print(f"Skip floor {floor_id}: {e}")
+	return configs
+
+
+def _calibration_reader(input_name: str, floor_cfgs: list, count: int, imgsz: int):
+	from onnxruntime.quantization import CalibrationDataReader
+
+	class _FloorFrames(CalibrationDataReader):
+		"""Letterboxed floor frames, one per batch, preprocessed like OnnxBackend."""
+
+		def __init__(self) -> None:
+			per_floor = max(1, count // max(1, len(floor_cfgs)))
+			frames = []
+			for cfg in floor_cfgs:
+				clips = read_floor_clips(cfg, windows=per_floor, window_frames=1)
+				frames.extend(clip[0] for clip in clips)
+			self._frames = iter(frames[:count])
+			self.total = min(len(frames), count)
+
+		def get_next(self):
+			frame = next(self._frames, None)
+			if frame is None:
+				return None
+			image = letterbox(frame, imgsz)[0]
+			x = image.transpose((2, 0, 1))[::-1][None].astype(np.float32) / 255
+			return {input_name: np.ascontiguousarray(x)}
+
+	return _FloorFrames()
+
+
+def quantize(fp32: Path, out: Path, floor_cfgs: list, count: int, imgsz: int) -> Path:
+	import onnxruntime as ort
+	from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+	from onnxruntime.quantization.shape_inference import quant_pre_process
+
+	input_name = ort.InferenceSession(fp32.as_posix(), providers=["CPUExecutionProvider"]).get_inputs()[0].name
+	reader = _calibration_reader(input_name, floor_cfgs, count, imgsz)
+	if reader.total == 0:
+		raise SystemExit("No calibration frames: check stream_path in config/floors/*.json")
+	print(f"Calibrating on {reader.total} frames from {len(floor_cfgs)} floor(s)")
+
+	prepared = out.with_name(out.stem + ".prep.onnx")
+	quant_pre_process(fp32.as_posix(), prepared.as_posix())
+	try:
+		quantize_static(
+			prepared.as_posix(),
+			out.as_posix(),
+			reader,
+			quant_format=QuantFormat.QDQ,
+			activation_type=QuantType.QUInt8,
+			weight_type=QuantType.QInt8,
+			per_channel=True,
+			calibrate_method=CalibrationMethod.MinMax,
+		)
+	finally:
+		prepared.unlink(missing_ok=True)
+	meta = dict(read_artifact_meta(fp32) or {})
+	meta.update({"quantization": "int8-qdq", "calibration_frames": reader.total, "source": fp32.name})
+	write_artifact_meta(out, meta)
+	print(f"Wrote {out.as_posix()}")
+	return out
+
+
+def report(fp32: Path, int8: Path, floor_cfgs: list, windows: int, window_frames: int) -> Agreement:
+	"""
+	Per-seat occupancy decisions of the INT8 model against fp32 on the same clips.
+	"""
+	ref_detector = YOLODetector(backend=OnnxBackend(fp32))
+	int8_detector = YOLODetector(backend=OnnxBackend(int8))
+	result = Agreement()
+	clip_idx = 0
+	for cfg in floor_cfgs:
+		for clip in read_floor_clips(cfg, windows, window_frames):
+			ref = clip_seat_decisions(ref_detector, cfg, clip)
+			got = clip_seat_decisions(int8_detector, cfg, clip)
+			result.add(clip_idx, ref, got)
+			clip_idx += 1
+	print(f"Seat decisions: {result.agree}/{result.seats} agree ({result.rate:.2%}) over {clip_idx} clip(s)")
+	for seat_id, idx, ref_dec, got_dec in result.mismatches:
+		print(f"  clip {idx} seat {seat_id}: fp32 (person, object)={ref_dec} int8={got_dec}")
+	return result
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Quantize the ONNX model to INT8 for YOLO_BACKEND=onnx-int8")
+	parser.add_argument("--weights", default=DEFAULT_WEIGHTS.as_posix(), help="Checkpoint path (default yolov11/weights/yolo11x.pt)")
+	parser.add_argument("--onnx", default=None, help="fp32 ONNX model (default: next to the weights; exported if missing)")
+	parser.add_argument("--out", default=None, help="INT8 output path (default: <onnx stem>.int8.onnx)")
+	parser.add_argument("--imgsz", type=int, default=640)
+	parser.add_argument("--calib-frames", type=int, default=64, help="Calibration frames, spread over all floors")
+	parser.add_argument("--skip-quantize", action="store_true", help="Only run the accuracy report on an existing INT8 model")
+	parser.add_argument("--windows", type=int, default=5, help="Clips per floor for the accuracy report (0 to skip)")
+	parser.add_argument("--window-frames", type=int, default=0, help="Frames per clip (default: one second of video)")
+	parser.add_argument("--min-agreement", type=float, default=0.0, help="Exit non-zero when seat agreement falls below this")
+	args = parser.parse_args()
+
+	fp32 = Path(args.onnx) if args.onnx else onnx_artifact_path(Path(args.weights))
+	if not fp32.exists():
+		export(Path(args.weights), fp32, 17, args.imgsz, False)
+	out = Path(args.out) if args.out else int8_artifact_path(fp32)
+	floor_cfgs = _floor_configs()
+
+	if not args.skip_quantize:
+		quantize(fp32, out, floor_cfgs, args.calib_frames, args.imgsz)
+	if args.windows > 0:
+		result = report(fp32, out, floor_cfgs, args.windows, args.window_frames)
+		if result.rate < args.min_agreement:
+			raise SystemExit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -14,6 +14,7 @@ from torch.nn.utils import clip_grad_norm_ as clip
 from torch.nn.parallel import DistributedDataParallel
 
 from nets import nn
+from utils import preprocess
 from utils import util
 from utils.dataset import Dataset
 
@@ -230,43 +231,17 @@ def inference(args, params):
     if not camera.isOpened():
         print("Error opening video stream or file")
 
+    # Cached resize/pad plan + reusable (1, 3, S, S) float input
+    letterbox = preprocess.Letterbox(args.inp_size)
+
     while camera.isOpened():
         success, frame = camera.read()
         if success:
-            image = frame.copy()
-            shape = image.shape[:2]
-
-            r = args.inp_size / max(shape[0], shape[1])
-            if r != 1:
-                resample = cv2.INTER_LINEAR if r > 1 else cv2.INTER_AREA
-                image = cv2.resize(image, dsize=(int(shape[1] * r), int(shape[0] * r)), interpolation=resample)
-            height, width = image.shape[:2]
-
-            # Scale ratio (new / old)
-            r = min(1.0, args.inp_size / height, args.inp_size / width)
-
-            # Compute padding
-            pad = int(round(width * r)), int(round(height * r))
-            w = (args.inp_size - pad[0]) / 2
-            h = (args.inp_size - pad[1]) / 2
-
-            if (width, height) != pad:  # resize
-                image = cv2.resize(image, pad, interpolation=cv2.INTER_LINEAR)
-            top, bottom = int(round(h - 0.1)), int(round(h + 0.1))
-            left, right = int(round(w - 0.1)), int(round(w + 0.1))
-            image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT)
-
-            # Convert HWC to CHW, BGR to RGB
-            x = image.transpose((2, 0, 1))[::-1]
-            x = np.ascontiguousarray(x)
-            x = torch.from_numpy(x)
-            x = x.unsqueeze(dim=0)
-            x = x.to(device)
+            x, metas = letterbox.batch([frame])
+            w, h, gain, shape = metas[0]
+            x = torch.from_numpy(x).to(device)
             if device.startswith('cuda'):
                 x = x.half()
-            else:
-                x = x.float()
-            x = x / 255
             # Inference
             outputs = model(x)
             # NMS
@@ -275,7 +250,7 @@ def inference(args, params):
             if outputs is not None:
                 outputs[:, [0, 2]] -= w
                 outputs[:, [1, 3]] -= h
-                outputs[:, :4] /= min(height / shape[0], width / shape[1])
+                outputs[:, :4] /= gain
 
                 outputs[:, 0].clamp_(0, shape[1])
                 outputs[:, 1].clamp_(0, shape[0])
@@ -230,6 +230,9 @@ class Detect(nn.Module):
         if self.training:
             return x
 
+        if getattr(self, 'static', False) and not torch.is_grad_enabled():
+            return self._forward_static(x), x
+
         bs = x[0].shape
         x_cat = torch.cat([xi.view(bs[0], self.no, -1) for xi in x], 2)
         self.anchors, self.strides = (j.transpose(0, 1) for j in
@@ -244,6 +247,42 @@ class Detect(nn.Module):
         output = torch.cat((d_box * self.strides, cls.sigmoid()), 1)
         return output, x
 
+    def _forward_static(self, x):
+        """
+        Inference with anchors, strides and output buffers built once per input
+        shape. The returned tensor is reused by the next call of the same shape,
+        so callers must consume it (e.g. run NMS) before calling again.
+        """
+        bs = x[0].shape[0]
+        key = (bs, tuple(tuple(xi.shape[2:]) for xi in x), x[0].dtype,
+               x[0].device)
+        cache = getattr(self, '_static_cache', None)
+        if cache is None or cache['key'] != key:
+            anchors, strides = (j.transpose(0, 1) for j in
+                                util.make_anchors(x, self.stride))
+            n = anchors.shape[-1]
+            cache = {'key': key,
+                     'anchors': anchors.unsqueeze(0),
+                     'strides': strides,
+                     'x_cat': x[0].new_empty((bs, self.no, n)),
+                     'output': x[0].new_empty((bs, 4 + self.nc, n))}
+            self._static_cache = cache
+            self.anchors, self.strides = anchors, strides
+
+        x_cat = cache['x_cat']
+        torch.cat([xi.view(bs, self.no, -1) for xi in x], 2, out=x_cat)
+        box, cls = x_cat.split((self.reg_max * 4, self.nc), 1)
+        lt, rb = self.dfl(box).chunk(2, 1)
+
+        # c_xy = anchor + (rb - lt) / 2, wh = lt + rb, written in place
+        output = cache['output']
+        c_xy, wh = output[:, :2], output[:, 2:4]
+        c_xy.copy_(rb).sub_(lt).mul_(0.5).add_(cache['anchors'])
+        wh.copy_(rb).add_(lt)
+        output[:, :4].mul_(cache['strides'])
+        output[:, 4:].copy_(cls).sigmoid_()
+        return output
+
     def bias_init(self):
         m = self
         for a, b, s in zip(m.box, m.cls, m.stride):
@@ -351,6 +390,12 @@ class YOLO(torch.nn.Module):
         x = self.head(x)
         return self.detect(list(x))
 
+    def static_shapes(self, enabled=True):
+        """Reuse Detect anchors and output buffers across same-shape calls."""
+        self.detect.static = enabled
+        self.detect._static_cache = None
+        return self
+
     def fuse(self):
         for m in self.modules():
             if type(m) is Conv and hasattr(m, 'norm'):
@@ -0,0 +1,118 @@
+import collections
+
+import cv2
+import numpy as np
+
+
+class LetterboxPlan:
+    """
+    Resize/pad geometry for one source frame size, computed once.
+    Owns a padded HWC canvas whose border stays zero; frames are resized
+    straight into its interior.
+    """
+
+    def __init__(self, shape, inp_size=640):
+        self.shape = shape  # (h, w)
+        self.inp_size = inp_size
+
+        # Resize long edge to inp_size
+        r = inp_size / max(shape[0], shape[1])
+        self.interpolation = None
+        if r != 1:
+            self.interpolation = cv2.INTER_LINEAR if r > 1 else cv2.INTER_AREA
+            height, width = int(shape[0] * r), int(shape[1] * r)
+        else:
+            height, width = shape
+        self.size = (width, height)
+
+        # Padding (same rounding as the original letterbox)
+        pad_w = (inp_size - width) / 2
+        pad_h = (inp_size - height) / 2
+        self.top = int(round(pad_h - 0.1))
+        self.left = int(round(pad_w - 0.1))
+        self.gain = min(height / shape[0], width / shape[1])
+        self.meta = (pad_w, pad_h, self.gain, tuple(shape))
+
+        self.canvas = np.zeros((inp_size, inp_size, 3), dtype=np.uint8)
+        self.interior = self.canvas[self.top:self.top + height,
+                                    self.left:self.left + width]
+
+    def apply(self, frame):
+        """Letterbox frame into the canvas (reused by the next call)."""
+        if self.interpolation is None:
+            np.copyto(self.interior, frame)
+        else:
+            try:
+                out = cv2.resize(frame, self.size, dst=self.interior,
+                                 interpolation=self.interpolation)
+            except cv2.error:
+                out = cv2.resize(frame, self.size,
+                                 interpolation=self.interpolation)
+            if out is not self.interior:
+                # cv2 could not write into the strided view
+                np.copyto(self.interior, out)
+        return self.canvas
+
+
+class Letterbox:
+    """
+    Letterbox preprocessing with cached plans per frame size and reusable
+    buffers: one resize into a padded canvas, then one pass that does
+    HWC->CHW, BGR->RGB and /255 into a reusable NCHW batch.
+    Not thread-safe; use one instance per inference thread.
+    """
+
+    def __init__(self, inp_size=640, max_plans=32):
+        self.inp_size = inp_size
+        self.max_plans = max_plans
+        self._plans = collections.OrderedDict()
+        self._batch = None
+
+    def plan(self, shape):
+        shape = (int(shape[0]), int(shape[1]))
+        plan = self._plans.get(shape)
+        if plan is None:
+            plan = LetterboxPlan(shape, self.inp_size)
+            self._plans[shape] = plan
+            if len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+        else:
+            self._plans.move_to_end(shape)
+        return plan
+
+    def __call__(self, frame):
+        """
+        Padded BGR HWC image (a reused buffer) and
+        (pad_w, pad_h, gain, original_shape) to undo it.
+        """
+        plan = self.plan(frame.shape[:2])
+        return plan.apply(frame), plan.meta
+
+    def batch(self, frames, dtype=np.float32):
+        """
+        Letterbox frames into an (n, 3, inp_size, inp_size) RGB batch.
+        Float batches are scaled to [0, 1]; uint8 batches keep raw values.
+        The returned array is reused by the next call.
+        """
+        n = len(frames)
+        size = self.inp_size
+        if (self._batch is None or self._batch.shape[0] < n
+                or self._batch.dtype != dtype):
+            self._batch = np.empty((n, 3, size, size), dtype=dtype)
+        x = self._batch[:n]
+        metas = []
+        for i, frame in enumerate(frames):
+            image, meta = self(frame)
+            chw = image.transpose((2, 0, 1))[::-1]  # BGR -> RGB view
+            if x.dtype == np.uint8:
+                np.copyto(x[i], chw)
+            else:
+                np.divide(chw, np.float32(255), out=x[i], dtype=np.float32)
+            metas.append(meta)
+        return x, metas
+
+
+def letterbox(frame, inp_size=640):
+    """One-off letterbox; returns a fresh image and its meta."""
+    plan = LetterboxPlan(frame.shape[:2], inp_size)
+    return plan.apply(frame), plan.meta
@@ -453,6 +453,60 @@ def non_max_suppression(pred, conf_th=0.001, iou_th=0.7):
     return output
 
 
+def non_max_suppression_batched(pred, conf_th=0.001, iou_th=0.7, classes=None,
+                                max_det=300):
+    """
+    Vectorized NMS over a whole batch in one torchvision call.
+    classes: optional class ids to keep; other scores are dropped before
+    candidates are expanded to (anchor, class) pairs.
+    Returns an (N, 7) tensor [batch_idx, x1, y1, x2, y2, score, cls] sorted by
+    batch index, then score (descending), with at most max_det rows per image.
+    """
+    import torchvision
+    max_nms = 30000
+
+    pred = pred[0] if isinstance(pred, (list, tuple)) else pred
+    bs = pred.shape[0]
+    nc = pred.shape[1] - 4
+    pred = pred.transpose(-1, -2)  # (bs, anchors, 4 + nc)
+
+    cls = pred[..., 4:]
+    cls_ids = None
+    if classes is not None:
+        cls_ids = torch.as_tensor(classes, dtype=torch.long, device=pred.device)
+        cls = cls.index_select(-1, cls_ids)
+
+    # Drop anchors without any allowed score above conf_th
+    b, a = torch.where(cls.amax(-1) > conf_th)
+    if not b.numel():
+        return torch.zeros((0, 7), device=pred.device)
+    box = wh2xy(pred[b, a, :4])
+    cls = cls[b, a].float()
+
+    # One candidate per (anchor, class) above conf_th
+    i, j = torch.where(cls > conf_th)
+    b, box, scores = b[i], box[i], cls[i, j]
+    if cls_ids is not None:
+        j = cls_ids[j]
+    if scores.numel() > max_nms * bs:
+        top = scores.topk(max_nms * bs).indices
+        b, box, scores, j = b[top], box[top], scores[top], j[top]
+
+    # Batch and class offsets keep images and classes apart inside one NMS
+    keep = torchvision.ops.batched_nms(box, scores, b * nc + j, iou_th)
+
+    # Stable sort by image keeps the descending score order within each one
+    keep = keep[torch.argsort(b[keep], stable=True)]
+    b_keep = b[keep]
+    counts = torch.bincount(b_keep, minlength=bs)
+    starts = torch.cumsum(counts, 0) - counts
+    rank = torch.arange(keep.numel(), device=keep.device) - starts[b_keep]
+    keep = keep[rank < max_det]
+
+    return torch.cat((b[keep, None].float(), box[keep], scores[keep, None],
+                      j[keep, None].float()), 1)
+
+
 def smooth(y, f=0.05):
     nf = round(
         len(y) * f * 2) // 2 + 1